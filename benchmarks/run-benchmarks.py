@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+效能基準測試 - 量測驗證腳本、專案分析與專案初始化的熱點路徑
+以可重現的合成專案測量每項 check_* 檢查、ProjectAnalyzer 各階段與 init-project 的建立流程，
+回報吞吐量（文件/秒、MB/秒）與峰值 RSS，結果可保存為 JSON 並與基準結果比較
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+import importlib.util
+from contextlib import redirect_stdout
+from pathlib import Path
+from datetime import datetime
+import platform
+
+# 峰值 RSS 需要 resource 模組（Windows 上不可用）
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 顏色輸出支援
+class Colors:
+    """終端顏色定義"""
+    BLUE = '\033[94m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    
+    @staticmethod
+    def disable():
+        """Windows 舊版本可能需要禁用顏色"""
+        Colors.BLUE = ''
+        Colors.GREEN = ''
+        Colors.YELLOW = ''
+        Colors.RED = ''
+        Colors.ENDC = ''
+        Colors.BOLD = ''
+
+# Windows 舊版本檢測
+if platform.system() == 'Windows' and sys.version_info < (3, 6):
+    Colors.disable()
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# 結果文件格式版本
+RESULT_VERSION = 1
+
+# ProjectAnalyzer 的階段（inventory 與 summary 為各階段共用的目錄遍歷與行數統計）
+ANALYZER_STAGES = ['inventory', 'summary', 'detect_languages', 'detect_project_type', 'detect_frameworks',
+                   'analyze_structure', 'analyze_dependencies', 'calculate_metrics', 'generate_recommendations']
+
+# 合成專案可用的語言代號與副檔名
+LANGUAGES = {
+    'py': '.py',
+    'js': '.js',
+    'ts': '.ts',
+    'dart': '.dart',
+}
+
+def load_module(name: str, path: Path):
+    """以文件路徑載入腳本模組（腳本名稱含 -，無法直接 import）"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def load_validator():
+    sys.path.insert(0, str(REPO_ROOT / 'validation-scripts'))
+    import validator
+    return validator
+
+def peak_rss_kb():
+    """本進程至今的峰值 RSS（KB）；無法取得時返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以位元組為單位，Linux 以 KB 為單位
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def parse_mix(text: str) -> dict:
+    """解析語言組成，例如 py=60,js=30,dart=10"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in LANGUAGES:
+            raise ValueError(f"未知的語言 '{name}'（可用: {', '.join(LANGUAGES)}）")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("語言組成的權重總和必須大於 0")
+    return mix
+
+def source_lines(rng: random.Random, language: str, lines: int) -> list:
+    """生成一個約 lines 行的源文件內容
+
+    函數名稱從有限的集合中挑選（產生跨文件的重複函數），並以低機率加入過長的行、
+    硬編碼密碼、SQL 字串拼接與 eval 等模式，讓每項檢查都有實際的工作量。
+    """
+    python = language == 'py'
+    if python:
+        out = ['import os', 'import sys', 'import json', '']
+    elif language == 'dart':
+        out = ["import 'dart:io';", "import 'dart:convert';", '']
+    else:
+        out = ["import fs from 'fs';", "import path from 'path';", '']
+    
+    while len(out) < lines:
+        name = f"handler_{rng.randrange(400)}"
+        body = rng.randint(3, 70)
+        if python:
+            out.append(f"def {name}(value, options=None):")
+            indent = '    '
+        elif language == 'dart':
+            out.append(f"void {name}(int value) {{")
+            indent = '  '
+        else:
+            out.append(f"function {name}(value, options) {{")
+            indent = '  '
+        
+        for i in range(body):
+            roll = rng.random()
+            if roll < 0.01:
+                line = 'password = "s3cr3t-%06d"' % rng.randrange(10 ** 6)
+            elif roll < 0.02:
+                line = 'query = "SELECT * FROM users WHERE id = " + str(value)'
+            elif roll < 0.03:
+                line = 'result = eval(value)'
+            elif roll < 0.06:
+                line = 'message = "' + 'x' * rng.randint(100, 160) + '"'
+            elif roll < 0.25:
+                line = f"if value > {i} and value < {i * 7}:" if python else f"if (value > {i} && value < {i * 7}) {{ value += 1; }}"
+            elif roll < 0.35:
+                line = f"for item in range({i}):" if python else f"for (var j = 0; j < {i}; j++) {{ value += j; }}"
+            else:
+                line = f"value = value * {rng.randint(2, 9)} + {i}"
+            if python and line.endswith(':'):
+                out.append(indent + line)
+                out.append(indent + '    value += 1')
+            else:
+                out.append(indent + (line if python or line.endswith('}') else line + ';'))
+        out.append(f"{indent}return value" + ('' if python else ';'))
+        if not python:
+            out.append('}')
+        out.append('')
+    return out
+
+def generate_tree(root: Path, files: int, lines: int, mix: dict, noise: int, seed: int) -> dict:
+    """生成可重現的合成專案，返回專案的描述（參數與實際的文件數、位元組數）"""
+    rng = random.Random(seed)
+    languages = list(mix)
+    weights = [mix[name] for name in languages]
+    src = root / 'src'
+    src.mkdir(parents=True, exist_ok=True)
+    (root / 'requirements.txt').write_text('requests\nflask\n', encoding='utf-8')
+    (root / 'README.md').write_text('# benchmark project\n', encoding='utf-8')
+    
+    generated = {}  # 語言 -> 已生成的內容，用於製造近似重複的文件
+    total_bytes = 0
+    for index in range(files):
+        language = rng.choices(languages, weights)[0]
+        previous = generated.get(language)
+        if previous and rng.random() < 0.05:
+            # 5% 的文件是既有文件的近似副本（只改一行），供相似文件檢查使用
+            content = list(rng.choice(previous))
+            content[rng.randrange(len(content))] = '# changed' if language == 'py' else '// changed'
+        else:
+            content = source_lines(rng, language, rng.randint(max(1, lines // 2), lines * 3 // 2))
+        generated.setdefault(language, []).append(content)
+        directory = src / f"module_{index // 50:03d}"
+        directory.mkdir(exist_ok=True)
+        data = '\n'.join(content) + '\n'
+        (directory / f"file_{index:05d}{LANGUAGES[language]}").write_text(data, encoding='utf-8')
+        total_bytes += len(data.encode('utf-8'))
+    
+    # node_modules 雜訊：驗證與分析都應在進入前略過
+    for index in range(noise):
+        package = root / 'node_modules' / f"pkg_{index // 20:03d}"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"index_{index:05d}.js").write_text(
+            '\n'.join(source_lines(rng, 'js', lines)) + '\n', encoding='utf-8')
+        if index % 4 == 0:
+            nested = src / 'node_modules' / f"pkg_{index // 20:03d}"
+            nested.mkdir(parents=True, exist_ok=True)
+            (nested / f"index_{index:05d}.js").write_text('module.exports = {};\n', encoding='utf-8')
+    
+    return {
+        'files': files,
+        'lines': lines,
+        'mix': mix,
+        'noise': noise,
+        'seed': seed,
+        'source_bytes': total_bytes,
+    }
+
+def measure(run, repeat: int) -> dict:
+    """重複執行 run()，返回牆鐘時間的中位數、最小值與 CPU 時間的中位數"""
+    walls = []
+    cpus = []
+    for _ in range(repeat):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        run()
+        cpus.append(time.process_time() - cpu)
+        walls.append(time.perf_counter() - wall)
+    return {
+        'wall': statistics.median(walls),
+        'wall_min': min(walls),
+        'cpu': statistics.median(cpus),
+    }
+
+def record(name: str, group: str, timing: dict, files: int, size: int) -> dict:
+    """組成一筆結果，附上吞吐量與峰值 RSS"""
+    wall = timing['wall'] or 1e-9
+    return dict(timing, name=name, group=group, files=files, bytes=size,
+                files_per_sec=round(files / wall, 1), mb_per_sec=round(size / wall / 1e6, 3),
+                peak_rss_kb=peak_rss_kb())
+
+def validator_checks() -> list:
+    """所有驗證器的 check_* 方法（依類別與定義順序），返回 [(類別名稱, 方法名稱)]"""
+    validator = load_validator()
+    checks = []
+    for cls in (validator.CodeQualityValidator, validator.SecurityValidator, validator.DuplicationValidator):
+        checks.extend((cls.__name__, name) for name in vars(cls) if name.startswith('check_'))
+    return checks
+
+def bench_validator(tree: Path, target: str, repeat: int) -> list:
+    """量測單一 check_* 方法（或 all 的完整運行）；每次重複都使用全新的源文件集合"""
+    validator = load_validator()
+    
+    def build(cls_name):
+        return getattr(validator, cls_name)(tree, {})
+    
+    if target == 'all':
+        run = lambda: build('AllValidator').run_all_checks()
+        name = 'validator:all'
+    else:
+        cls_name, method = target.split('.')
+        run = lambda: getattr(build(cls_name), method)()
+        name = f"validator:{target}"
+    
+    corpus = build('AllValidator').corpus
+    size = sum(source.stat.st_size for source in corpus.all_files)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        timing = measure(run, repeat)
+    return [record(name, 'validator', timing, len(corpus.all_files), size)]
+
+def bench_analyzer(tree: Path, repeat: int) -> list:
+    """依序量測 ProjectAnalyzer 各階段（每次重複都使用全新的分析器、不使用上次的快取）"""
+    analyze = load_module('analyze_project', REPO_ROOT / 'tools' / 'analyze-project.py')
+    timings = {stage: [] for stage in ANALYZER_STAGES}
+    peaks = {}
+    files = size = 0
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            analyzer = analyze.ProjectAnalyzer(tree)
+            for stage in ANALYZER_STAGES:
+                wall = time.perf_counter()
+                cpu = time.process_time()
+                if stage in ('inventory', 'summary'):
+                    getattr(analyzer, stage)
+                else:
+                    getattr(analyzer, stage)()
+                timings[stage].append((time.perf_counter() - wall, time.process_time() - cpu))
+                peaks[stage] = peak_rss_kb()
+            files = len(analyzer.inventory.files)
+            size = sum(entry.size for entry in analyzer.inventory.files)
+    
+    results = []
+    for stage in ANALYZER_STAGES:
+        walls = [wall for wall, _ in timings[stage]]
+        timing = {'wall': statistics.median(walls), 'wall_min': min(walls),
+                  'cpu': statistics.median(cpu for _, cpu in timings[stage])}
+        item = record(f"analyzer:{stage}", 'analyzer', timing, files, size)
+        # 階段依序執行，峰值 RSS 為執行到該階段為止的進程峰值
+        item['peak_rss_kb'] = peaks[stage]
+        results.append(item)
+    return results
+
+def bench_init(repeat: int) -> list:
+    """量測 init-project 的專案建立（create_project）與原生 Git 初始化"""
+    init = load_module('init_project', REPO_ROOT / 'tools' / 'init-project.py')
+    # 原生 Git 寫入需要提交者身分
+    for key in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+        os.environ.setdefault(key, 'benchmark')
+    for key in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        os.environ.setdefault(key, 'benchmark@example.com')
+    
+    timings = {'scaffold': [], 'git': []}
+    peaks = {}
+    files = size = 0
+    workspace = Path(tempfile.mkdtemp(prefix='bench-init-'))
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+            for index in range(repeat):
+                project_path = workspace / f"project-{index}"
+                project_info = {
+                    'name': project_path.name,
+                    'type': 'python',
+                    'description': 'benchmark project',
+                    'language': 'Python',
+                    'claude_config': 'standard',
+                    'mode': 'new',
+                    'path': str(project_path),
+                }
+                for stage, run in (
+                    ('scaffold', lambda: init.create_project(project_path, project_info, init.DEFAULT_AGENTS)),
+                    ('git', lambda: init.setup_git_repo(project_path, 'native')),
+                ):
+                    wall = time.perf_counter()
+                    cpu = time.process_time()
+                    run()
+                    timings[stage].append((time.perf_counter() - wall, time.process_time() - cpu))
+                    peaks[stage] = peak_rss_kb()
+                created = [path for path in project_path.rglob('*') if path.is_file() and '.git' not in path.parts]
+                files = len(created)
+                size = sum(path.stat().st_size for path in created)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    
+    results = []
+    for stage, values in timings.items():
+        walls = [wall for wall, _ in values]
+        timing = {'wall': statistics.median(walls), 'wall_min': min(walls),
+                  'cpu': statistics.median(cpu for _, cpu in values)}
+        item = record(f"init:{stage}", 'init', timing, files, size)
+        item['peak_rss_kb'] = peaks[stage]
+        results.append(item)
+    return results
+
+def run_worker(args):
+    """子進程入口：執行一組基準測試，以 JSON 輸出結果"""
+    tree = Path(args.tree) if args.tree else None
+    if args.worker == 'validator':
+        results = bench_validator(tree, args.target, args.repeat)
+    elif args.worker == 'analyzer':
+        results = bench_analyzer(tree, args.repeat)
+    else:
+        results = bench_init(args.repeat)
+    print(json.dumps(results))
+
+def spawn(worker: str, tree: Path, repeat: int, target: str = None) -> list:
+    """在全新的 Python 進程中執行一組基準測試"""
+    command = [sys.executable, str(Path(__file__).resolve()), '--worker', worker,
+               '--tree', str(tree), '--repeat', str(repeat)]
+    if target:
+        command += ['--target', target]
+    completed = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                           f"子進程以狀態碼 {completed.returncode} 結束")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def planned_benchmarks(groups: list) -> list:
+    """要執行的 (群組, 目標) 列表"""
+    plan = []
+    if 'validator' in groups:
+        plan.extend(('validator', f"{cls_name}.{method}") for cls_name, method in validator_checks())
+        plan.append(('validator', 'all'))
+    if 'analyzer' in groups:
+        plan.append(('analyzer', None))
+    if 'init' in groups:
+        plan.append(('init', None))
+    return plan
+
+def format_row(item: dict) -> str:
+    rss = f"{item['peak_rss_kb'] / 1024:.1f} MB" if item.get('peak_rss_kb') else '-'
+    return (f"{item['name']:<58} {item['wall'] * 1000:>10.1f} {item['cpu'] * 1000:>10.1f} "
+            f"{item['files_per_sec']:>12.1f} {item['mb_per_sec']:>9.2f} {rss:>10}")
+
+def print_results(results: list):
+    print(f"\n{'名稱':<56} {'時間 ms':>8} {'CPU ms':>10} {'文件/秒':>9} {'MB/秒':>8} {'峰值 RSS':>8}")
+    for item in results:
+        print(format_row(item))
+
+def run_benchmarks(args) -> dict:
+    """生成合成專案（或使用 --tree 指定的目錄）並執行所有基準測試"""
+    groups = args.only or ['validator', 'analyzer', 'init']
+    mix = parse_mix(args.mix)
+    keep = args.tree is not None
+    tree = Path(args.tree).resolve() if keep else Path(tempfile.mkdtemp(prefix='bench-tree-'))
+    
+    try:
+        if keep and tree.exists() and any(tree.iterdir()):
+            print(f"{Colors.YELLOW}使用既有的專案目錄: {tree}（不重新生成）{Colors.ENDC}")
+            info_file = tree / '.benchmark-tree.json'
+            description = json.loads(info_file.read_text(encoding='utf-8')) if info_file.exists() else {}
+        else:
+            print(f"{Colors.BLUE}生成合成專案: {args.files} 個文件 × 約 {args.lines} 行，"
+                  f"node_modules 雜訊 {args.noise} 個文件...{Colors.ENDC}")
+            description = generate_tree(tree, args.files, args.lines, mix, args.noise, args.seed)
+            (tree / '.benchmark-tree.json').write_text(json.dumps(description), encoding='utf-8')
+        
+        results = []
+        plan = planned_benchmarks(groups)
+        for index, (group, target) in enumerate(plan, 1):
+            label = target or group
+            print(f"[{index}/{len(plan)}] {label}", flush=True)
+            try:
+                results.extend(spawn(group, tree, args.repeat, target))
+            except (RuntimeError, ValueError) as e:
+                print(f"{Colors.RED}  失敗: {e}{Colors.ENDC}")
+    finally:
+        if not keep:
+            shutil.rmtree(tree, ignore_errors=True)
+    
+    return {
+        'version': RESULT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'tree': description,
+        'results': results,
+    }
+
+def compare_runs(baseline: dict, current: dict, threshold: float, min_time: float) -> int:
+    """比較兩次運行的牆鐘時間，返回退化的項目數
+
+    變慢超過 threshold（比例）的項目視為退化；基準時間低於 min_time 秒的項目雜訊太大，只列出不判定。
+    """
+    if baseline.get('tree') != current.get('tree'):
+        print(f"{Colors.YELLOW}警告：兩次運行的合成專案參數不同，比較結果僅供參考{Colors.ENDC}")
+    
+    base = {item['name']: item for item in baseline.get('results', [])}
+    regressions = 0
+    print(f"\n{'名稱':<56} {'基準 ms':>8} {'目前 ms':>8} {'變化':>9}")
+    for item in current.get('results', []):
+        previous = base.get(item['name'])
+        if previous is None:
+            continue
+        change = item['wall'] / previous['wall'] - 1 if previous['wall'] else 0.0
+        line = (f"{item['name']:<58} {previous['wall'] * 1000:>10.1f} {item['wall'] * 1000:>10.1f} "
+                f"{change * 100:>+9.1f}%")
+        if previous['wall'] < min_time:
+            print(line)
+        elif change > threshold:
+            regressions += 1
+            print(f"{Colors.RED}{line}  ✗ 退化{Colors.ENDC}")
+        elif change < -threshold:
+            print(f"{Colors.GREEN}{line}  ✓ 改善{Colors.ENDC}")
+        else:
+            print(line)
+    
+    missing = sorted(set(base) - {item['name'] for item in current.get('results', [])})
+    for name in missing:
+        print(f"{Colors.YELLOW}{name}: 本次運行沒有此項目{Colors.ENDC}")
+    return regressions
+
+def load_results(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}錯誤：無法讀取結果文件 {path}: {e}{Colors.ENDC}")
+        sys.exit(2)
+    if data.get('version') != RESULT_VERSION:
+        print(f"{Colors.RED}錯誤：{path} 的格式版本 {data.get('version')} 不受支援{Colors.ENDC}")
+        sys.exit(2)
+    return data
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='驗證腳本、專案分析與專案初始化的效能基準測試')
+    parser.add_argument('--files', type=int, default=500, help='合成專案的源文件數（預設 500）')
+    parser.add_argument('--lines', type=int, default=200, help='每個源文件的平均行數（預設 200）')
+    parser.add_argument('--mix', default='py=60,js=25,ts=10,dart=5',
+                       help='語言組成與權重（預設 py=60,js=25,ts=10,dart=5）')
+    parser.add_argument('--noise', type=int, default=1000, help='node_modules 中的雜訊文件數（預設 1000）')
+    parser.add_argument('--seed', type=int, default=1, help='隨機種子，相同參數生成相同的專案')
+    parser.add_argument('--tree', help='合成專案的目錄（保留供重複使用；預設使用暫存目錄並在結束後刪除）')
+    parser.add_argument('--repeat', type=int, default=3, help='每項基準測試的重複次數，取中位數（預設 3）')
+    parser.add_argument('--only', nargs='+', choices=['validator', 'analyzer', 'init'], help='只執行指定群組')
+    parser.add_argument('--output', '-o', help='將結果保存為 JSON 文件')
+    parser.add_argument('--compare', nargs='+', metavar='RESULT',
+                       help='與基準結果比較：BASELINE（與本次運行比較）或 BASELINE CURRENT（只比較兩個文件）')
+    parser.add_argument('--threshold', type=float, default=10.0, help='判定為退化的變慢百分比（預設 10）')
+    parser.add_argument('--min-time', type=float, default=5.0,
+                       help='基準時間低於此毫秒數的項目不判定退化（預設 5）')
+    parser.add_argument('--no-color', action='store_true', help='禁用彩色輸出')
+    # 子進程使用的內部參數
+    parser.add_argument('--worker', choices=['validator', 'analyzer', 'init'], help=argparse.SUPPRESS)
+    parser.add_argument('--target', help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args)
+        return
+    
+    if args.no_color:
+        Colors.disable()
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare 最多接受兩個結果文件')
+    if args.repeat < 1:
+        parser.error('--repeat 必須至少為 1')
+    
+    # 先讀取基準結果，文件有誤時不必等待整個運行結束
+    baseline = load_results(args.compare[0]) if args.compare else None
+    if args.compare and len(args.compare) == 2:
+        current = load_results(args.compare[1])
+    else:
+        try:
+            current = run_benchmarks(args)
+        except ValueError as e:
+            print(f"{Colors.RED}錯誤：{e}{Colors.ENDC}")
+            sys.exit(2)
+        print_results(current['results'])
+        if args.output:
+            Path(args.output).write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding='utf-8')
+            print(f"\n{Colors.GREEN}結果已保存: {args.output}{Colors.ENDC}")
+    
+    if baseline is not None:
+        regressions = compare_runs(baseline, current, args.threshold / 100, args.min_time / 1000)
+        if regressions:
+            print(f"\n{Colors.RED}❌ {regressions} 項基準測試變慢超過 {args.threshold:g}%{Colors.ENDC}")
+            sys.exit(1)
+        print(f"\n{Colors.GREEN}✅ 沒有超過 {args.threshold:g}% 的效能退化{Colors.ENDC}")
+
+if __name__ == '__main__':
+    main()
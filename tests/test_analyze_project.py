@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+analyze-project.py 的回歸測試
+"""
+
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+spec = importlib.util.spec_from_file_location('analyze_project', REPO_ROOT / 'tools' / 'analyze-project.py')
+analyze = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(analyze)
+
+C_COMMENTS = analyze.comment_pattern((b'//',), True)
+PY_COMMENTS = analyze.comment_pattern((b'#',), False)
+
+class CountLinesTest(unittest.TestCase):
+    """行數統計：每行只歸入代碼、空白、註解其中一類"""
+    
+    def count(self, data: bytes, pattern=C_COMMENTS, block: bool = True):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'source'
+            path.write_bytes(data)
+            return analyze.count_lines(path, pattern, block)
+    
+    def test_blank_line_inside_block_comment_is_blank(self):
+        self.assertEqual(self.count(b'/*\n\n*/\nint a;'), (4, 1, 1, 2))
+        self.assertEqual(self.count(b'/**\n * doc\n\n */\nint a;\n'), (5, 1, 1, 3))
+    
+    def test_code_after_block_comment_is_code(self):
+        self.assertEqual(self.count(b'/* hdr */ int b;\n'), (1, 1, 0, 0))
+        self.assertEqual(self.count(b'/* a */ /* b */\nint c;\n'), (2, 1, 0, 1))
+    
+    def test_line_comments(self):
+        self.assertEqual(self.count(b'// x\n\nint a;\n'), (3, 1, 1, 1))
+        self.assertEqual(self.count(b'# c\n\nx = 1  # t\n', PY_COMMENTS, False), (3, 1, 1, 1))
+    
+    def test_block_comment_across_read_chunks(self):
+        original = analyze.READ_CHUNK_SIZE
+        analyze.READ_CHUNK_SIZE = 8
+        try:
+            self.assertEqual(self.count(b'int a;\n/*\n * long\n\n * comment\n */\nint b;\n'), (7, 2, 1, 4))
+        finally:
+            analyze.READ_CHUNK_SIZE = original
+
+class DirectoryFingerprintTest(unittest.TestCase):
+    """重新分析時指紋未變的目錄重用上次的小計，只重新統計變更的目錄"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel_path, content in {
+            'README.md': '# demo\n',
+            'src/app.py': '# app\n\nx = 1\n',
+            'src/util.py': 'def f():\n    return 1\n',
+            'docs/guide.md': 'guide\n',
+        }.items():
+            path = self.root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding='utf-8')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def analyze(self, previous: dict = None):
+        analyzer = analyze.ProjectAnalyzer(self.root, previous=previous, jobs=1)
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            summary = analyzer.summary
+        return analyzer, summary
+    
+    def previous(self, analyzer) -> dict:
+        return {'project_path': str(self.root), 'cache': analyzer.analysis_results['cache']}
+    
+    def test_unchanged_project_reuses_every_directory(self):
+        first, summary = self.analyze()
+        second, reused = self.analyze(self.previous(first))
+        self.assertEqual(second.inventory.unchanged, {'', 'src', 'docs'})
+        self.assertEqual(second.inventory.files, [])
+        self.assertEqual(second.bytes_read, 0)
+        self.assertEqual(reused, summary)
+    
+    def test_only_changed_directory_is_recounted(self):
+        first, _ = self.analyze()
+        changed = self.root / 'src' / 'app.py'
+        changed.write_text('# app\n\nx = 1\ny = 2\n', encoding='utf-8')
+        
+        second, summary = self.analyze(self.previous(first))
+        self.assertEqual(second.inventory.unchanged, {'', 'docs'})
+        self.assertEqual(sorted(entry.rel_path for entry in second.inventory.files), ['src/app.py', 'src/util.py'])
+        # 同一目錄中未變更的文件重用文件層級的快取
+        self.assertEqual(second.bytes_read, changed.stat().st_size)
+        self.assertEqual(summary, self.analyze()[1])
+        self.assertEqual(summary['languages']['Python']['lines'], 6)
+    
+    def test_mtime_change_alone_changes_fingerprint(self):
+        first, _ = self.analyze()
+        guide = self.root / 'docs' / 'guide.md'
+        st = guide.stat()
+        os.utime(guide, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        second, _ = self.analyze(self.previous(first))
+        self.assertNotIn('docs', second.inventory.unchanged)
+
+if __name__ == '__main__':
+    unittest.main()
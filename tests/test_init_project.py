@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+init-project.py 的回歸測試
+"""
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INIT_PROJECT = REPO_ROOT / 'tools' / 'init-project.py'
+
+spec = importlib.util.spec_from_file_location('init_project', INIT_PROJECT)
+init_project = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(init_project)
+
+def run_init(*args):
+    """執行 init-project.py，返回輸出"""
+    result = subprocess.run(
+        [sys.executable, str(INIT_PROJECT), *args],
+        capture_output=True, text=True, encoding='utf-8', check=True
+    )
+    return result.stdout
+
+class UpdateAssetTest(unittest.TestCase):
+    """--update 對使用者修改過的模板資產的處理"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        run_init('demo', '-t', 'python-api', '-p', str(self.root), '--no-interactive', '--no-git')
+        self.project = self.root / 'demo'
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_edited_asset_is_kept_then_restored_with_force(self):
+        source = REPO_ROOT / 'validation-scripts' / 'validator.py'
+        asset = self.project / 'validation-scripts' / 'validator.py'
+        self.assertEqual(asset.read_bytes(), source.read_bytes())
+        
+        edited = source.read_bytes() + b'# local change\n'
+        asset.write_bytes(edited)
+        
+        output = run_init('demo', '-p', str(self.root), '--update')
+        self.assertIn('[KEEP]', output)
+        self.assertIn('validation-scripts/validator.py', output)
+        self.assertEqual(asset.read_bytes(), edited)
+        
+        output = run_init('demo', '-p', str(self.root), '--update', '--force')
+        self.assertNotIn('[KEEP]', output)
+        self.assertEqual(asset.read_bytes(), source.read_bytes())
+    
+    def test_edited_agent_config_is_kept(self):
+        agent = next((self.project / '.claude' / 'agents').glob('*.yaml'))
+        agent.write_text(agent.read_text(encoding='utf-8') + '# local change\n', encoding='utf-8')
+        
+        output = run_init('demo', '-p', str(self.root), '--update')
+        self.assertIn(f'.claude/agents/{agent.name}', output)
+        self.assertTrue(agent.read_text(encoding='utf-8').endswith('# local change\n'))
+
+@unittest.skipUnless(shutil.which('git'), '需要 git')
+class GitRepoWriterTest(unittest.TestCase):
+    """原生寫出的儲存庫與 git init && git add . && git commit 的結果一致"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.home = Path(self.tmp.name) / 'home'
+        self.home.mkdir()
+        self.project = Path(self.tmp.name) / 'demo'
+        files = {
+            '.gitignore': 'build/\n*.log\n',
+            'README.md': '# demo\n',
+            'src/app.py': 'print("app")\n',
+            'src/pkg/__init__.py': '',
+            'build/out.txt': 'ignored\n',
+            'debug.log': 'ignored\n',
+            'scripts/run.sh': '#!/bin/sh\necho run\n',
+        }
+        for rel_path, content in files.items():
+            path = self.project / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding='utf-8')
+        (self.project / 'scripts' / 'run.sh').chmod(0o755)
+        (self.project / 'empty').mkdir()
+        if hasattr(os, 'symlink'):
+            os.symlink('README.md', self.project / 'link.md')
+        
+        self.env = {
+            'HOME': str(self.home),
+            'XDG_CONFIG_HOME': str(self.home / '.config'),
+            'GIT_CONFIG_NOSYSTEM': '1',
+            'GIT_AUTHOR_NAME': 'Test Author',
+            'GIT_AUTHOR_EMAIL': 'author@example.com',
+            'GIT_COMMITTER_NAME': 'Test Committer',
+            'GIT_COMMITTER_EMAIL': 'committer@example.com',
+        }
+        patcher = mock.patch.dict(os.environ, self.env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def git(self, cwd: Path, *args) -> str:
+        result = subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True)
+        return result.stdout.strip()
+    
+    def write_native(self) -> str:
+        writer = init_project.GitRepoWriter(self.project)
+        self.assertTrue(writer.supported())
+        return writer.write(init_project.INITIAL_COMMIT_MESSAGE)
+    
+    def test_repository_passes_fsck(self):
+        commit = self.write_native()
+        self.git(self.project, 'fsck', '--strict', '--no-dangling')
+        self.assertEqual(self.git(self.project, 'rev-parse', 'HEAD'), commit)
+        self.assertEqual(self.git(self.project, 'log', '--format=%an <%ae>|%cn <%ce>|%s'),
+                         'Test Author <author@example.com>|Test Committer <committer@example.com>|'
+                         + init_project.INITIAL_COMMIT_MESSAGE)
+    
+    def test_tree_and_index_match_git_add(self):
+        reference = Path(self.tmp.name) / 'reference'
+        shutil.copytree(self.project, reference, symlinks=True)
+        self.git(reference, 'init', '-q')
+        self.git(reference, 'add', '.')
+        expected_tree = self.git(reference, 'write-tree')
+        expected_files = self.git(reference, 'ls-files', '-s')
+        
+        self.write_native()
+        self.assertEqual(self.git(self.project, 'rev-parse', 'HEAD^{tree}'), expected_tree)
+        self.assertEqual(self.git(self.project, 'ls-files', '-s'), expected_files)
+        self.assertEqual(self.git(self.project, 'status', '--porcelain'), '')
+    
+    def test_unsupported_ignore_rules_fall_back(self):
+        (self.project / '.gitignore').write_text('*.log\n!keep.log\n', encoding='utf-8')
+        self.assertFalse(init_project.GitRepoWriter(self.project).supported())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+validator.py 的回歸測試
+"""
+
+import ctypes
+import errno
+import importlib.util
+import io
+import platform
+import re
+import shutil
+import subprocess
+import tempfile
+import textwrap
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+spec = importlib.util.spec_from_file_location('validator', REPO_ROOT / 'validation-scripts' / 'validator.py')
+validator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(validator)
+
+def run_checks(validator_class, files: dict, config: dict) -> dict:
+    """在臨時的 Python 專案中運行驗證器，返回 {檢查名稱: ValidationResult}"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / 'requirements.txt').write_text('', encoding='utf-8')
+        for rel_path, content in files.items():
+            path = root / 'src' / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(textwrap.dedent(content), encoding='utf-8')
+        with redirect_stdout(io.StringIO()):
+            results = validator_class(root, dict(config)).run_all_checks()
+    return {result.check_name: result for result in results}
+
+class DuplicateImportTest(unittest.TestCase):
+    """重複導入檢查在 ast 與正規表示式兩種分析方式下的結果一致"""
+    
+    LOCAL_IMPORTS = {
+        'local.py': '''\
+            def load(path):
+                import json
+                return json.load(open(path))
+
+            def dump(data):
+                import json
+                return json.dumps(data)
+            ''',
+    }
+    
+    REPEATED_IMPORTS = {
+        'repeated.py': '''\
+            import json
+            import json
+
+            def load(path):
+                import os
+                import os
+                return os.path.exists(path)
+            ''',
+    }
+    
+    def checks(self, files: dict, backend: str) -> dict:
+        config = {'python_backend': backend}
+        results = run_checks(validator.CodeQualityValidator, files, config)
+        results.update(run_checks(validator.DuplicationValidator, files, config))
+        return results
+    
+    def test_function_local_imports_are_not_duplicates(self):
+        for backend in ('ast', 'regex'):
+            with self.subTest(backend=backend):
+                results = self.checks(self.LOCAL_IMPORTS, backend)
+                self.assertEqual(results['導入檢查'].warnings, [])
+                self.assertEqual(results['重複導入檢查'].warnings, [])
+    
+    def test_repeated_imports_in_same_scope_are_reported(self):
+        results = self.checks(self.REPEATED_IMPORTS, 'ast')
+        self.assertEqual(len(results['導入檢查'].warnings), 1)
+        lines = [warning.split(':')[1].split()[0] for warning in results['重複導入檢查'].warnings]
+        self.assertEqual(lines, ['2', '6'])
+
+@unittest.skipUnless(shutil.which('git'), '需要 git')
+class ChangedFilesScopeTest(unittest.TestCase):
+    """--changed-since / --staged 只回報變更的文件，跨文件檢查仍與整個專案比對"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'src').mkdir()
+        (self.root / 'requirements.txt').write_text('', encoding='utf-8')
+        self.write('a.py', 'def shared():\n    return "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"\n')
+        self.write('b.py', 'def other():\n    return 1\n')
+        self.git('init', '-q')
+        self.git('add', '-A')
+        self.git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'init')
+        self.write('b.py', 'def shared():\n    return "bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb"\n')
+        self.write('c.py', 'x = 1\n')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def write(self, name: str, content: str):
+        (self.root / 'src' / name).write_text(content, encoding='utf-8')
+    
+    def git(self, *args):
+        subprocess.run(['git', *args], cwd=self.root, check=True, capture_output=True)
+    
+    def results(self, config: dict) -> dict:
+        config = dict(config, max_line_length=20)
+        results = {}
+        for validator_class in (validator.CodeQualityValidator, validator.DuplicationValidator):
+            with redirect_stdout(io.StringIO()):
+                results.update((r.check_name, r) for r in validator_class(self.root, config).run_all_checks())
+        return results
+    
+    def test_changed_since_includes_modified_and_untracked_files(self):
+        scope = validator.scope_files(self.root, {'changed_since': 'HEAD'})
+        self.assertEqual(scope, [self.root / 'src' / 'b.py', self.root / 'src' / 'c.py'])
+    
+    def test_only_changed_files_are_reported(self):
+        results = self.results({'changed_since': 'HEAD'})
+        self.assertEqual(results['行長度檢查'].warnings, ['src/b.py:2 行長度 48 (建議不超過 20)'])
+        # 未變更的 a.py 仍作為重複函數的比對對象
+        self.assertEqual(len(results['重複函數檢查'].warnings), 1)
+        self.assertIn('src/a.py', results['重複函數檢查'].warnings[0])
+    
+    def test_staged_scope(self):
+        self.git('add', 'src/c.py')
+        self.assertEqual(validator.scope_files(self.root, {'staged': True}), [self.root / 'src' / 'c.py'])
+        results = self.results({'staged': True})
+        self.assertEqual(results['行長度檢查'].warnings, [])
+        self.assertEqual(results['重複函數檢查'].warnings, [])
+
+class RuleEngineTest(unittest.TestCase):
+    """安全規則引擎的關鍵字預先篩選"""
+    
+    def scan(self, text: str) -> list:
+        return validator.SecurityValidator.rule_engine('python').scan(text)
+    
+    def test_unicode_case_variant_is_detected(self):
+        # U+017F（ſ）在不分大小寫的比對中等同於 s
+        self.assertEqual(self.scan("\u017fecret_key = 'abcdefgh12345'\n"), [('secret-key', 1)])
+    
+    def test_overlapping_keywords_are_both_checked(self):
+        # select 與 token 重疊，token 的規則仍需驗證
+        self.assertEqual(self.scan('x = 1\nselectoken = "abcdefgh"\n'), [('secret-token', 2)])
+    
+    def test_security_check_reports_variant_secret(self):
+        files = {'a.py': "\u017fecret_key = 'abcdefgh12345'\n"}
+        result = run_checks(validator.SecurityValidator, files, {})['敏感資訊檢查']
+        self.assertEqual(result.errors, ['src/a.py:1 發現硬編碼的密鑰 [secret-key]'])
+        self.assertEqual(result.warnings, [])
+
+class SimilarFilesTest(unittest.TestCase):
+    """相似文件檢查回報近似重複的文件與重複代碼區塊的行範圍"""
+    
+    BLOCK = ''.join(f"    total_{i} = compute(values[{i}], weight={i * 3}, name='item{i}')\n" for i in range(10))
+    UNRELATED = ''.join(f"def helper_{i}(x):\n    return x ** {i} + {i * 7}\n\n" for i in range(8))
+    FILES = {
+        'a.py': 'def process(values):\n' + BLOCK + '    return total_0\n',
+        'b.py': 'def process(values):\n' + BLOCK + '    return total_1\n',
+        # 第 26-35 行複製自 a.py 第 2-11 行
+        'c.py': UNRELATED + 'def other(values):\n' + BLOCK + '    return None\n' + UNRELATED.replace('helper', 'tool'),
+        'd.py': UNRELATED.replace('helper', 'fn').replace('** ', '* '),
+    }
+    
+    BLOCK_PATTERN = re.compile(r'重複的代碼區塊: (\S+):(\d+)-(\d+) 和 (\S+):(\d+)-(\d+)')
+    
+    def warnings(self, config: dict = None) -> list:
+        return run_checks(validator.DuplicationValidator, self.FILES, config or {})['相似文件檢查'].warnings
+    
+    def blocks(self, warnings: list) -> dict:
+        found = {}
+        for warning in warnings:
+            match = self.BLOCK_PATTERN.match(warning)
+            if match:
+                first, first_start, first_end, second, second_start, second_end = match.groups()
+                found[first, second] = (int(first_start), int(first_end), int(second_start), int(second_end))
+        return found
+    
+    def test_near_duplicate_files_are_similar(self):
+        warnings = self.warnings()
+        self.assertTrue(any(w.startswith('文件可能相似: src/a.py 和 src/b.py') for w in warnings), warnings)
+        self.assertFalse(any('src/d.py' in w for w in warnings), warnings)
+    
+    def test_copied_block_is_located(self):
+        blocks = self.blocks(self.warnings())
+        self.assertNotIn(('src/a.py', 'src/b.py'), blocks)
+        first_start, first_end, second_start, second_end = blocks['src/a.py', 'src/c.py']
+        self.assertLessEqual(first_start, 2)
+        self.assertGreaterEqual(first_end, 11)
+        self.assertLessEqual(second_start, 26)
+        self.assertGreaterEqual(second_end, 35)
+    
+    def test_short_blocks_are_ignored(self):
+        blocks = self.blocks(self.warnings({'clone_min_lines': 20}))
+        self.assertEqual(blocks, {})
+
+class ResultCacheTest(unittest.TestCase):
+    """結果快取在文件、配置或驗證器本身變更時失效"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'requirements.txt').write_text('', encoding='utf-8')
+        (self.root / 'src').mkdir()
+        self.source = self.root / 'src' / 'app.py'
+        self.source.write_text('def main():\n    return 1\n', encoding='utf-8')
+        self.config = {'cache': True}
+        self.run_cached()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def run_cached(self) -> tuple:
+        checker = validator.CodeQualityValidator(self.root, dict(self.config))
+        with redirect_stdout(io.StringIO()):
+            checker.run_all_checks()
+        cache = checker.corpus.cache
+        return cache.hits, cache.misses
+    
+    def test_unchanged_project_reuses_results(self):
+        self.assertEqual(self.run_cached(), (1, 0))
+    
+    def test_edited_file_is_rescanned(self):
+        self.source.write_text('def main():\n    return 2\n\n', encoding='utf-8')
+        self.assertEqual(self.run_cached(), (0, 1))
+    
+    def test_config_change_invalidates_cache(self):
+        self.config['max_line_length'] = 80
+        self.assertEqual(self.run_cached(), (0, 1))
+    
+    def test_validator_change_invalidates_cache(self):
+        with mock.patch.object(validator, '_source_stamp', return_value='edited'):
+            self.assertEqual(self.run_cached(), (0, 1))
+            self.assertEqual(self.run_cached(), (1, 0))
+
+class GitIgnoreTest(unittest.TestCase):
+    """.gitignore 規則的轉換與比對"""
+    
+    def match(self, lines: list, rel_path: str, is_dir: bool = False):
+        return validator.GitIgnore(lines).match(rel_path, is_dir)
+    
+    def test_character_class(self):
+        self.assertTrue(self.match(['*.py[cod]'], 'a.pyc'))
+        self.assertIsNone(self.match(['*.py[cod]'], 'a.py'))
+        self.assertTrue(self.match(['x[a-c]'], 'x/xb'))
+        self.assertIsNone(self.match(['x[a-c]'], 'xd'))
+    
+    def test_negated_character_class(self):
+        for pattern in ('[!a]*.log', '[^a]*.log'):
+            with self.subTest(pattern=pattern):
+                self.assertTrue(self.match([pattern], 'b.log'))
+                self.assertIsNone(self.match([pattern], 'a.log'))
+        self.assertIsNone(self.match(['x[!a]y'], 'x/y'))
+    
+    def test_only_leading_bang_negates(self):
+        self.assertTrue(self.match(['x[a!]'], 'x!'))
+        self.assertIsNone(self.match(['x[a!]'], 'x^'))
+        self.assertTrue(self.match(['x[a^]'], 'x^'))
+    
+    def test_escapes_inside_class(self):
+        self.assertTrue(self.match(['x[\\]]'], 'x]'))
+        self.assertTrue(self.match(['x[]a]'], 'x]'))
+        self.assertTrue(self.match(['x[\\\\]'], 'x\\'))
+        self.assertTrue(self.match(['x['], 'x['))
+    
+    def test_double_star_directory(self):
+        self.assertTrue(self.match(['**/build'], 'build', True))
+        self.assertTrue(self.match(['**/build'], 'a/b/build', True))
+        self.assertTrue(self.match(['docs/**/*.tmp'], 'docs/a/b.tmp'))
+        self.assertIsNone(self.match(['docs/**/*.tmp'], 'src/docs/b.tmp'))
+    
+    def test_trailing_slash_matches_directories_only(self):
+        self.assertTrue(self.match(['logs/'], 'logs', True))
+        self.assertIsNone(self.match(['logs/'], 'logs', False))
+        self.assertTrue(self.match(['/root.txt'], 'root.txt'))
+        self.assertIsNone(self.match(['/root.txt'], 'sub/root.txt'))
+    
+    def test_bang_reincludes(self):
+        rules = ['*.log', '!keep.log']
+        self.assertTrue(self.match(rules, 'a.log'))
+        self.assertFalse(self.match(rules, 'keep.log'))
+        self.assertFalse(self.match(rules, 'sub/keep.log'))
+
+class FindingLimitTest(unittest.TestCase):
+    """發現上限：預設不限制，超出的部分只計數而不混入訊息列表"""
+    
+    FILES = {
+        'a.py': 'def one():\n    pass\n\ndef two():\n    pass\n\ndef three():\n    pass\n',
+        'b.py': 'def one():\n    pass\n\ndef two():\n    pass\n\ndef three():\n    pass\n',
+    }
+    
+    def duplicate_functions(self, config: dict):
+        return run_checks(validator.DuplicationValidator, self.FILES, config)['重複函數檢查']
+    
+    def test_caps_are_off_by_default(self):
+        result = self.duplicate_functions({})
+        self.assertEqual(len(result.warnings), 3)
+        self.assertEqual(result.suppressed_warnings, 0)
+    
+    def test_duplicate_functions_follow_per_file_cap(self):
+        result = self.duplicate_functions({'max_findings_per_file': 1})
+        self.assertEqual(len(result.warnings), 1)
+        self.assertEqual(result.suppressed_warnings, 2)
+        
+        data = result.to_dict()
+        self.assertEqual(data['warnings'], result.warnings)
+        self.assertEqual(data['suppressed_warnings'], 2)
+        self.assertEqual(result.warning_lines[-1], '... 另有 2 個警告未列出')
+        
+        restored = validator.ValidationResult.from_dict(data)
+        self.assertEqual(restored.suppressed_warnings, 2)
+        self.assertEqual(restored.warning_lines, result.warning_lines)
+
+@unittest.skipUnless(platform.system() == 'Linux', '需要 inotify')
+class InotifyWatcherTest(unittest.TestCase):
+    """監看模式的 inotify 監看器"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'src').mkdir()
+        (self.root / 'src' / 'app.py').write_text('x = 1\n', encoding='utf-8')
+        self.watcher = validator.InotifyWatcher(self.root / 'src', [], self.root, 0)
+    
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp.cleanup()
+    
+    def test_root_settings_files_trigger_rescan(self):
+        (self.root / 'README.md').write_text('readme\n', encoding='utf-8')
+        self.assertEqual(self.watcher.wait(0.5), (False, set()))
+        for name in ('.gitignore', 'validation-config.json'):
+            with self.subTest(name=name):
+                (self.root / name).write_text('changed\n', encoding='utf-8')
+                self.assertTrue(self.watcher.wait(0.5)[0])
+    
+    def test_source_change_is_reported(self):
+        path = self.root / 'src' / 'app.py'
+        path.write_text('x = 2\n', encoding='utf-8')
+        self.assertEqual(self.watcher.wait(0.5), (False, {Path(str(path))}))
+    
+    def test_watch_limit_falls_back_to_polling(self):
+        def exhausted(fd, path, mask):
+            ctypes.set_errno(errno.ENOSPC)
+            return -1
+        self.watcher._add_watch = exhausted
+        with redirect_stdout(io.StringIO()):
+            (self.root / 'src' / 'pkg').mkdir()
+            self.assertEqual(self.watcher.wait(0.5), (True, set()))
+        self.assertIsInstance(self.watcher.fallback, validator.PollingWatcher)
+        self.assertEqual(self.watcher.wait(0), (True, set()))
+
+if __name__ == '__main__':
+    unittest.main()
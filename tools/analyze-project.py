@@ -7,12 +7,21 @@ Project Analyzer - 專案分析與配置生成器
 
 import os
 import sys
+import csv
 import json
+import time
 import argparse
+import hashlib
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime
 import platform
 import re
+import unicodedata
 
 # 顏色輸出支援
 class Colors:
@@ -40,12 +49,318 @@ class Colors:
 if platform.system() == 'Windows' and sys.version_info < (3, 6):
     Colors.disable()
 
+class FileEntry:
+    """文件清單中的單一文件"""
+    __slots__ = ('path', 'rel_path', 'name', 'suffix', 'size', 'mtime', 'is_test', 'is_doc')
+    
+    def __init__(self, path: Path, rel_path: str, size: int, mtime: int):
+        self.path = path
+        self.rel_path = rel_path  # 以 / 分隔的相對路徑
+        self.name = path.name
+        self.suffix = os.path.splitext(self.name)[1]
+        self.size = size
+        self.mtime = mtime  # 納秒
+        lowered = rel_path.lower()
+        self.is_test = any(pattern in lowered for pattern in FileInventory.TEST_PATTERNS)
+        self.is_doc = self.suffix in FileInventory.DOC_EXTENSIONS
+
+class FileInventory:
+    """專案的文件清單
+
+    以單次剪枝的 os.scandir 遍歷收集所有文件的基本資訊（路徑、副檔名、大小、mtime、
+    是否為測試或文檔），供各項分析共用，不再由每項分析各自執行 rglob。
+    抽樣模式下以廣度優先遍歷，只進入 max_depth 層目錄、收集至多 max_files 個文件，
+    讓超大型專案也能在數秒內得到具代表性的結果。
+    指定 deadline（time.monotonic() 時刻）時，遍歷超過該時刻即停止，同樣視為抽樣。
+
+    遍歷過程記錄進入的目錄數（dirs_visited）與 stat 過的文件數（files_stated）；
+    指定 progress 時，每遍歷完一個目錄以 files_stated 呼叫一次。
+
+    每個目錄以其直接文件的 名稱 + 大小 + mtime 計算指紋；指紋與 known 中記錄的相同時，
+    該目錄列入 unchanged，不為其文件建立 FileEntry，由呼叫端重用上次的統計。
+    """
+    
+    # 不進入的目錄（依目錄名稱比對）
+    SKIP_DIRS = {'node_modules', '__pycache__', '.git', 'venv', 'build', 'dist'}
+    TEST_PATTERNS = ['test_', '_test', 'spec.', '.spec', 'tests/', 'test/']
+    DOC_EXTENSIONS = ['.md', '.rst', '.txt']
+    
+    def __init__(self, root: Path, max_depth: int = None, max_files: int = None, known: dict = None,
+                 deadline: float = None, progress=None):
+        self.root = root
+        self.max_depth = max_depth
+        self.max_files = max_files
+        self.known = known or {}  # {目錄相對路徑: 上次的指紋}
+        self.deadline = deadline
+        self.progress = progress
+        self.files = []  # 變更目錄中的 FileEntry 列表（同一目錄內依名稱排序）
+        self.directories = []  # 目錄的相對路徑（依路徑排序）
+        self.fingerprints = {}  # {目錄相對路徑: 指紋}，依遍歷順序（根目錄為 ''）
+        self.unchanged = set()  # 指紋與上次相同的目錄
+        self.truncated = False  # 是否因抽樣限制而未遍歷完整個專案
+        self.out_of_time = False  # 是否因超過 deadline 而提前結束
+        self.dirs_visited = 0
+        self.files_stated = 0
+        self._scan()
+    
+    @property
+    def sampled(self) -> bool:
+        return self.max_depth is not None or self.max_files is not None or self.out_of_time
+    
+    def _scan(self):
+        """廣度優先遍歷專案目錄，略過 SKIP_DIRS 中的目錄，達到抽樣限制或 deadline 時提前結束"""
+        queue = deque([('', 0)])
+        while queue:
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                self.truncated = self.out_of_time = True
+                break
+            rel_dir, depth = queue.popleft()
+            try:
+                with os.scandir(self.root / rel_dir) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            self.dirs_visited += 1
+            
+            files = []  # (DirEntry, 相對路徑, stat)
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in self.SKIP_DIRS:
+                            continue
+                        if self.max_depth is not None and depth >= self.max_depth:
+                            self.truncated = True
+                            continue
+                        self.directories.append(rel_path)
+                        queue.append((rel_path, depth + 1))
+                    elif entry.is_file():
+                        if self.max_files is not None and len(self.files) + len(files) >= self.max_files:
+                            self.truncated = True
+                            queue.clear()
+                            break
+                        files.append((entry, rel_path, entry.stat()))
+                        self.files_stated += 1
+                except OSError:
+                    continue
+            
+            digest = hashlib.blake2b(digest_size=16)
+            for entry, _, st in files:
+                digest.update(b'%s\0%d\0%d\n' % (os.fsencode(entry.name), st.st_size, st.st_mtime_ns))
+            fingerprint = digest.hexdigest()
+            self.fingerprints[rel_dir] = fingerprint
+            if self.known.get(rel_dir) == fingerprint:
+                self.unchanged.add(rel_dir)
+            else:
+                self.files.extend(
+                    FileEntry(Path(entry.path), rel_path, st.st_size, st.st_mtime_ns)
+                    for entry, rel_path, st in files
+                )
+            if self.progress is not None:
+                self.progress(self.files_stated)
+        self.directories.sort()
+
+# 行數統計：以大區塊讀取原始位元組，不解碼也不建立每行的字串列表
+READ_CHUNK_SIZE = 1 << 20
+BLANK_LINE = re.compile(rb'^[ \t\r\f\v]*\n', re.MULTILINE)
+BLOCK_COMMENT_START = re.compile(rb'^[ \t]*/\*', re.MULTILINE)
+
+def merge_totals(total: dict, part: dict):
+    """將一個目錄的小計累加到總計（數值相加、字典遞迴合併、列表串接）"""
+    for key, value in part.items():
+        if isinstance(value, dict):
+            merge_totals(total.setdefault(key, {}), value)
+        elif isinstance(value, list):
+            total.setdefault(key, []).extend(value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+def comment_pattern(line_comments, block_comments: bool):
+    """建立比對註解行的正規表示式（行首的行註解，或行首開始的區塊註解）"""
+    alternatives = [re.escape(prefix) + rb'[^\n]*' for prefix in line_comments]
+    if block_comments:
+        alternatives.append(rb'/\*(?s:.*?)\*/')
+    return re.compile(rb'^[ \t]*(?:' + b'|'.join(alternatives) + rb')', re.MULTILINE)
+
+def unclosed_block_comment(data: bytes, matches: list, end: int):
+    """返回第一個沒有被比對成註解的行首 /* 位置（沒有時返回 None）"""
+    index = 0
+    for opened in BLOCK_COMMENT_START.finditer(data, 0, end):
+        start = opened.start()
+        while index < len(matches) and matches[index].end() <= start:
+            index += 1
+        if index < len(matches) and matches[index].start() <= start:
+            continue  # 位於某個註解之內，或本身就是已閉合的區塊註解
+        return start
+    return None
+
+def count_lines(path: Path, pattern=None, block_comments: bool = False):
+    """統計文件的 (總行數, 代碼行, 空白行, 註解行)
+
+    每行只歸入一類：區塊註解中的空白行算作空白行，註解結束後同一行還有代碼（例如 /* x */ int b;）時算作代碼行。
+    """
+    lines = blank = comment = 0
+    carry = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            data = carry + chunk
+            if not data:
+                break
+            # 只處理完整的行
+            cut = data.rfind(b'\n') + 1 if chunk else len(data)
+            matches = list(pattern.finditer(data, 0, cut)) if pattern is not None else []
+            if chunk and block_comments and len(data) <= 8 * READ_CHUNK_SIZE:
+                # 未閉合的區塊註解（可能在下一個區塊才結束）從該行起留到下一個區塊一起處理
+                unclosed = unclosed_block_comment(data, matches, cut)
+                if unclosed is not None:
+                    cut = unclosed
+                    matches = [match for match in matches if match.end() <= cut]
+            if cut == 0:
+                carry = data
+                continue
+            data, carry = data[:cut], data[cut:]
+            
+            lines += data.count(b'\n')
+            blank += len(BLANK_LINE.findall(data))
+            if not data.endswith(b'\n'):
+                # 沒有換行結尾的最後一行
+                lines += 1
+                if not data[data.rfind(b'\n') + 1:].strip():
+                    blank += 1
+            for match in matches:
+                text = match.group()
+                comment += text.count(b'\n') + 1 - len(BLANK_LINE.findall(text))
+                line_end = data.find(b'\n', match.end())
+                rest = data[match.end():line_end if line_end >= 0 else len(data)].strip()
+                if rest and not pattern.match(rest):
+                    comment -= 1
+            if not chunk:
+                break
+    sloc = lines - blank - comment
+    return lines, sloc, blank, comment
+
+class ProgressLine:
+    """在終端的同一行顯示長時間步驟的進度（已處理的文件數、每秒文件數與預估剩餘時間）
+
+    只在標準輸出為終端時顯示；DELAY 秒內完成的步驟不顯示，之後每 INTERVAL 秒最多更新一次。
+    速度從第一次 update 起計算，不含步驟開始前的準備時間（例如提交執行緒池任務）。
+    """
+    
+    DELAY = 0.5
+    INTERVAL = 0.2
+    
+    def __init__(self, label: str, total: int = None):
+        self.label = label
+        self.total = total  # 預估的總文件數（未知時不顯示預估剩餘時間）
+        self.enabled = sys.stdout.isatty()
+        self.started = None  # 第一次 update 的 (時刻, 已處理數)
+        self.updated = 0.0
+        self.width = 0  # 目前顯示的寬度
+    
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        minutes, seconds = divmod(int(seconds + 0.5), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+    
+    def update(self, done: int):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self.started is None:
+            self.started = (now, done)
+            return
+        started, initial = self.started
+        if now - started < self.DELAY or now - self.updated < self.INTERVAL:
+            return
+        self.updated = now
+        rate = (done - initial) / (now - started)
+        line = f"  {self.label}: {done:,} 個文件，{rate:,.0f} 個/秒"
+        if self.total and rate and done < self.total:
+            line += f"，預估剩餘 {self.format_duration((self.total - done) / rate)}"
+        # 中文字元佔兩格，以空白覆蓋上次較長的內容
+        width = sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in line)
+        sys.stdout.write('\r' + line + ' ' * max(0, self.width - width))
+        sys.stdout.flush()
+        self.width = width
+    
+    def close(self):
+        """清除進度行"""
+        if self.width:
+            sys.stdout.write('\r' + ' ' * self.width + '\r')
+            sys.stdout.flush()
+            self.width = 0
+
 class ProjectAnalyzer:
     """專案分析器"""
     
-    def __init__(self, project_path: Path):
+    # 各種語言的特徵文件（* 開頭表示副檔名）
+    LANGUAGE_INDICATORS = {
+        'JavaScript/TypeScript': ['package.json', '*.js', '*.ts', '*.jsx', '*.tsx'],
+        'Python': ['requirements.txt', 'setup.py', 'pyproject.toml', '*.py'],
+        'Dart/Flutter': ['pubspec.yaml', '*.dart'],
+        'Java': ['pom.xml', 'build.gradle', '*.java'],
+        'Go': ['go.mod', '*.go'],
+        'Rust': ['Cargo.toml', '*.rs'],
+        'Ruby': ['Gemfile', '*.rb'],
+        'PHP': ['composer.json', '*.php'],
+        'C#': ['*.csproj', '*.cs'],
+        'Swift': ['Package.swift', '*.swift']
+    }
+    
+    CONFIDENCE_LABELS = {'high': '高', 'medium': '中', 'low': '低'}
+    
+    KEY_FILES = ['README.md', 'CLAUDE.md', 'package.json', 'requirements.txt',
+                 'pubspec.yaml', 'Dockerfile', '.gitignore']
+    CODE_EXTENSIONS = ['.py', '.js', '.ts', '.dart', '.java', '.go', '.rs']
+    CONFIG_EXTENSIONS = ['.json', '.yml', '.yaml', '.toml', '.ini']
+    
+    # 各語言的註解語法: (行註解前綴, 是否支援 /* */ 區塊註解)
+    COMMENT_SYNTAX = {
+        'JavaScript/TypeScript': ((b'//',), True),
+        'Python': ((b'#',), False),
+        'Dart/Flutter': ((b'//',), True),
+        'Java': ((b'//',), True),
+        'Go': ((b'//',), True),
+        'Rust': ((b'//',), True),
+        'Ruby': ((b'#',), False),
+        'PHP': ((b'//', b'#'), True),
+        'C#': ((b'//',), True),
+        'Swift': ((b'//',), True),
+    }
+    
+    # 分析快取格式版本（統計方式變更時遞增）
+    CACHE_VERSION = 3
+    
+    # 時間預算的分配：目錄遍歷最多用到預算的 50%，行數統計最多用到 90%，其餘留給後續分析與寫出報告
+    WALK_BUDGET_SHARE = 0.5
+    COUNT_BUDGET_SHARE = 0.9
+    
+    def __init__(self, project_path: Path, max_depth: int = None, max_files: int = None,
+                 previous: dict = None, jobs: int = None, budget: float = None):
         self.project_path = project_path
         self.project_name = project_path.name
+        self.max_depth = max_depth
+        self.max_files = max_files
+        self.jobs = jobs or min(32, (os.cpu_count() or 1) * 4)
+        self.budget = budget  # 時間預算（秒），超過時改為抽樣
+        self.started = time.monotonic()
+        self._inventory = None
+        self._summary = None
+        self.bytes_read = 0  # 統計行數時讀取的位元組數
+        self.lines_skipped = 0  # 因時間預算用盡而未統計行數的文件數
+        self.stages = []  # 各分析階段的耗時與計數
+        # 上次的分析結果（project-analysis.json），用於重用未變更目錄與文件的統計
+        cache = (previous or {}).get('cache', {})
+        if cache.get('version') != self.CACHE_VERSION or (previous or {}).get('project_path') != str(project_path):
+            cache = {}
+        self.previous_files = cache.get('files', {})
+        self.previous_directories = cache.get('directories', {})
+        # 上次的總文件數，用於估計遍歷的剩餘時間
+        self.expected_files = None
+        if (previous or {}).get('project_path') == str(project_path):
+            self.expected_files = previous.get('structure', {}).get('total_files')
         self.analysis_results = {
             'project_name': self.project_name,
             'project_path': str(project_path),
@@ -59,57 +374,158 @@ class ProjectAnalyzer:
             'recommendations': []
         }
     
+    @property
+    def inventory(self) -> FileInventory:
+        """專案文件清單（首次存取時遍歷一次目錄，所有分析共用）"""
+        if self._inventory is None:
+            # 抽樣模式下目錄可能只遍歷了一部分，不重用目錄統計
+            known = {}
+            if self.max_depth is None and self.max_files is None:
+                known = {rel_dir: info['fingerprint'] for rel_dir, info in self.previous_directories.items()}
+            progress = ProgressLine('遍歷目錄', self.expected_files)
+            try:
+                self._inventory = FileInventory(self.project_path, self.max_depth, self.max_files, known,
+                                                self.deadline(self.WALK_BUDGET_SHARE), progress.update)
+            finally:
+                progress.close()
+        return self._inventory
+    
+    @property
+    def summary(self) -> dict:
+        """整個專案的文件統計（首次存取時彙總各目錄的小計）"""
+        if self._summary is None:
+            self._summary = self.summarize()
+        return self._summary
+    
+    @property
+    def degraded(self) -> bool:
+        """是否因時間預算用盡而改為抽樣"""
+        return (self._inventory is not None and self._inventory.out_of_time) or self.lines_skipped > 0
+    
+    def deadline(self, share: float):
+        """時間預算中 share 比例對應的 time.monotonic() 時刻（未設定預算時為 None）"""
+        return None if self.budget is None else self.started + self.budget * share
+    
+    def counters(self) -> dict:
+        """目前為止遍歷的目錄數、stat 過的文件數與讀取的位元組數"""
+        inventory = self._inventory
+        return {
+            'dirs_visited': inventory.dirs_visited if inventory else 0,
+            'files_stated': inventory.files_stated if inventory else 0,
+            'bytes_read': self.bytes_read,
+        }
+    
+    def run_stage(self, name: str, stage):
+        """執行一個分析階段，記錄其耗時與計數的增量"""
+        before = self.counters()
+        wall, cpu = time.perf_counter(), time.process_time()
+        stage()
+        record = {
+            'stage': name,
+            'wall': round(time.perf_counter() - wall, 4),
+            'cpu': round(time.process_time() - cpu, 4),
+        }
+        after = self.counters()
+        record.update({key: after[key] - before[key] for key in after})
+        self.stages.append(record)
+    
     def analyze(self):
         """執行完整分析"""
         print(f"\n{Colors.GREEN}分析專案: {self.project_name}{Colors.ENDC}")
         print(f"{Colors.GREEN}路徑: {self.project_path}{Colors.ENDC}\n")
         
+        # 文件清單與統計由各項分析共用，先單獨執行以分開計時
+        cpu = time.process_time()
+        self.run_stage('inventory', lambda: self.inventory)
+        self.run_stage('summary', lambda: self.summary)
+        
         # 各項分析
-        self.detect_languages()
-        self.detect_project_type()
-        self.detect_frameworks()
-        self.analyze_structure()
-        self.analyze_dependencies()
-        self.calculate_metrics()
-        self.generate_recommendations()
+        for stage in (self.detect_languages, self.detect_project_type, self.detect_frameworks,
+                      self.analyze_structure, self.analyze_dependencies, self.calculate_metrics,
+                      self.generate_recommendations):
+            self.run_stage(stage.__name__, stage)
+        
+        performance = {
+            'wall': round(time.monotonic() - self.started, 4),
+            'cpu': round(time.process_time() - cpu, 4),
+            'budget': self.budget,
+            'degraded': self.degraded,
+            **self.counters(),
+            'stages': self.stages,
+        }
+        self.analysis_results['performance'] = performance
+        print(f"\n  分析耗時: {performance['wall']:.2f} 秒（{performance['dirs_visited']:,} 個目錄、"
+              f"{performance['files_stated']:,} 個文件、讀取 {performance['bytes_read'] / (1 << 20):.1f} MB）")
+        if self.degraded:
+            print(f"  {Colors.YELLOW}⚠{Colors.ENDC} 超過 {self.budget:g} 秒時間預算的部分已改為抽樣，統計結果可能不完整")
         
         return self.analysis_results
     
+    @classmethod
+    def extension_map(cls) -> dict:
+        """副檔名 -> 語言（*.ts 等副檔名只對應一種語言）"""
+        return {
+            indicator[1:]: language
+            for language, indicators in cls.LANGUAGE_INDICATORS.items()
+            for indicator in indicators if indicator.startswith('*')
+        }
+    
     def detect_languages(self):
-        """檢測使用的程式語言"""
+        """檢測使用的程式語言，並統計各語言的文件佔比與判斷信心"""
         print(f"{Colors.CYAN}檢測程式語言...{Colors.ENDC}")
-        languages = []
-        
-        # 檢測各種語言的特徵文件
-        language_indicators = {
-            'JavaScript/TypeScript': ['package.json', '*.js', '*.ts', '*.jsx', '*.tsx'],
-            'Python': ['requirements.txt', 'setup.py', 'pyproject.toml', '*.py'],
-            'Dart/Flutter': ['pubspec.yaml', '*.dart'],
-            'Java': ['pom.xml', 'build.gradle', '*.java'],
-            'Go': ['go.mod', '*.go'],
-            'Rust': ['Cargo.toml', '*.rs'],
-            'Ruby': ['Gemfile', '*.rb'],
-            'PHP': ['composer.json', '*.php'],
-            'C#': ['*.csproj', '*.cs'],
-            'Swift': ['Package.swift', '*.swift']
-        }
         
-        for language, indicators in language_indicators.items():
-            for indicator in indicators:
-                if indicator.startswith('*'):
-                    # 檢查文件擴展名
-                    if list(self.project_path.rglob(indicator)):
-                        languages.append(language)
-                        break
-                else:
-                    # 檢查特定文件
-                    if (self.project_path / indicator).exists():
-                        languages.append(language)
-                        break
-        
-        self.analysis_results['languages'] = list(set(languages))
-        for lang in self.analysis_results['languages']:
-            print(f"  {Colors.GREEN}✓{Colors.ENDC} {lang}")
+        counts = self.summary['language_files']
+        total = sum(counts.values())
+        
+        stats = {}
+        for language, indicators in self.LANGUAGE_INDICATORS.items():
+            # 特徵文件只檢查根目錄，找到第一個即停止
+            manifest = any(
+                (self.project_path / indicator).exists()
+                for indicator in indicators if not indicator.startswith('*')
+            )
+            files = counts.get(language, 0)
+            if not manifest and not files:
+                continue
+            
+            share = files / total if total else 0.0
+            if (manifest and share >= 0.05) or share >= 0.3:
+                confidence = 'high'
+            elif manifest or share >= 0.05:
+                confidence = 'medium'
+            else:
+                confidence = 'low'
+            stats[language] = {'files': files, 'share': round(share, 3), 'confidence': confidence}
+        
+        # 依文件佔比排序，主要語言在前
+        languages = sorted(stats, key=lambda lang: (-stats[lang]['share'], lang))
+        self.analysis_results['languages'] = languages
+        self.analysis_results['language_stats'] = {lang: stats[lang] for lang in languages}
+        if self.inventory.sampled or self.lines_skipped:
+            sampling = {
+                'max_depth': self.max_depth,
+                'max_files': self.max_files,
+                'files_scanned': len(self.inventory.files),
+                'truncated': self.inventory.truncated,
+            }
+            if self.budget is not None:
+                sampling.update({
+                    'budget': self.budget,
+                    'out_of_time': self.inventory.out_of_time,
+                    'lines_skipped': self.lines_skipped,
+                })
+            self.analysis_results['sampling'] = sampling
+        
+        for lang in languages:
+            info = stats[lang]
+            print(f"  {Colors.GREEN}✓{Colors.ENDC} {lang} "
+                  f"({info['share']:.0%}，信心: {self.CONFIDENCE_LABELS[info['confidence']]})")
+        if self.inventory.out_of_time:
+            print(f"  {Colors.YELLOW}⚠{Colors.ENDC} 時間預算用盡：只遍歷了 {len(self.inventory.files)} 個文件")
+        elif self.inventory.truncated:
+            print(f"  {Colors.YELLOW}⚠{Colors.ENDC} 抽樣模式：只分析了 {len(self.inventory.files)} 個文件")
+        if self.lines_skipped:
+            print(f"  {Colors.YELLOW}⚠{Colors.ENDC} 時間預算用盡：{self.lines_skipped} 個文件未統計行數")
     
     def detect_project_type(self):
         """檢測專案類型"""
@@ -215,32 +631,19 @@ class ProjectAnalyzer:
         """分析專案結構"""
         print(f"\n{Colors.CYAN}分析專案結構...{Colors.ENDC}")
         
+        summary = self.summary
         structure = {
             'directories': [],
-            'key_files': [],
-            'total_files': 0,
-            'file_types': {}
+            'key_files': summary['key_files'],
+            'total_files': summary['files'],
+            'file_types': summary['file_types']
         }
         
-        # 統計目錄和文件
-        for item in self.project_path.rglob('*'):
-            if any(skip in str(item) for skip in ['node_modules', '__pycache__', '.git', 'venv', 'build', 'dist']):
-                continue
-            
-            if item.is_dir():
-                rel_path = item.relative_to(self.project_path)
-                if len(rel_path.parts) <= 2:  # 只記錄前兩層目錄
-                    structure['directories'].append(str(rel_path))
-            elif item.is_file():
-                structure['total_files'] += 1
-                ext = item.suffix.lower()
-                structure['file_types'][ext] = structure['file_types'].get(ext, 0) + 1
-                
-                # 記錄關鍵文件
-                key_files = ['README.md', 'CLAUDE.md', 'package.json', 'requirements.txt', 
-                           'pubspec.yaml', 'Dockerfile', '.gitignore']
-                if item.name in key_files:
-                    structure['key_files'].append(item.name)
+        # 統計目錄
+        structure['directories'] = [
+            str(Path(rel_path)) for rel_path in self.inventory.directories
+            if rel_path.count('/') < 2  # 只記錄前兩層目錄
+        ]
         
         self.analysis_results['structure'] = structure
         print(f"  總文件數: {structure['total_files']}")
@@ -284,49 +687,167 @@ class ProjectAnalyzer:
         """計算專案指標"""
         print(f"\n{Colors.CYAN}計算專案指標...{Colors.ENDC}")
         
+        summary = self.summary
         metrics = {
+            'lines_of_code': summary['lines_of_code'],
+            'test_files': summary['test_files'],
+            'documentation_files': summary['documentation_files'],
+            'config_files': summary['config_files'],
+            'languages': summary['languages']
+        }
+        
+        self.analysis_results['metrics'] = metrics
+        print(f"  代碼行數: {metrics['lines_of_code']:,}")
+        for language, stats in sorted(metrics['languages'].items(), key=lambda item: -item[1]['lines']):
+            print(f"    {language}: 代碼 {stats['sloc']:,} / 註解 {stats['comment']:,} / 空白 {stats['blank']:,}")
+        print(f"  測試文件: {metrics['test_files']}")
+        print(f"  文檔文件: {metrics['documentation_files']}")
+        print(f"  配置文件: {metrics['config_files']}")
+    
+    def summarize(self) -> dict:
+        """彙總各目錄的文件統計
+
+        指紋與上次相同的目錄直接重用上次記錄的小計，只有變更的目錄才重新分類文件並統計行數；
+        各目錄的指紋與小計記錄在 analysis_results['cache'] 中，供下次分析重用。
+        """
+        inventory = self.inventory
+        line_counts = self.count_source_lines()
+        
+        entries = {}
+        for entry in inventory.files:
+            entries.setdefault(entry.rel_path.rpartition('/')[0], []).append(entry)
+        
+        summary = self.directory_totals([], {})
+        directories = {}
+        for rel_dir, fingerprint in inventory.fingerprints.items():
+            if rel_dir in inventory.unchanged:
+                totals = self.previous_directories[rel_dir]['totals']
+            else:
+                totals = self.directory_totals(entries.get(rel_dir, []), line_counts)
+            merge_totals(summary, totals)
+            directories[rel_dir] = {'fingerprint': fingerprint, 'totals': totals}
+        
+        # 記錄每個文件和目錄的統計，下次分析時重用
+        sizes = {entry.rel_path: (entry.size, entry.mtime) for entry in inventory.files}
+        files = {rel_path: [*sizes[rel_path], *counted] for rel_path, counted in line_counts.items()}
+        for rel_path, cached in self.previous_files.items():
+            if rel_path.rpartition('/')[0] in inventory.unchanged:
+                files[rel_path] = cached
+        cache = {'version': self.CACHE_VERSION, 'files': dict(sorted(files.items()))}
+        # 抽樣或有文件未統計行數時，目錄小計不完整，不記錄
+        if not inventory.sampled and not self.lines_skipped:
+            cache['directories'] = directories
+        self.analysis_results['cache'] = cache
+        return summary
+    
+    def directory_totals(self, entries: list, line_counts: dict) -> dict:
+        """統計一個目錄中直接文件的小計"""
+        extension_map = self.extension_map()
+        totals = {
+            'files': 0,
+            'file_types': {},
+            'key_files': [],
+            'language_files': {},
             'lines_of_code': 0,
             'test_files': 0,
             'documentation_files': 0,
-            'config_files': 0
+            'config_files': 0,
+            'languages': {}
         }
-        
-        # 統計代碼行數和文件類型
-        code_extensions = ['.py', '.js', '.ts', '.dart', '.java', '.go', '.rs']
-        test_patterns = ['test_', '_test', 'spec.', '.spec', 'tests/', 'test/']
-        doc_extensions = ['.md', '.rst', '.txt']
-        config_patterns = ['.json', '.yml', '.yaml', '.toml', '.ini']
-        
-        for file_path in self.project_path.rglob('*'):
-            if any(skip in str(file_path) for skip in ['node_modules', '__pycache__', '.git', 'venv']):
-                continue
+        for entry in entries:
+            totals['files'] += 1
+            ext = entry.suffix.lower()
+            totals['file_types'][ext] = totals['file_types'].get(ext, 0) + 1
+            
+            # 記錄關鍵文件
+            if entry.name in self.KEY_FILES:
+                totals['key_files'].append(entry.name)
+            
+            language = extension_map.get(entry.suffix)
+            if language:
+                totals['language_files'][language] = totals['language_files'].get(language, 0) + 1
             
-            if file_path.is_file():
+            counted = line_counts.get(entry.rel_path)
+            if counted is not None:
+                lines, sloc, blank, comment = counted
                 # 統計代碼行數
-                if file_path.suffix in code_extensions:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            metrics['lines_of_code'] += len(f.readlines())
-                    except:
-                        pass
+                if entry.suffix in self.CODE_EXTENSIONS:
+                    totals['lines_of_code'] += lines
                 
-                # 統計測試文件
-                if any(pattern in str(file_path).lower() for pattern in test_patterns):
-                    metrics['test_files'] += 1
-                
-                # 統計文檔文件
-                if file_path.suffix in doc_extensions:
-                    metrics['documentation_files'] += 1
-                
-                # 統計配置文件
-                if file_path.suffix in config_patterns:
-                    metrics['config_files'] += 1
+                # 各語言的行數細項
+                stats = totals['languages'].setdefault(
+                    language,
+                    {'files': 0, 'lines': 0, 'sloc': 0, 'blank': 0, 'comment': 0}
+                )
+                stats['files'] += 1
+                stats['lines'] += lines
+                stats['sloc'] += sloc
+                stats['blank'] += blank
+                stats['comment'] += comment
+            
+            # 統計測試文件
+            if entry.is_test:
+                totals['test_files'] += 1
+            
+            # 統計文檔文件
+            if entry.is_doc:
+                totals['documentation_files'] += 1
+            
+            # 統計配置文件
+            if entry.suffix in self.CONFIG_EXTENSIONS:
+                totals['config_files'] += 1
+        return totals
+    
+    def count_source_lines(self) -> dict:
+        """以執行緒池統計變更目錄中源代碼文件的行數，未變更的文件重用上次的結果
+
+        返回 {相對路徑: (總行數, 代碼行, 空白行, 註解行)}，無法讀取的文件不列入。
+        設定時間預算時，超過預算 COUNT_BUDGET_SHARE 比例後尚未開始的文件不再統計，計入 lines_skipped。
+        """
+        extension_map = self.extension_map()
+        patterns = {
+            language: comment_pattern(prefixes, block)
+            for language, (prefixes, block) in self.COMMENT_SYNTAX.items()
+        }
         
-        self.analysis_results['metrics'] = metrics
-        print(f"  代碼行數: {metrics['lines_of_code']:,}")
-        print(f"  測試文件: {metrics['test_files']}")
-        print(f"  文檔文件: {metrics['documentation_files']}")
-        print(f"  配置文件: {metrics['config_files']}")
+        results = {}
+        pending = []
+        for entry in self.inventory.files:
+            language = extension_map.get(entry.suffix)
+            if language is None:
+                continue
+            cached = self.previous_files.get(entry.rel_path)
+            if cached and cached[:2] == [entry.size, entry.mtime]:
+                results[entry.rel_path] = tuple(cached[2:])
+            else:
+                pending.append((entry, language))
+        
+        deadline = self.deadline(self.COUNT_BUDGET_SHARE)
+        skipped = []
+        
+        def count(item):
+            entry, language = item
+            if deadline is not None and time.monotonic() > deadline:
+                skipped.append(entry)
+                return None
+            try:
+                return count_lines(entry.path, patterns[language], self.COMMENT_SYNTAX[language][1])
+            except OSError:
+                return None
+        
+        if pending:
+            progress = ProgressLine('統計行數', len(pending))
+            try:
+                with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                    for done, ((entry, _), counted) in enumerate(zip(pending, executor.map(count, pending)), 1):
+                        if counted is not None:
+                            results[entry.rel_path] = counted
+                            self.bytes_read += entry.size
+                        progress.update(done)
+            finally:
+                progress.close()
+        self.lines_skipped = len(skipped)
+        return results
     
     def generate_recommendations(self):
         """生成建議"""
@@ -499,16 +1020,222 @@ def save_analysis_report(analysis_results, output_path):
     
     print(f"  {Colors.GREEN}✓{Colors.ENDC} Markdown 報告：{md_path}")
 
+def load_previous_analysis(output_path: Path):
+    """讀取上次的分析報告作為快取（不存在或無法解析時返回 None）"""
+    try:
+        with open(output_path / 'project-analysis.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def run_analysis(project_path: Path, output_path: Path, args):
+    """分析一個專案並依命令列選項生成 CLAUDE.md 與分析報告"""
+    output_path.mkdir(parents=True, exist_ok=True)
+    
+    # 上次的分析報告同時作為快取，重用未變更目錄和文件的統計
+    previous = None if args.no_cache else load_previous_analysis(output_path)
+    
+    # 執行分析
+    analyzer = ProjectAnalyzer(project_path, args.max_depth, args.max_files, previous, args.jobs, args.budget)
+    results = analyzer.analyze()
+    
+    # 生成配置和報告
+    if not args.no_claude:
+        generate_claude_config(results, output_path)
+    
+    if not args.no_report:
+        save_analysis_report(results, output_path)
+    
+    return results
+
+# 批次報告的欄位（CSV 欄位順序）
+BATCH_FIELDS = ['project_name', 'project_path', 'status', 'elapsed', 'error', 'project_type',
+                'languages', 'frameworks', 'total_files', 'lines_of_code', 'test_files',
+                'documentation_files', 'dependencies', 'recommendations', 'degraded']
+
+def batch_worker(conn, project_path: str, output_path: str, args):
+    """批次模式的子進程：分析一個專案，將摘要經由管道傳回主進程"""
+    started = time.monotonic()
+    row = {'project_name': Path(project_path).name, 'project_path': project_path}
+    try:
+        if not Path(project_path).is_dir():
+            raise FileNotFoundError(f"專案路徑不存在: {project_path}")
+        # 子進程的逐步輸出會交錯，只由主進程回報進度
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+            results = run_analysis(Path(project_path), Path(output_path), args)
+        row.update({
+            'status': 'ok',
+            'project_type': results['project_type'],
+            'languages': results['languages'],
+            'frameworks': results['frameworks'],
+            'total_files': results['structure']['total_files'],
+            'lines_of_code': results['metrics']['lines_of_code'],
+            'test_files': results['metrics']['test_files'],
+            'documentation_files': results['metrics']['documentation_files'],
+            'dependencies': results['dependencies']['total'],
+            'recommendations': len(results['recommendations']),
+            'degraded': results['performance']['degraded'],
+        })
+    except Exception as e:
+        row.update({'status': 'error', 'error': str(e) or type(e).__name__})
+    row['elapsed'] = round(time.monotonic() - started, 2)
+    conn.send(row)
+    conn.close()
+
+def batch_projects(args) -> list:
+    """列出批次模式要分析的專案：--batch 目錄下的各個子目錄，或 --from-list 文件中的路徑"""
+    if args.batch:
+        root = Path(args.batch).resolve()
+        if not root.is_dir():
+            print(f"{Colors.RED}錯誤：批次目錄不存在: {root}{Colors.ENDC}")
+            sys.exit(1)
+        return sorted(
+            path for path in root.iterdir()
+            if path.is_dir() and not path.name.startswith('.')
+        )
+    
+    try:
+        with open(args.from_list, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+    except OSError as e:
+        print(f"{Colors.RED}錯誤：無法讀取專案列表: {e}{Colors.ENDC}")
+        sys.exit(1)
+    return [Path(line).resolve() for line in lines if line and not line.startswith('#')]
+
+def run_batch(args) -> int:
+    """以進程池分析多個專案，輸出彙總的 JSONL/CSV 報告，返回失敗的專案數
+
+    每個專案在獨立的子進程中分析，超過 --timeout 的子進程會被終止並記為逾時，
+    不影響其他專案。各專案的 CLAUDE.md 和分析報告寫入專案目錄（或 --output 下的同名子目錄）。
+    """
+    projects = batch_projects(args)
+    output_root = Path(args.output).resolve() if args.output else None
+    workers = args.workers or os.cpu_count() or 1
+    
+    tasks = deque()
+    used_names = set()
+    for index, project_path in enumerate(projects):
+        if output_root is None:
+            output_path = project_path
+        else:
+            # 不同路徑的專案可能同名，輸出目錄加上序號區分
+            name = project_path.name
+            suffix = 2
+            while name in used_names:
+                name = f"{project_path.name}-{suffix}"
+                suffix += 1
+            used_names.add(name)
+            output_path = output_root / name
+        tasks.append((index, project_path, output_path))
+    
+    total = len(tasks)
+    print(f"{Colors.GREEN}批次分析 {total} 個專案（{workers} 個進程）{Colors.ENDC}\n")
+    
+    rows = [None] * total
+    running = {}  # 管道 -> (序號, 專案路徑, 子進程, 開始時間)
+    done = 0
+    
+    def finish(index, row):
+        nonlocal done
+        done += 1
+        rows[index] = row
+        mark = f"{Colors.GREEN}✓{Colors.ENDC}" if row['status'] == 'ok' else f"{Colors.RED}✗{Colors.ENDC}"
+        detail = f" {row['status']}: {row['error']}" if row['status'] != 'ok' else ''
+        print(f"  [{done}/{total}] {mark} {row['project_name']} ({row['elapsed']:.1f}s){detail}")
+    
+    while tasks or running:
+        while tasks and len(running) < workers:
+            index, project_path, output_path = tasks.popleft()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=batch_worker, args=(sender, str(project_path), str(output_path), args), daemon=True
+            )
+            process.start()
+            sender.close()
+            running[receiver] = (index, project_path, process, time.monotonic())
+        
+        deadline = None
+        if args.timeout:
+            deadline = max(0.0, min(started for *_, started in running.values()) + args.timeout - time.monotonic())
+        for receiver in wait(list(running), timeout=deadline):
+            index, project_path, process, started = running.pop(receiver)
+            try:
+                row = receiver.recv()
+            except EOFError:
+                row = {
+                    'project_name': project_path.name,
+                    'project_path': str(project_path),
+                    'status': 'error',
+                    'error': '分析進程異常結束',
+                    'elapsed': round(time.monotonic() - started, 2),
+                }
+            receiver.close()
+            process.join()
+            finish(index, row)
+        
+        # 終止超過時限的子進程
+        if args.timeout:
+            now = time.monotonic()
+            for receiver, (index, project_path, process, started) in list(running.items()):
+                if now - started >= args.timeout:
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    finish(index, {
+                        'project_name': project_path.name,
+                        'project_path': str(project_path),
+                        'status': 'timeout',
+                        'error': f"超過 {args.timeout} 秒",
+                        'elapsed': round(now - started, 2),
+                    })
+    
+    # 彙總報告：副檔名為 .csv 時輸出 CSV，否則每行一個 JSON
+    report_path = Path(args.batch_report) if args.batch_report else (output_root or Path.cwd()) / 'batch-analysis.jsonl'
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8', newline='') as f:
+        if report_path.suffix.lower() == '.csv':
+            writer = csv.DictWriter(f, fieldnames=BATCH_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({
+                    field: ';'.join(value) if isinstance(value, list) else value
+                    for field, value in row.items()
+                })
+        else:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+    
+    failed = sum(1 for row in rows if row['status'] != 'ok')
+    print(f"\n  成功: {len(rows) - failed}，失敗: {failed}")
+    print(f"  {Colors.GREEN}✓{Colors.ENDC} 批次報告：{report_path}")
+    return failed
+
 def main():
     """主函數"""
     parser = argparse.ArgumentParser(description='專案分析與配置生成器')
     parser.add_argument('path', nargs='?', default='.', help='專案路徑')
-    parser.add_argument('--output', help='輸出目錄（預設為專案根目錄）')
+    parser.add_argument('--output', help='輸出目錄（預設為專案根目錄；批次模式下為各專案報告的上層目錄）')
     parser.add_argument('--no-claude', action='store_true', help='不生成 CLAUDE.md')
     parser.add_argument('--no-report', action='store_true', help='不生成分析報告')
     parser.add_argument('--no-color', action='store_true', help='禁用彩色輸出')
+    parser.add_argument('--max-depth', type=int, help='抽樣模式：最多進入的目錄層數')
+    parser.add_argument('--max-files', type=int, help='抽樣模式：最多分析的文件數')
+    parser.add_argument('--jobs', '-j', type=int, help='統計行數的執行緒數（預設為 CPU 核心數 x 4）')
+    parser.add_argument('--no-cache', action='store_true', help='不重用上次分析報告中的目錄和文件統計')
+    parser.add_argument('--budget', type=float, metavar='SECONDS',
+                        help='每個專案的分析時間預算（秒）：用盡時停止遍歷與統計行數，改為抽樣結果')
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument('--batch', metavar='ROOT', help='批次模式：分析 ROOT 下的每個子目錄')
+    batch.add_argument('--from-list', metavar='FILE', help='批次模式：分析 FILE 中列出的專案路徑（每行一個）')
+    parser.add_argument('--workers', type=int, help='批次模式的進程數（預設為 CPU 核心數）')
+    parser.add_argument('--timeout', type=float, help='批次模式中每個專案的分析時限（秒）')
+    parser.add_argument('--batch-report', metavar='FILE',
+                        help='批次彙總報告路徑（.csv 輸出 CSV，其餘輸出 JSONL；預設為 batch-analysis.jsonl）')
     
     args = parser.parse_args()
+    if args.budget is not None and args.budget <= 0:
+        parser.error('--budget 必須大於 0')
     
     if args.no_color:
         Colors.disable()
@@ -518,6 +1245,9 @@ def main():
     print(f"{Colors.BLUE}║       專案分析與配置生成器 v1.0        ║{Colors.ENDC}")
     print(f"{Colors.BLUE}╚════════════════════════════════════════╝{Colors.ENDC}")
     
+    if args.batch or args.from_list:
+        sys.exit(1 if run_batch(args) else 0)
+    
     # 確定專案路徑
     project_path = Path(args.path).resolve()
     if not project_path.exists():
@@ -526,18 +1256,7 @@ def main():
     
     # 確定輸出路徑
     output_path = Path(args.output) if args.output else project_path
-    output_path.mkdir(parents=True, exist_ok=True)
-    
-    # 執行分析
-    analyzer = ProjectAnalyzer(project_path)
-    results = analyzer.analyze()
-    
-    # 生成配置和報告
-    if not args.no_claude:
-        generate_claude_config(results, output_path)
-    
-    if not args.no_report:
-        save_analysis_report(results, output_path)
+    results = run_analysis(project_path, output_path, args)
     
     # 完成
     print(f"\n{Colors.GREEN}✅ 分析完成！{Colors.ENDC}")
@@ -9,13 +9,34 @@ v1.3.0 - 完整功能版本
 import os
 import sys
 import shutil
+import re
 import json
+import stat
+import time
+import zlib
+import struct
+import fnmatch
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime
 import subprocess
 import platform
 
+# YAML 清單需要 PyYAML（選用）
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# reflink（FICLONE ioctl）只在 Unix 上可用
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # 顏色輸出支援
 class Colors:
     """終端顏色定義"""
@@ -40,6 +61,10 @@ class Colors:
 if platform.system() == 'Windows' and sys.version_info < (3, 6):
     Colors.disable()
 
+# 非互動模式與批次清單的預設 Agent
+DEFAULT_AGENTS = ['strategic-planner-agent', 'task-executor-agent', 'base-agent']
+CLAUDE_CONFIGS = ['standard', 'superclaude', 'merged']
+
 def print_banner():
     """顯示歡迎橫幅"""
     print(f"""
@@ -56,6 +81,229 @@ def get_project_root():
     """獲取專案根目錄"""
     return get_script_dir().parent
 
+class Template:
+    """預先編譯的模板
+
+    模板文本只解析一次，切成字面片段與 {{PLACEHOLDER}} 名稱交替的片段列表，
+    渲染時一次組合所有片段；沒有提供值的佔位符原樣保留並回報。
+    """
+    PLACEHOLDER = re.compile(r'\{\{([A-Z][A-Z0-9_]*)\}\}')
+    
+    _cache = {}  # {模板路徑: ((mtime, 大小), Template)}
+    
+    def __init__(self, text):
+        parts = self.PLACEHOLDER.split(text)
+        self.literals = parts[0::2]  # 比 names 多一個
+        self.names = parts[1::2]
+        self.placeholders = set(self.names)
+    
+    @classmethod
+    def load(cls, path):
+        """讀取並編譯模板文件；文件未變更時直接返回快取的編譯結果"""
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        cached = cls._cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        template = cls(path.read_text(encoding='utf-8'))
+        cls._cache[path] = (key, template)
+        return template
+    
+    def render(self, values):
+        """以單次組合渲染模板，返回 (文本, 未提供值的佔位符列表)"""
+        parts = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            parts.append(values[name] if name in values else '{{' + name + '}}')
+            parts.append(literal)
+        return ''.join(parts), sorted(self.placeholders - values.keys())
+
+def render_template(path, values, target_name):
+    """渲染模板文件，並提示尚未填寫的佔位符"""
+    content, missing = Template.load(path).render(values)
+    if missing:
+        shown = ', '.join(missing[:5]) + (' ...' if len(missing) > 5 else '')
+        print(f"  {Colors.YELLOW}[TODO]{Colors.ENDC} {target_name} 有 {len(missing)} 個佔位符待填寫: {shown}")
+    return content
+
+class AssetMaterializer:
+    """將模板資產與生成的文件寫入專案
+
+    模板資產（Agent 配置、驗證腳本、SuperClaude 配置）在 mode 為 'auto' 時優先使用 reflink
+    （FICLONE，或由 copy_file_range 交給文件系統處理），不支援時退回一般複製；'hardlink' 優先建立硬連結
+    （專案文件與模板共用同一份內容，就地修改會影響模板），跨磁碟區時退回 'auto'；'copy' 一律使用 shutil.copy2。
+    生成的文件（CLAUDE.md、README.md 等）先在記憶體中產生，與磁碟上的內容相同時不寫入。
+    所有寫入都先寫到暫存文件再以 rename 原子替換。
+
+    每個文件的內容 SHA-256 記錄在專案的模板清單中，重新執行時目標內容與來源相同的資產直接略過；
+    update 模式下，內容與上次寫入時不同（已被使用者修改）的文件予以保留，除非指定 force。
+    """
+    MANIFEST = Path('.claude') / 'template-manifest.json'
+    FICLONE = 0x40049409  # linux/fs.h
+    
+    _hashes = {}  # {文件路徑: ((mtime, 大小), SHA-256)}，同一進程內的多個專案共用
+    
+    def __init__(self, project_path, mode='auto', update=False, force=False):
+        self.project_path = project_path
+        self.mode = mode
+        self.update = update
+        self.force = force
+        self.stats = {'written': 0, 'reflink': 0, 'hardlink': 0, 'skipped': 0}
+        self.kept = []  # 因使用者修改而保留的文件
+        try:
+            with open(project_path / self.MANIFEST, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        self.project = manifest.get('project')  # 上次使用的專案資訊與 Agent
+        self.created = manifest.get('created') or datetime.now().strftime('%Y-%m-%d')
+        self.files = manifest.get('files', {})  # {相對路徑: 內容的 SHA-256}
+    
+    @staticmethod
+    def file_hash(path):
+        """文件內容的 SHA-256"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @classmethod
+    def content_hash(cls, path):
+        """文件內容的 SHA-256（mtime 和大小未變時重用同一進程內上次的結果）"""
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        cached = cls._hashes.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = cls.file_hash(path)
+        cls._hashes[path] = (key, digest)
+        return digest
+    
+    def _keep_user_changes(self, rel_path, current_hash):
+        """update 模式下，目標的內容與上次寫入的不同時保留使用者的修改"""
+        if not self.update or self.force or current_hash == self.files.get(rel_path):
+            return False
+        self.kept.append(rel_path)
+        return True
+    
+    def file(self, src, dst):
+        """放入單一模板資產；目標的內容與來源相同時略過"""
+        rel_path = dst.relative_to(self.project_path).as_posix()
+        digest = self.content_hash(src)
+        if dst.exists():
+            # 以目標的實際內容比對，清單只記錄上次寫入的內容，無法反映使用者之後的修改
+            current = self.content_hash(dst)
+            if current == digest:
+                self.stats['skipped'] += 1
+                self.files[rel_path] = digest
+                return
+            if self._keep_user_changes(rel_path, current):
+                return
+        
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f'.{dst.name}.tmp')
+        if tmp.exists():
+            tmp.unlink()
+        method = self._materialize(src, tmp)
+        os.replace(tmp, dst)
+        self.stats['written'] += 1
+        if method in ('reflink', 'hardlink'):
+            self.stats[method] += 1
+        self.files[rel_path] = digest
+    
+    def tree(self, src_dir, dst_dir):
+        """放入整個目錄（取代 shutil.copytree(..., dirs_exist_ok=True)）"""
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            rel_root = Path(root).relative_to(src_dir)
+            for name in sorted(files):
+                self.file(Path(root) / name, dst_dir / rel_root / name)
+    
+    def text(self, dst, content):
+        """寫入生成的文本文件（換行處理與 Path.write_text 相同），內容未變更時不寫入"""
+        rel_path = dst.relative_to(self.project_path).as_posix()
+        data = content.replace('\n', os.linesep).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            current = dst.read_bytes()
+        except OSError:
+            current = None
+        if current == data:
+            self.stats['skipped'] += 1
+            self.files[rel_path] = digest
+            return
+        if current is not None and self._keep_user_changes(rel_path, hashlib.sha256(current).hexdigest()):
+            return
+        
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(dst, data)
+        self.stats['written'] += 1
+        self.files[rel_path] = digest
+    
+    @staticmethod
+    def _write_atomic(dst, data):
+        """先寫到暫存文件再替換，避免中斷時留下不完整的目標"""
+        tmp = dst.with_name(f'.{dst.name}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, dst)
+    
+    def _materialize(self, src, dst):
+        """依模式建立 dst，返回實際使用的方式"""
+        if self.mode == 'copy':
+            shutil.copy2(src, dst)
+            return 'copy'
+        if self.mode == 'hardlink':
+            try:
+                os.link(src, dst)
+                return 'hardlink'
+            except OSError:
+                pass
+        
+        method = 'copy'
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            cloned = False
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(fdst.fileno(), self.FICLONE, fsrc.fileno())
+                    cloned = True
+                    method = 'reflink'
+                except OSError:
+                    pass
+            if not cloned and hasattr(os, 'copy_file_range'):
+                try:
+                    while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                        pass
+                    cloned = True
+                except OSError:
+                    # 部分寫入後失敗時從頭複製
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    fdst.truncate()
+            if not cloned:
+                shutil.copyfileobj(fsrc, fdst)
+        shutil.copystat(src, dst)
+        return method
+    
+    def save(self, project_info, selected_agents):
+        """寫回模板清單（內容未變更時不寫入）"""
+        project = {key: project_info[key] for key in ('name', 'type', 'description', 'language', 'claude_config')}
+        project['agents'] = list(selected_agents)
+        manifest = {
+            'created': self.created,
+            'project': project,
+            'files': dict(sorted(self.files.items())),
+        }
+        data = (json.dumps(manifest, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+        manifest_path = self.project_path / self.MANIFEST
+        try:
+            if manifest_path.read_bytes() == data:
+                return
+        except OSError:
+            pass
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(manifest_path, data)
+
 def load_config():
     """載入配置文件"""
     config_path = get_project_root() / 'config' / 'project-types.json'
@@ -243,46 +491,48 @@ def create_directory_structure(project_path, project_type):
     
     print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 創建目錄結構")
 
-def setup_claude_config(project_path, config_type, project_info):
-    """設置 CLAUDE.md 配置"""
+def render_claude_template(project_info):
+    """以專案類型的 CLAUDE.md 模板（或通用模板）渲染內容，沒有模板時返回 None"""
     template_dir = get_project_root() / 'templates'
+    template_file = template_dir / project_info['type'] / 'CLAUDE.md'
+    if not template_file.exists():
+        template_file = template_dir / 'CLAUDE.md.template'
+    if not template_file.exists():
+        return None
+    
+    values = {
+        'PROJECT_NAME': project_info['name'],
+        'PROJECT_TYPE': project_info['type'],
+        'PRIMARY_LANGUAGE': project_info['language'],
+        'PROJECT_DESCRIPTION': project_info['description'],
+        'CREATED_DATE': project_info['created'],
+        'VERSION': '0.1.0'
+    }
+    return render_template(template_file, values, 'CLAUDE.md')
+
+def setup_claude_config(project_path, config_type, project_info, materializer):
+    """設置 CLAUDE.md 配置"""
     global_config_dir = get_project_root() / 'global-configs'
     
     if config_type == 'standard':
         # 使用標準模板
-        template_file = template_dir / project_info['type'] / 'CLAUDE.md'
-        if not template_file.exists():
-            template_file = template_dir / 'CLAUDE.md.template'
-        
-        if template_file.exists():
-            content = template_file.read_text(encoding='utf-8')
-            # 替換佔位符
-            replacements = {
-                '{{PROJECT_NAME}}': project_info['name'],
-                '{{PROJECT_TYPE}}': project_info['type'],
-                '{{PRIMARY_LANGUAGE}}': project_info['language'],
-                '{{PROJECT_DESCRIPTION}}': project_info['description'],
-                '{{CREATED_DATE}}': datetime.now().strftime('%Y-%m-%d'),
-                '{{VERSION}}': '0.1.0'
-            }
-            for key, value in replacements.items():
-                content = content.replace(key, value)
-            
-            (project_path / 'CLAUDE.md').write_text(content, encoding='utf-8')
+        content = render_claude_template(project_info)
+        if content is not None:
+            materializer.text(project_path / 'CLAUDE.md', content)
             print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 已設置標準專案配置")
     
     elif config_type == 'superclaude':
         # 使用 SuperClaude 全域配置
         claude_file = global_config_dir / 'CLAUDE.md'
         if claude_file.exists():
-            shutil.copy2(claude_file, project_path / 'CLAUDE.md')
+            materializer.file(claude_file, project_path / 'CLAUDE.md')
         
         # 複製依賴文件
         for subdir in ['commands', 'shared']:
             src_dir = global_config_dir / subdir
             if src_dir.exists():
                 dst_dir = project_path / '.claude' / subdir
-                shutil.copytree(src_dir, dst_dir, dirs_exist_ok=True)
+                materializer.tree(src_dir, dst_dir)
         
         print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 已設置 SuperClaude 全域配置")
         print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 已複製所有依賴文件")
@@ -290,24 +540,8 @@ def setup_claude_config(project_path, config_type, project_info):
     elif config_type == 'merged':
         # 合併配置
         # 先使用標準模板
-        template_file = template_dir / project_info['type'] / 'CLAUDE.md'
-        if not template_file.exists():
-            template_file = template_dir / 'CLAUDE.md.template'
-        
-        if template_file.exists():
-            content = template_file.read_text(encoding='utf-8')
-            # 替換佔位符
-            replacements = {
-                '{{PROJECT_NAME}}': project_info['name'],
-                '{{PROJECT_TYPE}}': project_info['type'],
-                '{{PRIMARY_LANGUAGE}}': project_info['language'],
-                '{{PROJECT_DESCRIPTION}}': project_info['description'],
-                '{{CREATED_DATE}}': datetime.now().strftime('%Y-%m-%d'),
-                '{{VERSION}}': '0.1.0'
-            }
-            for key, value in replacements.items():
-                content = content.replace(key, value)
-            
+        content = render_claude_template(project_info)
+        if content is not None:
             # 添加 SuperClaude 功能區塊
             content += """
 
@@ -332,17 +566,17 @@ def setup_claude_config(project_path, config_type, project_info):
 詳細配置請參考 global-configs/ 目錄。
 """
             
-            (project_path / 'CLAUDE.md').write_text(content, encoding='utf-8')
+            materializer.text(project_path / 'CLAUDE.md', content)
             
             # 複製 SuperClaude 依賴文件以供參考
             shared_dir = global_config_dir / 'shared'
             if shared_dir.exists():
                 dst_dir = project_path / '.claude' / 'shared'
-                shutil.copytree(shared_dir, dst_dir, dirs_exist_ok=True)
+                materializer.tree(shared_dir, dst_dir)
             
             print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 已設置合併配置（標準 + SuperClaude 參考）")
 
-def copy_agent_configs(project_path, selected_agents):
+def copy_agent_configs(project_path, selected_agents, materializer):
     """複製選擇的 Agent 配置"""
     agents_dir = get_project_root() / 'agents'
     target_dir = project_path / '.claude' / 'agents'
@@ -350,10 +584,10 @@ def copy_agent_configs(project_path, selected_agents):
     for agent in selected_agents:
         agent_file = agents_dir / f'{agent}.yaml'
         if agent_file.exists():
-            shutil.copy2(agent_file, target_dir / f'{agent}.yaml')
+            materializer.file(agent_file, target_dir / f'{agent}.yaml')
             print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 已添加 {agent}")
 
-def initialize_ai_rules(project_path, project_info):
+def initialize_ai_rules(project_path, project_info, materializer):
     """初始化 .ai-rules 文檔"""
     ai_rules_dir = project_path / '.ai-rules'
     
@@ -378,7 +612,7 @@ inclusion: always
 ## 獨特價值
 *待定義*
 """
-    (ai_rules_dir / 'product.md').write_text(product_content, encoding='utf-8')
+    materializer.text(ai_rules_dir / 'product.md', product_content)
     
     # 創建 tech.md
     tech_content = f"""---
@@ -402,7 +636,7 @@ inclusion: always
 ## 部署環境
 *待定義*
 """
-    (ai_rules_dir / 'tech.md').write_text(tech_content, encoding='utf-8')
+    materializer.text(ai_rules_dir / 'tech.md', tech_content)
     
     # 創建 structure.md
     structure_content = """---
@@ -430,19 +664,20 @@ inclusion: always
 ## 檔案組織原則
 *待定義*
 """
-    (ai_rules_dir / 'structure.md').write_text(structure_content, encoding='utf-8')
+    materializer.text(ai_rules_dir / 'structure.md', structure_content)
     
     print(f"{Colors.GREEN}初始化 .ai-rules 文檔...{Colors.ENDC}")
 
-def create_project_files(project_path, project_info, selected_agents):
+def create_project_files(project_path, project_info, selected_agents, materializer):
     """創建專案文件"""
     # 創建 PROJECT_SPECIFIC_RULES.md
     template_path = get_project_root() / 'templates' / 'PROJECT_SPECIFIC_RULES.template.md'
     if template_path.exists():
-        content = template_path.read_text(encoding='utf-8')
-        content = content.replace('{{PROJECT_NAME}}', project_info['name'])
-        content = content.replace('{{LAST_UPDATED}}', datetime.now().strftime('%Y-%m-%d'))
-        (project_path / 'PROJECT_SPECIFIC_RULES.md').write_text(content, encoding='utf-8')
+        content = render_template(template_path, {
+            'PROJECT_NAME': project_info['name'],
+            'LAST_UPDATED': project_info['created']
+        }, 'PROJECT_SPECIFIC_RULES.md')
+        materializer.text(project_path / 'PROJECT_SPECIFIC_RULES.md', content)
     
     # 創建 .gitignore
     gitignore_content = """# 依賴
@@ -470,8 +705,11 @@ Thumbs.db
 # 日誌
 logs/
 *.log
+
+# 驗證快取
+.validator-cache.json
 """
-    (project_path / '.gitignore').write_text(gitignore_content, encoding='utf-8')
+    materializer.text(project_path / '.gitignore', gitignore_content)
     
     # 創建 README.md
     readme_content = f"""# {project_info['name']}
@@ -493,7 +731,7 @@ logs/
     for agent in selected_agents:
         readme_content += f"\n- {agent}"
     
-    (project_path / 'README.md').write_text(readme_content, encoding='utf-8')
+    materializer.text(project_path / 'README.md', readme_content)
     
     # 創建開發知識庫
     knowledge_base_content = f"""# Development Knowledge Base - {project_info['name']}
@@ -522,11 +760,11 @@ logs/
 *待添加...*
 
 ---
-*Created: {datetime.now().strftime('%Y-%m-%d')}*
+*Created: {project_info['created']}*
 """
-    (project_path / 'DEVELOPMENT_KNOWLEDGE_BASE.md').write_text(knowledge_base_content, encoding='utf-8')
+    materializer.text(project_path / 'DEVELOPMENT_KNOWLEDGE_BASE.md', knowledge_base_content)
 
-def copy_validation_scripts(project_path, project_type):
+def copy_validation_scripts(project_path, project_type, materializer):
     """複製驗證腳本"""
     validation_dir = project_path / 'validation-scripts'
     validation_dir.mkdir(exist_ok=True)
@@ -537,7 +775,7 @@ def copy_validation_scripts(project_path, project_type):
                    'check-security.py', 'check-duplicates.py']:
         src = scripts_dir / script
         if src.exists():
-            shutil.copy2(src, validation_dir / script)
+            materializer.file(src, validation_dir / script)
     
     # 創建專案特定的配置文件
     config = {
@@ -555,18 +793,232 @@ def copy_validation_scripts(project_path, project_type):
         "project_type": project_type
     }
     
-    config_path = validation_dir / 'validation-config.json'
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    materializer.text(validation_dir / 'validation-config.json', json.dumps(config, indent=2, ensure_ascii=False))
     
     print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 創建驗證腳本")
 
-def setup_git_repo(project_path):
-    """初始化 Git 倉庫"""
+INITIAL_COMMIT_MESSAGE = 'Initial commit - Project setup with CLAUDE.md and Agent configuration'
+
+class GitRepoWriter:
+    """不啟動 git 進程，直接寫出含初始提交的 Git 儲存庫
+
+    依 `git init && git add . && git commit` 的結果寫出 .git 目錄：鬆散的 blob/tree/commit 物件、
+    分支引用、reflog 與 index（v2，含文件的 stat 資訊，git status 不需重新計算雜湊）。
+    身分與預設分支取自 GIT_AUTHOR_* / GIT_COMMITTER_* 環境變數或 Git 配置文件中的 [user] 與 [init]。
+    遇到無法完全重現 git 行為的情況（巢狀或含否定規則的 .gitignore、全域忽略文件、找不到身分）時
+    supported() 返回 False，由呼叫端改用 git 命令。
+    """
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.git_dir = project_path / '.git'
+        self.config = self._read_config()
+        self.ignore_rules = None  # [(規則, 是否只比對目錄, 是否比對完整路徑)]
+    
+    @staticmethod
+    def _read_config():
+        """讀取系統與使用者的 Git 配置（只解析簡單的 section.key = value）"""
+        home = Path.home()
+        xdg = Path(os.environ.get('XDG_CONFIG_HOME') or home / '.config')
+        paths = [Path('/etc/gitconfig'), xdg / 'git' / 'config', home / '.gitconfig']
+        if os.environ.get('GIT_CONFIG_GLOBAL'):
+            paths[1:] = [Path(os.environ['GIT_CONFIG_GLOBAL'])]
+        config = {}
+        for path in paths:
+            try:
+                lines = path.read_text(encoding='utf-8').splitlines()
+            except (OSError, UnicodeDecodeError):
+                continue
+            section = ''
+            for line in lines:
+                line = line.split('#', 1)[0].split(';', 1)[0].strip()
+                if line.startswith('['):
+                    section = line.strip('[]').split()[0].lower() if line.strip('[]').strip() else ''
+                elif '=' in line and section:
+                    key, value = line.split('=', 1)
+                    config[f'{section}.{key.strip().lower()}'] = value.strip().strip('"')
+        return config
+    
+    def identity(self, role):
+        """作者或提交者的 (名稱, 電子郵件)，找不到時返回 None"""
+        name = os.environ.get(f'GIT_{role}_NAME') or self.config.get('user.name')
+        email = os.environ.get(f'GIT_{role}_EMAIL') or self.config.get('user.email') or os.environ.get('EMAIL')
+        return (name, email) if name and email else None
+    
+    def supported(self):
+        """此專案能否以原生方式寫出與 git 命令相同的結果"""
+        if self.git_dir.exists() or not self.identity('AUTHOR') or not self.identity('COMMITTER'):
+            return False
+        # include 的配置文件、換行轉換與屬性文件會改變 git add 的結果
+        if any(key.startswith(('include.', 'includeif.')) for key in self.config):
+            return False
+        if self.config.get('core.autocrlf', 'false').lower() != 'false':
+            return False
+        excludes = self.config.get('core.excludesfile')
+        default_excludes = Path(os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config') / 'git' / 'ignore'
+        for path in ([Path(excludes).expanduser()] if excludes else []) + [default_excludes]:
+            try:
+                if path.read_text(encoding='utf-8').strip():
+                    return False
+            except (OSError, UnicodeDecodeError):
+                pass
+        
+        self.ignore_rules = []
+        for root, dirs, files in os.walk(self.project_path):
+            if root == str(self.project_path):
+                dirs[:] = [name for name in dirs if name != '.git']
+            elif '.gitignore' in files:
+                return False
+            if '.gitattributes' in files:
+                return False
+        try:
+            lines = (self.project_path / '.gitignore').read_text(encoding='utf-8').splitlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('!') or '**' in line or '\\' in line:
+                return False
+            dir_only = line.endswith('/')
+            pattern = line.rstrip('/')
+            anchored = '/' in pattern
+            if anchored and any(char in pattern for char in '*?['):
+                return False
+            self.ignore_rules.append((pattern.lstrip('/'), dir_only, anchored))
+        return True
+    
+    def _ignored(self, rel_path, name, is_dir):
+        for pattern, dir_only, anchored in self.ignore_rules:
+            if dir_only and not is_dir:
+                continue
+            if anchored:
+                if rel_path == pattern:
+                    return True
+            elif fnmatch.fnmatchcase(name, pattern):
+                return True
+        return False
+    
+    def _write_object(self, kind, data):
+        """寫出鬆散物件，返回 20 位元組的 SHA-1"""
+        raw = b'%s %d\0' % (kind, len(data)) + data
+        digest = hashlib.sha1(raw).digest()
+        hex_digest = digest.hex()
+        path = self.git_dir / 'objects' / hex_digest[:2] / hex_digest[2:]
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(zlib.compress(raw))
+        return digest
+    
+    def _write_tree(self, directory, rel_dir, index):
+        """遞迴寫出目錄的 tree 物件並收集 index 項目，空目錄返回 None"""
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                rel_path = f'{rel_dir}{entry.name}'
+                if not rel_dir and entry.name == '.git':
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if self._ignored(rel_path, entry.name, is_dir):
+                    continue
+                if is_dir:
+                    digest = self._write_tree(entry.path, rel_path + '/', index)
+                    if digest is not None:
+                        # git 以「名稱/」排序目錄
+                        entries.append((os.fsencode(entry.name) + b'/', b'40000', os.fsencode(entry.name), digest))
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                if stat.S_ISLNK(st.st_mode):
+                    mode = 0o120000
+                    data = os.fsencode(os.readlink(entry.path))
+                elif stat.S_ISREG(st.st_mode):
+                    mode = 0o100755 if os.name != 'nt' and st.st_mode & stat.S_IXUSR else 0o100644
+                    with open(entry.path, 'rb') as f:
+                        data = f.read()
+                else:
+                    continue
+                digest = self._write_object(b'blob', data)
+                entries.append((os.fsencode(entry.name), b'%o' % mode, os.fsencode(entry.name), digest))
+                index.append((os.fsencode(rel_path), st, mode, digest))
+        if not entries:
+            return None
+        entries.sort()
+        return self._write_object(b'tree', b''.join(
+            mode + b' ' + name + b'\0' + digest for _, mode, name, digest in entries
+        ))
+    
+    def _write_index(self, index):
+        """寫出 index（版本 2）"""
+        index.sort(key=lambda item: item[0])
+        body = [b'DIRC', struct.pack('>II', 2, len(index))]
+        for path, st, mode, digest in index:
+            entry = struct.pack(
+                '>10I20sH',
+                int(st.st_ctime) & 0xFFFFFFFF, st.st_ctime_ns % 1000000000,
+                int(st.st_mtime) & 0xFFFFFFFF, st.st_mtime_ns % 1000000000,
+                st.st_dev & 0xFFFFFFFF, st.st_ino & 0xFFFFFFFF, mode,
+                st.st_uid & 0xFFFFFFFF, st.st_gid & 0xFFFFFFFF, st.st_size & 0xFFFFFFFF,
+                digest, min(len(path), 0xFFF)
+            ) + path
+            # 每個項目以 1 到 8 個 NUL 補齊到 8 的倍數
+            body.append(entry + b'\0' * (8 - len(entry) % 8))
+        data = b''.join(body)
+        (self.git_dir / 'index').write_bytes(data + hashlib.sha1(data).digest())
+    
+    def write(self, message):
+        """建立 .git 並寫出包含專案所有文件的初始提交，返回提交的 SHA-1"""
+        branch = self.config.get('init.defaultbranch', 'master')
+        for sub in ('objects/info', 'objects/pack', 'refs/heads', 'refs/tags', 'info', 'logs/refs/heads'):
+            (self.git_dir / sub).mkdir(parents=True, exist_ok=True)
+        (self.git_dir / 'HEAD').write_text(f'ref: refs/heads/{branch}\n', encoding='utf-8')
+        (self.git_dir / 'description').write_text(
+            "Unnamed repository; edit this file 'description' to name the repository.\n", encoding='utf-8')
+        (self.git_dir / 'config').write_text(
+            '[core]\n'
+            '\trepositoryformatversion = 0\n'
+            f"\tfilemode = {'false' if os.name == 'nt' else 'true'}\n"
+            '\tbare = false\n'
+            '\tlogallrefupdates = true\n', encoding='utf-8')
+        
+        index = []
+        tree = self._write_tree(self.project_path, '', index)
+        if tree is None:
+            tree = self._write_object(b'tree', b'')
+        
+        timestamp = f"{int(time.time())} {datetime.now().astimezone().strftime('%z')}"
+        author = '{} <{}> {}'.format(*self.identity('AUTHOR'), timestamp)
+        committer = '{} <{}> {}'.format(*self.identity('COMMITTER'), timestamp)
+        commit = self._write_object(b'commit', (
+            f'tree {tree.hex()}\nauthor {author}\ncommitter {committer}\n\n{message}\n'
+        ).encode('utf-8')).hex()
+        
+        (self.git_dir / 'refs' / 'heads' / branch).write_text(commit + '\n', encoding='utf-8')
+        reflog = f"{'0' * 40} {commit} {committer}\tcommit (initial): {message}\n"
+        (self.git_dir / 'logs' / 'HEAD').write_text(reflog, encoding='utf-8')
+        (self.git_dir / 'logs' / 'refs' / 'heads' / branch).write_text(reflog, encoding='utf-8')
+        self._write_index(index)
+        return commit
+
+def setup_git_repo(project_path, backend='native'):
+    """初始化 Git 倉庫
+
+    backend 為 'native' 時直接寫出儲存庫（不啟動 git 進程），無法原生處理時改用 git 命令。
+    """
+    if backend == 'native':
+        writer = GitRepoWriter(project_path)
+        if writer.supported():
+            try:
+                writer.write(INITIAL_COMMIT_MESSAGE)
+                print(f"{Colors.GREEN}Git 儲存庫已初始化{Colors.ENDC}")
+                return True
+            except OSError:
+                # 清除寫到一半的儲存庫，改用 git 命令
+                shutil.rmtree(writer.git_dir, ignore_errors=True)
+    
     try:
         subprocess.run(['git', 'init'], cwd=project_path, check=True, capture_output=True)
         subprocess.run(['git', 'add', '.'], cwd=project_path, check=True, capture_output=True)
-        subprocess.run(['git', 'commit', '-m', 'Initial commit - Project setup with CLAUDE.md and Agent configuration'], 
+        subprocess.run(['git', 'commit', '-m', INITIAL_COMMIT_MESSAGE], 
                       cwd=project_path, check=True, capture_output=True)
         print(f"{Colors.GREEN}Git 儲存庫已初始化{Colors.ENDC}")
         return True
@@ -606,6 +1058,211 @@ def show_completion_message(project_info, selected_agents):
     if project_info['claude_config'] == 'superclaude':
         print(f"{Colors.YELLOW}SuperClaude 配置啟用 - 享受更強大的 AI 開發體驗！{Colors.ENDC}")
 
+def create_project(project_path, project_info, selected_agents, link_mode='auto', update=False, force=False):
+    """依專案資訊創建（或更新）專案目錄與所有配置文件（不含 Git 初始化）
+
+    所有文件都經由 AssetMaterializer 寫入，內容未變更的文件不會被改寫；
+    update 為 True 時保留使用者修改過的文件（force 時仍覆寫）。
+    """
+    print(f"\n{Colors.GREEN}{'正在更新專案...' if update else '正在創建專案結構...'}{Colors.ENDC}")
+    project_path.mkdir(parents=True, exist_ok=True)
+    materializer = AssetMaterializer(project_path, link_mode, update, force)
+    # 生成文件中的日期使用專案創建日，重新執行時內容不會因日期而變動
+    project_info['created'] = materializer.created
+    
+    # 創建目錄結構
+    create_directory_structure(project_path, project_info['type'])
+    
+    # 設置 CLAUDE.md
+    print(f"{Colors.GREEN}設置 CLAUDE.md 配置...{Colors.ENDC}")
+    setup_claude_config(project_path, project_info['claude_config'], project_info, materializer)
+    
+    # 複製 Agent 配置
+    if selected_agents:
+        print(f"{Colors.GREEN}設置 Agent 配置...{Colors.ENDC}")
+        copy_agent_configs(project_path, selected_agents, materializer)
+    
+    # 如果選擇了 Steering Architect，初始化 .ai-rules
+    if 'steering-architect-agent' in selected_agents:
+        initialize_ai_rules(project_path, project_info, materializer)
+    
+    # 創建專案文件
+    print(f"{Colors.GREEN}創建專案文件...{Colors.ENDC}")
+    create_project_files(project_path, project_info, selected_agents, materializer)
+    
+    # 複製驗證腳本
+    print(f"{Colors.GREEN}創建檢查腳本...{Colors.ENDC}")
+    copy_validation_scripts(project_path, project_info['type'], materializer)
+    
+    materializer.save(project_info, selected_agents)
+    stats = materializer.stats
+    print(f"  {Colors.GREEN}[OK]{Colors.ENDC} 文件: 寫入 {stats['written']}（reflink {stats['reflink']}、"
+          f"硬連結 {stats['hardlink']}）、未變更 {stats['skipped']}")
+    for rel_path in materializer.kept:
+        print(f"  {Colors.YELLOW}[KEEP]{Colors.ENDC} {rel_path} 已被修改，保留現有內容（--force 覆寫）")
+    return materializer
+
+def update_project(project_path, args):
+    """--update 模式：以上次使用的專案資訊重新生成專案文件，只寫入內容有變更的文件"""
+    if not project_path.is_dir():
+        print(f"{Colors.RED}錯誤：目錄 {project_path} 不存在{Colors.ENDC}")
+        sys.exit(1)
+    
+    saved = AssetMaterializer(project_path).project
+    if saved is None and not args.type:
+        print(f"{Colors.RED}錯誤：{project_path} 中沒有模板清單，請以 -t 指定專案類型{Colors.ENDC}")
+        sys.exit(1)
+    
+    project_info = {
+        'name': project_path.name,
+        'description': f'{project_path.name} project',
+        'language': 'Python',
+        'claude_config': 'standard',
+        'agents': list(DEFAULT_AGENTS),
+        **(saved or {})
+    }
+    if args.type:
+        project_info['type'] = args.type
+    selected_agents = project_info.pop('agents')
+    project_info['mode'] = 'update'
+    project_info['path'] = str(project_path)
+    
+    materializer = create_project(project_path, project_info, selected_agents,
+                                  args.link_mode, update=True, force=args.force)
+    print(f"\n{Colors.GREEN}[SUCCESS] 專案已更新：寫入 {materializer.stats['written']} 個文件{Colors.ENDC}")
+
+def load_manifest(manifest_path):
+    """讀取批次清單（JSON 或 YAML），返回專案項目列表
+
+    清單可以是專案項目的列表，或含有 projects 列表的物件。
+    """
+    manifest_path = Path(manifest_path)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if manifest_path.suffix.lower() in ('.yml', '.yaml'):
+                if yaml is None:
+                    print(f"{Colors.RED}錯誤：讀取 YAML 清單需要安裝 PyYAML（pip install pyyaml）{Colors.ENDC}")
+                    sys.exit(1)
+                manifest = yaml.safe_load(f)
+            else:
+                manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}錯誤：無法讀取清單 {manifest_path}: {e}{Colors.ENDC}")
+        sys.exit(1)
+    
+    if isinstance(manifest, dict):
+        manifest = manifest.get('projects')
+    if not isinstance(manifest, list):
+        print(f"{Colors.RED}錯誤：清單必須是專案列表或含有 projects 列表的物件{Colors.ENDC}")
+        sys.exit(1)
+    return manifest
+
+def manifest_projects(entries, base_path, no_git):
+    """驗證清單項目並補上預設值，返回 [(專案路徑, 專案資訊, Agent 列表, 是否初始化 Git)]
+
+    任何項目有誤時列出所有錯誤並結束，不創建任何專案。
+    """
+    projects = []
+    errors = []
+    paths = set()
+    for index, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            errors.append(f"第 {index} 項不是物件")
+            continue
+        name = entry.get('name')
+        project_type = entry.get('type')
+        if not name or not project_type:
+            errors.append(f"第 {index} 項缺少 name 或 type")
+            continue
+        claude_config = entry.get('claude_config', 'standard')
+        if claude_config not in CLAUDE_CONFIGS:
+            errors.append(f"{name}: 未知的 claude_config '{claude_config}'（可用: {', '.join(CLAUDE_CONFIGS)}）")
+            continue
+        agents = entry.get('agents', DEFAULT_AGENTS)
+        if not isinstance(agents, list):
+            errors.append(f"{name}: agents 必須是列表")
+            continue
+        
+        project_path = (Path(entry['path']) if entry.get('path') else base_path) / name
+        if project_path.resolve() in paths:
+            errors.append(f"{name}: 專案路徑 {project_path} 重複")
+            continue
+        paths.add(project_path.resolve())
+        
+        project_info = {
+            'name': name,
+            'type': project_type,
+            'description': entry.get('description', f'{name} project'),
+            'language': entry.get('language', 'Python'),
+            'claude_config': claude_config,
+            'mode': 'new',
+            'path': str(project_path)
+        }
+        projects.append((project_path, project_info, agents, entry.get('git', not no_git)))
+    
+    if errors:
+        print(f"{Colors.RED}錯誤：清單中有 {len(errors)} 個問題{Colors.ENDC}")
+        for error in errors:
+            print(f"  - {error}")
+        sys.exit(1)
+    return projects
+
+def batch_create_project(project_path, project_info, selected_agents, init_git, link_mode,
+                         update=False, force=False, git_backend='native'):
+    """批次模式的工作進程：創建（或更新）一個專案，返回 (是否成功, 錯誤訊息, 耗時)"""
+    started = time.monotonic()
+    try:
+        if project_path.exists() and not update:
+            return False, f"目錄 {project_path} 已存在", time.monotonic() - started
+        # 各專案的逐步輸出會交錯，只由主進程回報結果
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+            create_project(project_path, project_info, selected_agents, link_mode, update, force)
+            if init_git and not (project_path / '.git').exists() and not setup_git_repo(project_path, git_backend):
+                return False, "Git 初始化失敗", time.monotonic() - started
+    except Exception as e:
+        return False, str(e) or type(e).__name__, time.monotonic() - started
+    return True, None, time.monotonic() - started
+
+def run_batch(args):
+    """依清單以進程池並行創建多個專案，返回失敗的專案數
+
+    不同專案的文件複製與 Git 初始化在各自的進程中同時進行。
+    """
+    base_path = Path(args.path) if args.path else Path.cwd()
+    projects = manifest_projects(load_manifest(args.manifest), base_path, args.no_git)
+    workers = args.workers or os.cpu_count() or 1
+    
+    action = '更新' if args.update else '創建'
+    print(f"{Colors.GREEN}批次{action} {len(projects)} 個專案（{workers} 個進程）...{Colors.ENDC}\n")
+    
+    results = [None] * len(projects)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(batch_create_project, *project, args.link_mode,
+                            args.update, args.force, args.git_backend): index
+            for index, project in enumerate(projects)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            name = projects[index][1]['name']
+            ok, error, elapsed = future.result()
+            results[index] = (ok, error)
+            if ok:
+                print(f"  {Colors.GREEN}[OK]{Colors.ENDC} {name} ({elapsed:.1f}s)")
+            else:
+                print(f"  {Colors.RED}[FAIL]{Colors.ENDC} {name}: {error}")
+    
+    # 依清單順序列出失敗的專案
+    failed = [
+        (project[0], error) for project, (ok, error) in zip(projects, results) if not ok
+    ]
+    print(f"\n{Colors.BLUE}批次摘要：{Colors.ENDC}")
+    print(f"- 成功: {len(projects) - len(failed)}")
+    print(f"- 失敗: {len(failed)}")
+    for project_path, error in failed:
+        print(f"  {Colors.RED}✗{Colors.ENDC} {project_path}: {error}")
+    return len(failed)
+
 def main():
     """主函數"""
     parser = argparse.ArgumentParser(description='Project Template System - 專案初始化工具')
@@ -614,11 +1271,29 @@ def main():
     parser.add_argument('-p', '--path', help='專案路徑（預設為當前目錄）')
     parser.add_argument('--no-git', action='store_true', help='不初始化 Git 倉庫')
     parser.add_argument('--no-interactive', action='store_true', help='非互動模式')
+    parser.add_argument('--manifest', help='批次模式：依 JSON/YAML 清單創建多個專案')
+    parser.add_argument('--workers', type=int, help='批次模式的進程數（預設為 CPU 核心數）')
+    parser.add_argument('--link-mode', choices=['auto', 'copy', 'hardlink'], default='auto',
+                        help='模板文件的放置方式：auto 優先使用 reflink，hardlink 與模板共用文件，copy 一律複製')
+    parser.add_argument('--update', action='store_true', help='更新現有專案：只寫入內容有變更的文件，保留使用者修改過的文件')
+    parser.add_argument('--force', action='store_true', help='搭配 --update：覆寫使用者修改過的文件')
+    parser.add_argument('--git-backend', choices=['native', 'subprocess'], default='native',
+                        help='初始提交的寫入方式：native 直接寫出 Git 物件，subprocess 執行 git init/add/commit')
     
     args = parser.parse_args()
     
     print_banner()
     
+    if args.manifest:
+        sys.exit(1 if run_batch(args) else 0)
+    
+    if args.update:
+        if not args.project_name:
+            print(f"{Colors.RED}錯誤：--update 需要指定專案名稱{Colors.ENDC}")
+            sys.exit(1)
+        update_project((Path(args.path) if args.path else Path.cwd()) / args.project_name, args)
+        return
+    
     # 互動式輸入
     if args.no_interactive:
         # 非互動模式需要所有必要參數
@@ -634,7 +1309,7 @@ def main():
             'claude_config': 'standard',
             'mode': 'new'
         }
-        selected_agents = ['strategic-planner-agent', 'task-executor-agent', 'base-agent']
+        selected_agents = list(DEFAULT_AGENTS)
     else:
         # 獲取專案名稱
         project_name = args.project_name or get_user_input("請輸入專案名稱: ")
@@ -680,32 +1355,7 @@ def main():
         sys.exit(1)
     
     # 創建專案
-    print(f"\n{Colors.GREEN}正在創建專案結構...{Colors.ENDC}")
-    project_path.mkdir(parents=True, exist_ok=True)
-    
-    # 創建目錄結構
-    create_directory_structure(project_path, project_info['type'])
-    
-    # 設置 CLAUDE.md
-    print(f"{Colors.GREEN}設置 CLAUDE.md 配置...{Colors.ENDC}")
-    setup_claude_config(project_path, project_info['claude_config'], project_info)
-    
-    # 複製 Agent 配置
-    if selected_agents:
-        print(f"{Colors.GREEN}設置 Agent 配置...{Colors.ENDC}")
-        copy_agent_configs(project_path, selected_agents)
-    
-    # 如果選擇了 Steering Architect，初始化 .ai-rules
-    if 'steering-architect-agent' in selected_agents:
-        initialize_ai_rules(project_path, project_info)
-    
-    # 創建專案文件
-    print(f"{Colors.GREEN}創建專案文件...{Colors.ENDC}")
-    create_project_files(project_path, project_info, selected_agents)
-    
-    # 複製驗證腳本
-    print(f"{Colors.GREEN}創建檢查腳本...{Colors.ENDC}")
-    copy_validation_scripts(project_path, project_info['type'])
+    create_project(project_path, project_info, selected_agents, args.link_mode)
     
     # 初始化 Git
     if not args.no_git:
@@ -715,7 +1365,7 @@ def main():
             init_git = response.lower() == 'y'
         
         if init_git:
-            setup_git_repo(project_path)
+            setup_git_repo(project_path, args.git_backend)
     
     # 顯示完成訊息
     show_completion_message(project_info, selected_agents)
@@ -5,15 +5,33 @@ Project Validation Framework - 專案驗證框架
 統一的跨平台專案品質檢查工具
 """
 
+import io
 import os
 import sys
 import re
 import json
+import time
+import hashlib
 import argparse
+import ast
+import fnmatch
 import subprocess
+import zlib
+import select
+import struct
+import ctypes
+import signal
+import socket
+import tempfile
+import cProfile
+import pstats
+import stat
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import platform
 
 # 顏色輸出支援
@@ -35,47 +53,1142 @@ class Colors:
         Colors.RED = ''
         Colors.ENDC = ''
         Colors.BOLD = ''
+    
+    @staticmethod
+    def enable():
+        """恢復彩色輸出（驗證服務依每個請求切換）"""
+        Colors.BLUE = '\033[94m'
+        Colors.GREEN = '\033[92m'
+        Colors.YELLOW = '\033[93m'
+        Colors.RED = '\033[91m'
+        Colors.ENDC = '\033[0m'
+        Colors.BOLD = '\033[1m'
 
 # Windows 舊版本檢測
 if platform.system() == 'Windows' and sys.version_info < (3, 6):
     Colors.disable()
 
+class Finding:
+    """單一檢查發現的精簡紀錄
+
+    只保存規則、文件（同一文件的發現共用同一個路徑字串）、行號與數值，
+    訊息在輸出時才依規則的模板格式化。
+    """
+    __slots__ = ('rule', 'template', 'path', 'line', 'value')
+    
+    def __init__(self, rule: str, template: str, path: str, line: Optional[int] = None, value=None):
+        self.rule = rule
+        self.template = template
+        self.path = path
+        self.line = line
+        self.value = value
+    
+    def __str__(self):
+        return self.template.format(rule=self.rule, path=self.path, line=self.line, value=self.value)
+
 class ValidationResult:
-    """驗證結果類"""
-    def __init__(self, check_name: str):
+    """驗證結果類
+
+    錯誤和警告可以是字串或 Finding，讀取 errors / warnings 時才格式化；
+    超過 max_findings 的項目只計入 suppressed_errors / suppressed_warnings，
+    彙總行只出現在終端與 Markdown 輸出（error_lines / warning_lines）。
+    """
+    def __init__(self, check_name: str, max_findings: Optional[int] = None):
         self.check_name = check_name
         self.passed = True
-        self.warnings = []
-        self.errors = []
+        self.max_findings = max_findings
+        self._warnings = []
+        self._errors = []
+        self.suppressed_warnings = 0
+        self.suppressed_errors = 0
         self.info = []
     
-    def add_warning(self, message: str):
-        self.warnings.append(message)
+    @property
+    def warnings(self) -> List[str]:
+        return [str(item) for item in self._warnings]
     
-    def add_error(self, message: str):
-        self.errors.append(message)
+    @property
+    def errors(self) -> List[str]:
+        return [str(item) for item in self._errors]
+    
+    @property
+    def warning_lines(self) -> List[str]:
+        """供顯示的警告列表（附上未列出數量的彙總行）"""
+        messages = self.warnings
+        if self.suppressed_warnings:
+            messages.append(f"... 另有 {self.suppressed_warnings} 個警告未列出")
+        return messages
+    
+    @property
+    def error_lines(self) -> List[str]:
+        """供顯示的錯誤列表（附上未列出數量的彙總行）"""
+        messages = self.errors
+        if self.suppressed_errors:
+            messages.append(f"... 另有 {self.suppressed_errors} 個錯誤未列出")
+        return messages
+    
+    def _full(self, items: list) -> bool:
+        return self.max_findings is not None and len(items) >= self.max_findings
+    
+    def add_warning(self, message):
+        if self._full(self._warnings):
+            self.suppress('warning')
+        else:
+            self._warnings.append(message)
+    
+    def add_error(self, message):
+        if self._full(self._errors):
+            self.suppress('error')
+        else:
+            self._errors.append(message)
         self.passed = False
     
+    def suppress(self, level: str, count: int = 1):
+        """記錄未列出的發現數量"""
+        if level == 'error':
+            self.suppressed_errors += count
+            self.passed = False
+        else:
+            self.suppressed_warnings += count
+    
     def add_info(self, message: str):
         self.info.append(message)
     
+    @property
+    def finding_count(self) -> int:
+        """錯誤和警告的總數（含未列出的部分）"""
+        return (len(self._errors) + len(self._warnings) +
+                self.suppressed_errors + self.suppressed_warnings)
+    
+    def to_dict(self) -> Dict:
+        return {
+            'check': self.check_name,
+            'passed': self.passed,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'suppressed_errors': self.suppressed_errors,
+            'suppressed_warnings': self.suppressed_warnings,
+            'info': self.info
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ValidationResult':
+        """由 to_dict 的輸出重建結果（訊息已格式化）"""
+        result = cls(data['check'])
+        result.passed = data['passed']
+        result._errors = list(data['errors'])
+        result._warnings = list(data['warnings'])
+        result.suppressed_errors = data.get('suppressed_errors', 0)
+        result.suppressed_warnings = data.get('suppressed_warnings', 0)
+        result.info = list(data['info'])
+        return result
+    
     def __str__(self):
         status = f"{Colors.GREEN}✓ 通過{Colors.ENDC}" if self.passed else f"{Colors.RED}✗ 失敗{Colors.ENDC}"
         return f"{self.check_name}: {status}"
 
+class SourceFile:
+    """單一源文件的快取內容
+
+    每次運行只讀取和解碼一次，所有檢查共用同一份資料；逐行檢查以串流方式走訪，
+    不另外保留分割後的行列表。
+    讀取失敗時會記住例外，並在每次存取時重新拋出，
+    讓各項檢查仍可按原本的方式回報錯誤。
+    超過 limit 位元組的文件只讀取開頭的完整行（見 truncated）。
+    """
+    __slots__ = ('path', 'target', 'limit', 'results', '_stat', '_text', '_error', '_derived', '_loaded')
+    
+    # 串流讀取的區塊大小
+    CHUNK_SIZE = 1 << 20
+    
+    def __init__(self, path: Path, target: bool = True, limit: Optional[int] = None):
+        self.path = path
+        self.target = target  # False 表示只作為跨文件比對參考（例如 --changed-since 範圍外的文件）
+        self.limit = limit  # 讀取內容的位元組上限（None 表示不限制）
+        self.results = {}  # 單文件掃描結果: 檢查名稱 -> (findings, data)
+        self._stat = None
+        self._text = None
+        self._error = None
+        self._derived = {}
+        self._loaded = 0  # 尚未計入耗時統計的已載入位元組數
+    
+    @property
+    def stat(self) -> os.stat_result:
+        """文件的 stat 資料（只查詢一次）"""
+        if self._stat is None:
+            self._stat = self.path.stat()
+        return self._stat
+    
+    @property
+    def truncated(self) -> bool:
+        """文件是否超過讀取上限（text 只包含開頭部分）"""
+        return self.limit is not None and self.stat.st_size > self.limit
+    
+    @property
+    def text(self) -> str:
+        """文件內容（超過上限時為開頭不超過 limit 位元組的完整行）"""
+        if self._text is None:
+            if self._error is not None:
+                raise self._error
+            try:
+                if self.truncated:
+                    with open(self.path, 'rb') as f:
+                        data = f.read(self.limit)
+                    # 在最後一個換行處截斷，避免切開多位元組字元
+                    cut = data.rfind(b'\n') + 1
+                    data = data[:cut] if cut else data
+                    self._text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()
+                    self._loaded += len(data)
+                else:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._text = f.read()
+                        self._loaded += os.fstat(f.fileno()).st_size
+            except Exception as e:
+                self._error = e
+                raise
+        return self._text
+    
+    def iter_lines(self):
+        """逐行走訪內容（保留換行符，與 readlines() 相同）；直接切割已快取的文本，不複製整份內容"""
+        text = self.text
+        find = text.find
+        start, end = 0, len(text)
+        while start < end:
+            stop = find('\n', start) + 1 or end
+            yield text[start:stop]
+            start = stop
+    
+    @property
+    def line_count(self) -> int:
+        """文件的總行數；超過上限的文件以固定大小的區塊串流計算，不載入整個文件"""
+        if not self.truncated:
+            text = self.text
+            return text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+        count = 0
+        last = b''
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                count += chunk.count(b'\n')
+                last = chunk
+        return count + (1 if last and not last.endswith(b'\n') else 0)
+    
+    def take_loaded_bytes(self) -> int:
+        """返回上次呼叫以來實際從磁碟載入的內容位元組數（每次載入只計算一次）"""
+        loaded, self._loaded = self._loaded, 0
+        return loaded
+    
+    def derive(self, key: str, compute):
+        """取得由文件內容衍生、供多項檢查共用的分析結果（每次運行只計算一次）"""
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+    
+    def release(self):
+        """釋放已快取的內容（掃描結果保留，需要時會重新讀取）"""
+        self._text = None
+        self._derived = {}
+
+class ResultCache:
+    """跨運行持久化的單文件掃描結果快取
+
+    以 路徑 + 大小 + mtime + 權限（可選內容雜湊）判斷文件是否變更，
+    並以指紋（配置與驗證器版本戳記）和快取格式版本作為整體失效條件。
+    """
+    
+    # 快取文件格式變更時遞增；掃描邏輯的變更已由指紋中的驗證器版本戳記涵蓋
+    VERSION = 7
+    
+    def __init__(self, path: Path, fingerprint: str, verify_hash: bool = False):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.verify_hash = verify_hash
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._written_ns = 0
+        self._dirty = False
+        self._load()
+    
+    def _load(self):
+        """載入快取文件（不存在、損壞或指紋不符時從空快取開始）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.VERSION or data.get('fingerprint') != self.fingerprint:
+            return
+        self.entries = data.get('files', {})
+        self._written_ns = data.get('written_ns', 0)
+    
+    @staticmethod
+    def _signature(source: SourceFile) -> List[int]:
+        st = source.stat
+        return [st.st_size, st.st_mtime_ns, st.st_mode]
+    
+    @staticmethod
+    def _content_hash(source: SourceFile) -> str:
+        digest = hashlib.sha1()
+        with open(source.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(SourceFile.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def restore(self, source: SourceFile) -> bool:
+        """若文件未變更，將快取的掃描結果填入 source.results"""
+        entry = self.entries.get(str(source.path))
+        try:
+            signature = self._signature(source)
+            # mtime 不早於上次寫入快取的時間時，無法排除同一時間刻度內的修改
+            unchanged = (entry is not None and entry['stat'] == signature
+                         and signature[1] < self._written_ns)
+            if entry is not None and not unchanged and self.verify_hash and entry.get('sha1'):
+                unchanged = entry['sha1'] == self._content_hash(source)
+                if unchanged:
+                    entry['stat'] = signature
+                    self._dirty = True
+        except OSError:
+            unchanged = False
+        
+        if not unchanged:
+            self.misses += 1
+            return False
+        for check, output in entry['results'].items():
+            source.results.setdefault(check, output)
+        self.hits += 1
+        return True
+    
+    def store(self, source: SourceFile):
+        """記錄文件目前的掃描結果"""
+        key = str(source.path)
+        try:
+            signature = self._signature(source)
+            entry = {'stat': signature, 'results': dict(source.results)}
+            if self.verify_hash:
+                entry['sha1'] = self._content_hash(source)
+        except OSError:
+            self.entries.pop(key, None)
+            return
+        previous = self.entries.get(key)
+        if previous is not None and previous['stat'] == signature:
+            # 保留本次未運行的檢查（例如只執行了 --check security）的結果
+            entry['results'] = {**previous['results'], **entry['results']}
+        self.entries[key] = entry
+        self._dirty = True
+    
+    def save(self):
+        """原子地寫回快取文件，並移除已刪除文件的條目"""
+        if not self._dirty:
+            return
+        for key in [key for key in self.entries if not os.path.exists(key)]:
+            del self.entries[key]
+        data = {
+            'version': self.VERSION,
+            'fingerprint': self.fingerprint,
+            'written_ns': time.time_ns(),
+            'files': self.entries,
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"{Colors.YELLOW}無法寫入快取文件 {self.path}: {e}{Colors.ENDC}")
+        self._dirty = False
+
+class CheckTimings:
+    """單次運行中各項檢查的耗時與工作量
+
+    每項檢查分為兩部分計時：單文件掃描（_scan_<名稱>，逐文件累計，並行模式下為各工作進程的總和）
+    與 check_<名稱> 方法本身的彙總。同一文件的內容只讀取一次，讀取成本計入第一個讀取它的掃描。
+    trace 為 True 時另外記錄 Chrome trace 事件（每個文件的每項掃描一個事件）。
+    """
+    
+    COUNTERS = ('scan_wall', 'scan_cpu', 'check_wall', 'check_cpu', 'files', 'bytes', 'findings')
+    
+    def __init__(self, trace: bool = False):
+        self.checks = {}  # 掃描名稱 -> 統計
+        self.events = [] if trace else None
+        self.total = None  # 整次運行的 (牆鐘時間, CPU 時間)
+    
+    def _entry(self, name: str) -> Dict:
+        entry = self.checks.get(name)
+        if entry is None:
+            entry = self.checks[name] = dict.fromkeys(self.COUNTERS, 0)
+            entry.update(check=name, validator=None)
+        return entry
+    
+    def add_scan(self, name: str, wall: float, cpu: float, size: int):
+        entry = self._entry(name)
+        entry['scan_wall'] += wall
+        entry['scan_cpu'] += cpu
+        entry['files'] += 1
+        entry['bytes'] += size
+    
+    def add_check(self, name: str, result: ValidationResult, validator: str, wall: float, cpu: float):
+        entry = self._entry(name)
+        entry['check'] = result.check_name
+        entry['validator'] = validator
+        entry['check_wall'] += wall
+        entry['check_cpu'] += cpu
+        entry['findings'] += result.finding_count
+    
+    def event(self, name: str, category: str, started: float, wall: float, args: Dict = None):
+        """記錄一個 Chrome trace 的完整事件（started 為 time.perf_counter() 的值）"""
+        if self.events is not None:
+            self.events.append({'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                                'ts': round(started * 1e6, 1), 'dur': round(wall * 1e6, 1),
+                                'args': args or {}})
+    
+    def merge(self, checks: Dict, events: Optional[List[Dict]]):
+        """合併工作進程回傳的統計與事件"""
+        for name, counters in checks.items():
+            entry = self._entry(name)
+            for key in self.COUNTERS:
+                entry[key] += counters[key]
+        if self.events is not None and events:
+            self.events.extend(events)
+    
+    def rows(self) -> List[Dict]:
+        """各項檢查的統計，依總耗時由高到低排序"""
+        rows = []
+        for name, entry in self.checks.items():
+            row = dict(entry, name=name,
+                       wall=entry['scan_wall'] + entry['check_wall'],
+                       cpu=entry['scan_cpu'] + entry['check_cpu'])
+            rows.append(row)
+        return sorted(rows, key=lambda row: row['wall'], reverse=True)
+    
+    def to_dict(self) -> Dict:
+        rows = []
+        for row in self.rows():
+            rows.append({key: round(value, 6) if isinstance(value, float) else value
+                         for key, value in row.items()})
+        total = None
+        if self.total is not None:
+            total = {'wall': round(self.total[0], 6), 'cpu': round(self.total[1], 6)}
+        return {'total': total, 'checks': rows}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CheckTimings':
+        """由 to_dict 的輸出重建（驗證服務回傳的統計）"""
+        timings = cls()
+        for row in data.get('checks', []):
+            timings.checks[row['name']] = {key: row[key] for key in cls.COUNTERS + ('check', 'validator')}
+        if data.get('total'):
+            timings.total = (data['total']['wall'], data['total']['cpu'])
+        return timings
+    
+    def print_table(self):
+        """打印各項檢查的耗時表"""
+        rows = self.rows()
+        if not rows:
+            return
+        print(f"\n{Colors.BLUE}檢查耗時（依總耗時排序）：{Colors.ENDC}")
+        print("    掃描 ms   彙總 ms    CPU ms    文件        KB   發現  檢查")
+        for row in rows:
+            print(f"  {row['scan_wall'] * 1000:>9.1f} {row['check_wall'] * 1000:>9.1f} {row['cpu'] * 1000:>9.1f} "
+                  f"{row['files']:>7} {row['bytes'] / 1024:>9.1f} {row['findings']:>6}  {row['check']}")
+        if self.total is not None:
+            print(f"  總耗時 {self.total[0] * 1000:.1f} ms（CPU {self.total[1] * 1000:.1f} ms）")
+    
+    def write_trace(self, path: Path):
+        """將事件寫成 Chrome trace JSON（可在 chrome://tracing 或 Perfetto 中開啟）"""
+        pids = sorted({event['pid'] for event in self.events or []})
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                     'args': {'name': 'validator' if pid == os.getpid() else f'worker {pid}'}}
+                    for pid in pids]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + (self.events or []), 'displayTimeUnit': 'ms'},
+                      f, ensure_ascii=False)
+
+class SourceCorpus:
+    """單次運行的源文件集合，讓多個驗證器共用一次 I/O
+
+    targets 指定本次要驗證的文件（預設為全部）；其餘文件只為跨文件檢查
+    提供比對索引，不回報它們自身的問題。limit 為每個文件讀取內容的位元組上限。
+    """
+    
+    def __init__(self, files: List[Path], cache: ResultCache = None, targets: List[Path] = None,
+                 limit: Optional[int] = None):
+        target_set = None if targets is None else set(targets)
+        self.all_files = [SourceFile(path, target_set is None or path in target_set, limit) for path in files]
+        self.files = [source for source in self.all_files if source.target]
+        self.cache = cache
+        self.limit = limit
+        self.timings = CheckTimings()
+    
+    def update(self, files: List[Path], changed: Iterable[Path] = ()):
+        """以新的文件列表更新集合
+
+        未變更的文件保留既有的掃描結果；changed 中的文件與新加入的文件重新建立，
+        下次 analyze 時只會掃描它們。
+        """
+        changed = set(changed)
+        existing = {source.path: source for source in self.all_files}
+        self.all_files = [
+            existing[path] if path in existing and path not in changed else SourceFile(path, True, self.limit)
+            for path in files
+        ]
+        self.files = [source for source in self.all_files if source.target]
+    
+    def set_targets(self, targets: Optional[Iterable[Path]]):
+        """重新指定要驗證的文件（None 表示全部），已完成的掃描結果保留"""
+        target_set = None if targets is None else set(targets)
+        for source in self.all_files:
+            source.target = target_set is None or source.path in target_set
+        self.files = [source for source in self.all_files if source.target]
+    
+    def __iter__(self):
+        return iter(self.files)
+    
+    def __len__(self):
+        return len(self.files)
+    
+    def analyze(self, validators: List['ProjectValidator'], jobs: int = 1):
+        """為所有文件執行各驗證器的單文件掃描
+
+        以文件為單位一次跑完所有掃描；jobs > 1 時將文件分片交給進程池，
+        結果依原文件順序合併，輸出與串行執行完全一致。
+        """
+        checks = tuple(check for validator in validators for check in validator.file_checks)
+        # 範圍外的文件只需要建立跨文件比對索引
+        index_checks = tuple(check for validator in validators for check in validator.index_checks)
+        
+        def is_pending(source, required):
+            return any(check not in source.results for check in required)
+        
+        started = time.perf_counter()
+        pending = []
+        index_pending = []
+        for source in self.all_files:
+            required = checks if source.target else index_checks
+            # 未變更的文件直接重播快取的結果
+            if self.cache is not None and is_pending(source, required):
+                self.cache.restore(source)
+            if is_pending(source, required):
+                (pending if source.target else index_pending).append(source)
+        
+        if pending:
+            self._scan(pending, validators, jobs)
+        if index_pending:
+            self._scan(index_pending, validators, jobs, index_checks)
+        
+        if self.cache is not None:
+            for source in pending + index_pending:
+                self.cache.store(source)
+            self.cache.save()
+        if pending or index_pending:
+            self.timings.event('analyze', 'phase', started, time.perf_counter() - started,
+                               {'files': len(pending), 'reference_files': len(index_pending)})
+    
+    def _scan(self, pending: List[SourceFile], validators: List['ProjectValidator'],
+              jobs: int, checks: Tuple[str, ...] = None):
+        """串行或並行地掃描指定文件"""
+        if jobs > 1 and len(pending) > 1:
+            try:
+                outputs = _analyze_parallel(pending, validators, jobs, checks, self.limit, self.timings)
+            except (OSError, BrokenProcessPool) as e:
+                print(f"{Colors.YELLOW}無法啟動並行處理，改為串行執行: {e}{Colors.ENDC}")
+            else:
+                for source, output in zip(pending, outputs):
+                    source.results.update(output)
+                return
+        
+        for source in pending:
+            source.results.update(_scan_source(source, validators, checks, self.timings))
+            source.release()
+
+def _scan_source(source: SourceFile, validators: List['ProjectValidator'],
+                 checks: Tuple[str, ...] = None, timings: CheckTimings = None) -> Dict:
+    """對單一文件執行所有尚未完成的單文件掃描（checks 可限定掃描項目），耗時累計到 timings"""
+    output = {}
+    for validator in validators:
+        # 超過大小上限且設定為略過時，只執行不需要讀取內容的掃描
+        skip_content = validator.oversize_policy == 'skip' and source.truncated
+        for check in validator.file_checks:
+            if check not in source.results and (checks is None or check in checks):
+                started = time.perf_counter()
+                cpu = time.process_time()
+                if skip_content and check not in validator.metadata_checks:
+                    output[check] = ([], None)
+                else:
+                    output[check] = validator.run_scan(check, source)
+                # 位元組只計入實際載入內容的掃描；不需要內容的掃描計為 0，
+                # 它們順帶載入的內容留給下一項內容掃描計算
+                size = 0 if check in validator.metadata_checks else source.take_loaded_bytes()
+                if timings is not None:
+                    wall = time.perf_counter() - started
+                    timings.add_scan(check, wall, time.process_time() - cpu, size)
+                    timings.event(check, 'scan', started, wall, {'file': str(source.path)})
+    return output
+
+# 進程池工作者使用的驗證器（由 _init_worker 建立）
+_worker_validators = []
+
+def _init_worker(specs: List[Tuple[type, Path, Dict]]):
+    """在工作進程中重建驗證器"""
+    global _worker_validators
+    _worker_validators = [cls(project_root, config) for cls, project_root, config in specs]
+
+def _analyze_shard(task: Tuple[List[Path], Optional[Tuple[str, ...]], Optional[int], bool]) -> Tuple:
+    """在工作進程中掃描一個文件分片，返回 (各文件的結果, 耗時統計, trace 事件)"""
+    paths, checks, limit, trace = task
+    timings = CheckTimings(trace)
+    outputs = [_scan_source(SourceFile(path, limit=limit), _worker_validators, checks, timings) for path in paths]
+    return outputs, timings.checks, timings.events
+
+def _analyze_parallel(sources: List[SourceFile], validators: List['ProjectValidator'],
+                      jobs: int, checks: Tuple[str, ...] = None, limit: Optional[int] = None,
+                      timings: CheckTimings = None) -> List[Dict]:
+    """將文件分片交給進程池掃描，並按原順序返回結果（各進程的耗時合併到 timings）"""
+    specs = [(type(v), v.project_root, v.config) for v in validators]
+    paths = [source.path for source in sources]
+    trace = timings is not None and timings.events is not None
+    # 每個工作進程分配多個分片，以平衡大小不一的文件
+    chunk_size = max(1, -(-len(paths) // (jobs * 4)))
+    shards = [(paths[i:i + chunk_size], checks, limit, trace) for i in range(0, len(paths), chunk_size)]
+    
+    outputs = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(specs,)) as executor:
+        for shard_output, shard_checks, shard_events in executor.map(_analyze_shard, shards):
+            outputs.extend(shard_output)
+            if timings is not None:
+                timings.merge(shard_checks, shard_events)
+    return outputs
+
+class RuleEngine:
+    """預先編譯的多規則掃描引擎
+
+    所有規則的字面關鍵字合併成單一不分大小寫的正規表示式，以一次掃描找出可能命中的行，
+    再只對這些行執行相關規則的完整模式；回報每個命中的規則 ID 與行號。
+    規則的完整模式必須包含其關鍵字之一，且以行為範圍比對。
+
+    不分大小寫的比對也接受 Unicode 大小寫變體（例如以 ſ 代替 s），這類命中文字轉小寫後不等於任何關鍵字，
+    改以相同的比對規則找回對應的關鍵字。每次命中後從下一個字元繼續搜尋，
+    重疊的關鍵字（例如 selectoken 中的 select 與 token）不會互相遮蔽。
+    """
+    
+    def __init__(self, rules: List[Tuple[str, Tuple[str, ...], str, int]]):
+        # rules: [(rule_id, 關鍵字, 正規表示式, flags), ...]
+        self.rules = [(rule_id, re.compile(pattern, flags)) for rule_id, _, pattern, flags in rules]
+        literals = sorted({literal.lower() for _, keywords, _, _ in rules for literal in keywords},
+                          key=len, reverse=True)
+        # 關鍵字命中時，所有關鍵字是其子字串的規則都需要驗證（例如 exec 之於 execute）
+        self.candidates = {
+            literal: tuple(index for index, (_, keywords, _, _) in enumerate(rules)
+                           if any(keyword.lower() in literal for keyword in keywords))
+            for literal in literals
+        }
+        self.literals = [(literal, re.compile(re.escape(literal), re.IGNORECASE)) for literal in literals]
+        self.prefilter = re.compile('|'.join(re.escape(literal) for literal in literals),
+                                    re.IGNORECASE) if literals else None
+    
+    def scan(self, text: str) -> List[Tuple[str, int]]:
+        """掃描文本，返回按行號排序的 (rule_id, 行號) 列表"""
+        hits = []
+        if self.prefilter is None:
+            return hits
+        
+        line_no = 1
+        counted = 0  # 行號已計算到的位置
+        line_start = line_end = -1
+        pending = set()
+        search = self.prefilter.search
+        match = search(text)
+        while match is not None:
+            start = match.start()
+            if start > line_end:
+                # 進入新的一行：先驗證上一行累積的候選規則
+                self._verify(text, line_start, line_end, line_no, pending, hits)
+                line_no += text.count('\n', counted, start)
+                counted = start
+                line_start = text.rfind('\n', 0, start) + 1
+                line_end = text.find('\n', start)
+                if line_end < 0:
+                    line_end = len(text)
+            found = match.group().lower()
+            candidates = self.candidates.get(found)
+            if candidates is None:
+                candidates = self.candidates[found] = self._variant_candidates(found)
+            pending.update(candidates)
+            match = search(text, start + 1)
+        self._verify(text, line_start, line_end, line_no, pending, hits)
+        return hits
+    
+    def _variant_candidates(self, found: str) -> Tuple[int, ...]:
+        """Unicode 大小寫變體的命中文字所對應關鍵字的候選規則（結果由呼叫端記住）"""
+        for literal, pattern in self.literals:
+            if pattern.fullmatch(found):
+                return self.candidates[literal]
+        return ()
+    
+    def _verify(self, text: str, line_start: int, line_end: int, line_no: int,
+                pending: set, hits: List[Tuple[str, int]]):
+        """對一行執行候選規則的完整模式"""
+        for index in sorted(pending):
+            rule_id, regex = self.rules[index]
+            if regex.search(text, line_start, line_end):
+                hits.append((rule_id, line_no))
+        pending.clear()
+
+class PythonAnalysis:
+    """以 ast 單次解析 Python 文件所得的結構資訊
+
+    functions: [(名稱, 起始行, 結束行, 圈複雜度), ...]（含方法與巢狀函數）
+    imports: [(行號, 導入鍵), ...]，導入鍵包含所在函數的起始行（模組層級為 0），
+             相同鍵表示同一作用域中相同的導入語句；不同函數各自的局部導入不算重複
+    calls: [(被呼叫的名稱, 行號), ...]，只記錄直接以名稱呼叫的函數
+    """
+    __slots__ = ('functions', 'imports', 'calls')
+    
+    # 每個出現都使圈複雜度 +1 的節點
+    BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler,
+                    ast.Assert) + ((ast.match_case,) if hasattr(ast, 'match_case') else ())
+    
+    def __init__(self):
+        self.functions = []
+        self.imports = []
+        self.calls = []
+    
+    @classmethod
+    def parse(cls, text: str) -> Optional['PythonAnalysis']:
+        """解析源代碼（語法錯誤時返回 None，由呼叫端改用正規表示式分析）"""
+        try:
+            tree = ast.parse(text)
+            analysis = cls()
+            analysis._visit(tree, None)
+        except (SyntaxError, ValueError, RecursionError):
+            return None
+        return analysis
+    
+    def _visit(self, node: ast.AST, function: Optional[list]):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                record = [child.name, child.lineno, child.end_lineno, 1]
+                self.functions.append(record)
+                self._visit(child, record)
+                continue
+            
+            if function is not None:
+                if isinstance(child, self.BRANCH_NODES):
+                    function[3] += 1
+                elif isinstance(child, ast.BoolOp):
+                    function[3] += len(child.values) - 1
+                elif isinstance(child, ast.comprehension):
+                    function[3] += 1 + len(child.ifs)
+            
+            if isinstance(child, (ast.Import, ast.ImportFrom)):
+                scope = function[1] if function is not None else 0
+                self.imports.append((child.lineno, (scope, ast.dump(child))))
+            elif isinstance(child, ast.Call) and isinstance(child.func, ast.Name):
+                self.calls.append((child.func.id, child.lineno))
+            self._visit(child, function)
+
+class CloneDetector:
+    """以 token 切片、MinHash 與 LSH 偵測相似文件和重複代碼區塊
+
+    每個文件只計算一次指紋（可快取）：
+    - signature: 以單一雜湊分桶的 MinHash 簽名（one permutation hashing），用於估計文件間的 Jaccard 相似度
+    - fingerprints: winnowing 選出的切片雜湊 [(雜湊, 起始行, 結束行), ...]，用於定位重複的行範圍
+    跨文件比對時以 LSH 分段找出候選文件對，並以倒排索引找出共用區塊，整體約為線性時間。
+    """
+    
+    TOKEN_PATTERN = re.compile(r'[A-Za-z_]\w*|\d+|\S')
+    MODULUS = (1 << 61) - 1
+    BASE = 1000003
+    MASK = (1 << 64) - 1
+    # 出現在過多文件中的切片視為樣板代碼，不用於區塊比對
+    MAX_POSTINGS = 64
+    
+    def __init__(self, shingle_size: int = 12, permutations: int = 64, bands: int = 16,
+                 window: int = 8):
+        self.shingle_size = max(1, shingle_size)
+        self.permutations = max(1, permutations)
+        self.bands = max(1, min(bands, self.permutations))
+        self.rows = self.permutations // self.bands
+        self.window = max(1, window)
+    
+    def fingerprint(self, lines: Iterable[str]) -> Optional[Dict]:
+        """計算文件的簽名與區塊指紋（token 數不足一個切片時返回 None）"""
+        words = []
+        token_lines = []
+        findall = self.TOKEN_PATTERN.findall
+        for line_no, line in enumerate(lines, 1):
+            found = findall(line)
+            if found:
+                words.extend(found)
+                token_lines.extend([line_no] * len(found))
+        
+        size = self.shingle_size
+        if len(words) < size:
+            return None
+        
+        # crc32 在不同進程間穩定（內建 hash() 對字串有隨機化），結果可跨進程與快取比對
+        vocabulary = {word: zlib.crc32(word.encode('utf-8')) + 1 for word in set(words)}
+        tokens = list(map(vocabulary.__getitem__, words))
+        
+        # 滾動雜湊計算每個長度為 shingle_size 的 token 切片，同時以單一雜湊分桶取最小值
+        modulus, base, mask = self.MODULUS, self.BASE, self.MASK
+        top = pow(base, size - 1, modulus)
+        count = self.permutations
+        signature = [None] * count
+        rolling = 0
+        for value in tokens[:size - 1]:
+            rolling = (rolling * base + value) % modulus
+        shingles = []
+        append = shingles.append
+        for outgoing, incoming in zip(tokens, tokens[size - 1:]):
+            rolling = (rolling * base + incoming) % modulus
+            mixed = (rolling * 0x9E3779B97F4A7C15) & mask
+            mixed ^= mixed >> 29
+            append(mixed)
+            slot, value = mixed % count, mixed // count
+            current = signature[slot]
+            if current is None or value < current:
+                signature[slot] = value
+            rolling -= outgoing * top
+        
+        # 空桶以下一個非空桶填補
+        filled = [slot for slot in range(count) if signature[slot] is not None]
+        for slot in range(count):
+            if signature[slot] is None:
+                donor = next((s for s in filled if s > slot), filled[0])
+                signature[slot] = signature[donor]
+        
+        fingerprints = [
+            [shingles[index], token_lines[index], token_lines[index + size - 1]]
+            for index in self._winnow(shingles)
+        ]
+        return {'signature': signature, 'fingerprints': fingerprints}
+    
+    def _winnow(self, hashes: List[int]) -> List[int]:
+        """winnowing：每個視窗選出最小雜湊（相同時取最右側），返回不重複的索引"""
+        window = min(self.window, len(hashes))
+        selected = []
+        minimum = -1
+        for end in range(window - 1, len(hashes)):
+            start = end - window + 1
+            if minimum < start:
+                minimum = start
+                for index in range(start + 1, end + 1):
+                    if hashes[index] <= hashes[minimum]:
+                        minimum = index
+                selected.append(minimum)
+            elif hashes[end] <= hashes[minimum]:
+                minimum = end
+                selected.append(minimum)
+        return selected
+    
+    def similarity(self, first: List[int], second: List[int]) -> float:
+        """以簽名估計兩個文件的 Jaccard 相似度"""
+        return sum(map(int.__eq__, first, second)) / len(first)
+    
+    def candidate_pairs(self, signatures: List[List[int]]) -> List[Tuple[int, int]]:
+        """LSH：簽名任一段完全相同的文件成為候選對，返回排序後的 (i, j)，i < j"""
+        pairs = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets = {}
+            for index, signature in enumerate(signatures):
+                buckets.setdefault(tuple(signature[start:start + self.rows]), []).append(index)
+            for members in buckets.values():
+                for position, first in enumerate(members):
+                    for second in members[position + 1:]:
+                        pairs.add((first, second))
+        return sorted(pairs)
+    
+    def shared_blocks(self, fingerprints: List[List[List[int]]]) -> Dict[Tuple[int, int], List]:
+        """以倒排索引找出共用切片的文件對，返回 {(i, j): [(i 起始行, i 結束行, j 起始行, j 結束行), ...]}"""
+        postings = {}
+        for index, entries in enumerate(fingerprints):
+            for value, start, end in entries:
+                postings.setdefault(value, []).append((index, start, end))
+        
+        matches = {}
+        for entries in postings.values():
+            if len({index for index, _, _ in entries}) > self.MAX_POSTINGS:
+                continue
+            for position, (first, first_start, first_end) in enumerate(entries):
+                for second, second_start, second_end in entries[position + 1:]:
+                    if first != second:
+                        matches.setdefault((first, second), []).append(
+                            (first_start, first_end, second_start, second_end))
+        return matches
+    
+    @staticmethod
+    def merge_ranges(matches: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """將相鄰的共用切片合併成連續的行範圍"""
+        ranges = []
+        active = []  # 仍可能向後延伸的範圍
+        for first_start, first_end, second_start, second_end in sorted(matches):
+            active = [item for item in active if first_start <= item[1] + 1]
+            for item in reversed(active):
+                if item[2] <= second_start <= item[3] + 1:
+                    item[1] = max(item[1], first_end)
+                    item[3] = max(item[3], second_end)
+                    break
+            else:
+                item = [first_start, first_end, second_start, second_end]
+                ranges.append(item)
+                active.append(item)
+        return [tuple(item) for item in ranges]
+
+class GitIgnore:
+    """單一 .gitignore 文件的規則
+
+    支援註解、否定（!）、目錄限定（結尾 /）、錨定路徑（含 /）以及 * ? ** 萬用字元。
+    """
+    
+    def __init__(self, lines: List[str]):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ') if not line.endswith('\\ ') else line
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+            prefix = '^' if anchored else '^(?:.*/)?'
+            self.rules.append((re.compile(prefix + self._translate(line) + '$'), negate, dir_only))
+    
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """將 gitignore 萬用字元轉換為正規表示式"""
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            elif pattern[i] == '[':
+                # 未閉合的 [ 是字元本身
+                bracket = GitIgnore._bracket(pattern, i + 1)
+                regex, i = bracket if bracket is not None else (re.escape('['), i + 1)
+                parts.append(regex)
+            elif pattern[i] == '\\' and i + 1 < len(pattern):
+                parts.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return ''.join(parts)
+    
+    @staticmethod
+    def _bracket(pattern: str, start: int) -> Optional[Tuple[str, int]]:
+        """轉換從 start（[ 之後）開始的字元集合；返回 (正規表示式, ] 之後的位置)，未閉合時返回 None
+
+        只有開頭的 ! 或 ^ 表示否定，緊接其後的 ] 是字元本身；\\ 轉義下一個字元，
+        除了範圍中的 - 以外，其餘字元一律轉義。否定的集合與 * 相同，不匹配 /。
+        """
+        i = start
+        negate = i < len(pattern) and pattern[i] in '!^'
+        if negate:
+            i += 1
+        items = []
+        first = True
+        while i < len(pattern):
+            char = pattern[i]
+            if char == ']' and not first:
+                body = ''.join(items)
+                return ('[^/' + body + ']' if negate else '[' + body + ']'), i + 1
+            escaped = char == '\\' and i + 1 < len(pattern)
+            if escaped:
+                i += 1
+                char = pattern[i]
+            if char == '-' and not escaped and items and items[-1] != '-':
+                items.append('-')
+            else:
+                items.append(re.escape(char))
+            first = False
+            i += 1
+        return None
+    
+    @classmethod
+    def load(cls, directory: str) -> Optional['GitIgnore']:
+        """載入目錄中的 .gitignore（不存在時返回 None）"""
+        try:
+            with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+    
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """返回 True（忽略）、False（被 ! 重新包含）或 None（無規則匹配）"""
+        decision = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                decision = not negate
+        return decision
+
+def walk_source_files(project_root: Path, source_path: Path, extensions: List[str],
+                      excluded_paths: List[str] = (), use_gitignore: bool = True) -> List[Path]:
+    """單次遍歷源代碼目錄，收集符合副檔名的文件
+
+    排除的目錄在進入前即被剪除；excluded_paths 中不含 / 的項目比對任意層級的名稱，
+    含 / 的項目比對相對專案根目錄的路徑（皆支援萬用字元）。
+    結果按副檔名在 extensions 中的順序分組，組內為遍歷順序。
+    """
+    names = [p for p in excluded_paths if '/' not in p.strip('/')]
+    paths = [p.strip('/') for p in excluded_paths if '/' in p.strip('/')]
+    name_re = re.compile('|'.join(fnmatch.translate(p.strip('/')) for p in names)) if names else None
+    path_re = re.compile('|'.join(fnmatch.translate(p) for p in paths)) if paths else None
+    root = str(project_root)
+    
+    def excluded(name, rel_path):
+        return bool((name_re and name_re.match(name)) or (path_re and path_re.match(rel_path)))
+    
+    def ignored(ignores, full_path, is_dir):
+        decision = None
+        for base, gitignore in ignores:
+            result = gitignore.match(os.path.relpath(full_path, base).replace(os.sep, '/'), is_dir)
+            if result is not None:
+                decision = result
+        return bool(decision)
+    
+    # 從專案根目錄到源代碼目錄沿途的 .gitignore 也適用
+    ignores = []
+    if use_gitignore:
+        directory = source_path
+        chain = []
+        while True:
+            chain.append(directory)
+            if directory == project_root or directory == directory.parent:
+                break
+            directory = directory.parent
+        for directory in reversed(chain[1:]):
+            gitignore = GitIgnore.load(str(directory))
+            if gitignore:
+                ignores.append((str(directory), gitignore))
+    
+    buckets = {ext: [] for ext in extensions}
+    suffixes = tuple(extensions)
+    stack = [(str(source_path), ignores)]
+    while stack:
+        directory, ignores = stack.pop()
+        if use_gitignore:
+            gitignore = GitIgnore.load(directory)
+            if gitignore:
+                ignores = ignores + [(directory, gitignore)]
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+            if excluded(entry.name, rel_path):
+                continue
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir:
+                    if not (ignores and ignored(ignores, entry.path, True)):
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(suffixes) and entry.is_file():
+                    if not (ignores and ignored(ignores, entry.path, False)):
+                        ext = next(ext for ext in extensions if entry.name.endswith(ext))
+                        buckets[ext].append(Path(entry.path))
+            except OSError:
+                continue
+        # 反向壓入，使子目錄按名稱順序被遍歷
+        stack.extend((subdir, ignores) for subdir in reversed(subdirs))
+    
+    return [path for ext in extensions for path in buckets[ext]]
+
+def scope_files(project_root: Path, config: Dict) -> Optional[List[Path]]:
+    """依 files / staged / changed_since 配置返回限定驗證的文件（未限定範圍時返回 None）"""
+    if config.get('files'):
+        return [Path(path) for path in config['files']]
+    if config.get('staged'):
+        return git_changed_files(project_root, staged=True)
+    if config.get('changed_since'):
+        return git_changed_files(project_root, ref=config['changed_since'])
+    return None
+
+def git_changed_files(project_root: Path, ref: str = None, staged: bool = False) -> List[Path]:
+    """獲取相對於 Git 參照（或暫存區中）新增、修改的文件
+
+    ref 模式包含工作區的未提交修改與未追蹤文件；Git 不可用時拋出
+    subprocess.CalledProcessError 或 FileNotFoundError。
+    """
+    def git(*args):
+        completed = subprocess.run(['git', *args], cwd=project_root, check=True,
+                                   capture_output=True, text=True, encoding='utf-8')
+        return [line for line in completed.stdout.splitlines() if line]
+    
+    if staged:
+        names = git('diff', '--name-only', '--relative', '--cached', '--diff-filter=ACMR')
+    else:
+        names = git('diff', '--name-only', '--relative', '--diff-filter=ACMR', ref, '--')
+        names += git('ls-files', '--others', '--exclude-standard')
+    return [project_root / name for name in dict.fromkeys(names)]
+
 class ProjectValidator:
     """專案驗證器基類"""
     
-    def __init__(self, project_root: Path, config: Dict = None):
+    # 只影響運行方式、不影響檢查結果的配置項（不計入快取指紋）
+    RUNTIME_CONFIG_KEYS = ('jobs', 'cache', 'cache_file', 'cache_hash', 'changed_since', 'staged', 'files')
+    
+    # 單文件掃描項目，每項對應一個 _scan_<名稱>(source) 方法（子類定義）
+    file_checks: Tuple[str, ...] = ()
+    
+    # 跨文件檢查需要的掃描項目；限定驗證範圍時，範圍外的文件仍會執行這些掃描以建立比對索引
+    index_checks: Tuple[str, ...] = ()
+    
+    # 不需要讀取文件內容的掃描項目；超過大小上限而略過的文件仍會執行
+    metadata_checks: Tuple[str, ...] = ()
+    
+    # 單文件掃描發現的訊息模板；發現以 (等級, 規則, 行號, 數值) 記錄，輸出時才格式化
+    MESSAGES = {
+        'read-error': "無法讀取 {value[0]}: {value[1]}",
+        'analyze-error': "無法分析 {value[0]}: {value[1]}",
+        'check-error': "無法檢查 {value[0]}: {value[1]}",
+    }
+    
+    def __init__(self, project_root: Path, config: Dict = None, corpus: SourceCorpus = None):
         self.project_root = project_root
         self.config = config or {}
         self.results = []
+        self._corpus = corpus
         
         # 從配置或自動檢測
         self.source_dir = self.config.get('source_dir', 'src')
         self.file_extensions = self.config.get('file_extensions', ['.py', '.js', '.ts', '.dart'])
+        self.excluded_paths = self.config.get('excluded_paths', ['node_modules', 'venv', 'build', 'dist', '.git'])
+        self.use_gitignore = self.config.get('use_gitignore', True)
+        self.python_backend = self.config.get('python_backend', 'regex')
+        # 超過 max_file_bytes 的文件（例如產生的打包文件）略過內容檢查或只抽樣分析開頭部分（預設不限制）
+        self.max_file_bytes = self.config.get('max_file_bytes', 0)
+        self.oversize_policy = self.config.get('oversize_policy', 'skip')
+        # 每個文件、每項檢查最多保留的錯誤/警告數（0 表示不限制）
+        self.max_findings_per_file = self.config.get('max_findings_per_file') or None
+        self.max_findings_per_check = self.config.get('max_findings_per_check') or None
         self.project_type = self.config.get('project_type', self._detect_project_type())
         self.primary_language = self.config.get('primary_language', self._detect_primary_language())
+        self.jobs = self.config.get('jobs', 1)
     
     def _detect_project_type(self) -> str:
         """自動檢測專案類型"""
@@ -99,23 +1212,153 @@ class ProjectValidator:
         }
         return lang_map.get(self.project_type, 'unknown')
     
-    def get_source_files(self) -> List[Path]:
-        """獲取所有源代碼文件"""
+    def get_all_source_files(self) -> List[Path]:
+        """獲取源代碼目錄下的所有源代碼文件（略過排除路徑與 .gitignore 忽略的文件）"""
         source_path = self.project_root / self.source_dir
         if not source_path.exists():
             return []
         
-        files = []
-        for ext in self.file_extensions:
-            files.extend(source_path.rglob(f'*{ext}'))
-        return files
+        return walk_source_files(self.project_root, source_path, self.file_extensions,
+                                 self.excluded_paths, self.use_gitignore)
+    
+    def get_changed_files(self) -> Optional[List[Path]]:
+        """依 files / changed_since / staged 配置獲取限定驗證的文件（未限定範圍時返回 None）"""
+        return scope_files(self.project_root, self.config)
+    
+    def get_source_files(self) -> List[Path]:
+        """獲取要驗證的源代碼文件（限定範圍時只包含變更的文件）"""
+        files = self.get_all_source_files()
+        changed = self.get_changed_files()
+        if changed is None:
+            return files
+        changed = set(changed)
+        return [path for path in files if path in changed]
+    
+    @property
+    def corpus(self) -> SourceCorpus:
+        """本次運行共用的源文件集合（首次存取時建立）"""
+        if self._corpus is None:
+            changed = self.get_changed_files()
+            self._corpus = SourceCorpus(self.get_all_source_files(), self._open_cache(), changed,
+                                        self.max_file_bytes or None)
+        return self._corpus
+    
+    def _open_cache(self) -> Optional[ResultCache]:
+        """依配置開啟結果快取（未啟用時返回 None）"""
+        if not self.config.get('cache'):
+            return None
+        cache_file = self.config.get('cache_file') or self.project_root / '.validator-cache.json'
+        settings = {k: v for k, v in self.config.items() if k not in self.RUNTIME_CONFIG_KEYS}
+        settings['project_type'] = self.project_type
+        settings['primary_language'] = self.primary_language
+        # 驗證器本身修改後，舊的掃描結果可能已不正確
+        settings['validator_stamp'] = _source_stamp()
+        fingerprint = hashlib.sha1(
+            json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return ResultCache(Path(cache_file), fingerprint, bool(self.config.get('cache_hash')))
+    
+    def new_result(self, check_name: str) -> ValidationResult:
+        """建立套用每項檢查發現上限的驗證結果"""
+        return ValidationResult(check_name, self.max_findings_per_check)
+    
+    def run_scan(self, check: str, source: SourceFile):
+        """執行單文件掃描，每個等級只保留前 max_findings_per_file 個發現，其餘以一筆 suppressed 記錄數量"""
+        findings, data = getattr(self, f'_scan_{check}')(source)
+        limit = self.max_findings_per_file
+        if limit is None or len(findings) <= limit:
+            return findings, data
+        
+        kept = []
+        dropped = {}
+        counts = {}
+        for finding in findings:
+            level = finding[0]
+            counts[level] = counts.get(level, 0) + 1
+            if counts[level] <= limit:
+                kept.append(finding)
+            else:
+                dropped[level] = dropped.get(level, 0) + 1
+        kept.extend((level, 'suppressed', None, count) for level, count in dropped.items())
+        return kept, data
+    
+    def scan(self, check: str, include_reference: bool = False):
+        """按文件順序產出某項單文件掃描的結果 (source, (findings, data))
+
+        include_reference 為 True 時也包含驗證範圍外、只作為比對參考的文件。
+        """
+        for source in (self.corpus.all_files if include_reference else self.corpus):
+            output = source.results.get(check)
+            if output is None:
+                output = self.run_scan(check, source)
+                source.results[check] = output
+            yield source, output
+    
+    def collect(self, result: ValidationResult, check: str, include_reference: bool = False):
+        """逐文件將掃描發現加入結果，並產出跨文件檢查所需的資料
+
+        參考文件只提供資料，它們自身的發現不會加入結果。
+        """
+        for source, (findings, data) in self.scan(check, include_reference):
+            if source.target and findings:
+                # 同一文件的發現共用同一個相對路徑字串
+                path = str(source.path.relative_to(self.project_root))
+                for level, rule, line, value in findings:
+                    if rule == 'suppressed':
+                        result.suppress(level, value)
+                    else:
+                        getattr(result, f'add_{level}')(Finding(rule, self.MESSAGES[rule], path, line, value))
+            yield source, data
+    
+    def capped_adder(self, result: ValidationResult):
+        """返回跨文件檢查加入發現用的函數 add(等級, 規則, 路徑, 行號, 數值)
+
+        與單文件掃描相同，每個文件每個等級最多列出 max_findings_per_file 個，其餘只計數。
+        """
+        limit = self.max_findings_per_file
+        counts = {}
+        
+        def add(level: str, rule: str, path: str, line: Optional[int] = None, value=None):
+            key = (path, level)
+            counts[key] = counts.get(key, 0) + 1
+            if limit is None or counts[key] <= limit:
+                getattr(result, f'add_{level}')(Finding(rule, self.MESSAGES[rule], path, line, value))
+            else:
+                result.suppress(level)
+        return add
+    
+    def run_check(self, name: str) -> ValidationResult:
+        """執行 check_<名稱> 並記錄彙總耗時與發現數"""
+        started = time.perf_counter()
+        cpu = time.process_time()
+        result = getattr(self, f'check_{name}')()
+        wall = time.perf_counter() - started
+        timings = self.corpus.timings
+        timings.add_check(name, result, type(self).__name__, wall, time.process_time() - cpu)
+        timings.event(result.check_name, 'check', started, wall, {'findings': result.finding_count})
+        return result
+    
+    def merge_findings(self, result: ValidationResult, check: str) -> ValidationResult:
+        """將某項單文件掃描的所有發現合併到結果中"""
+        for _ in self.collect(result, check):
+            pass
+        return result
+    
+    def python_analysis(self, source: SourceFile) -> Optional[PythonAnalysis]:
+        """使用 ast 後端時返回 Python 文件的解析結果（每個文件每次運行只解析一次）
+
+        未啟用 ast 後端、非 Python 文件或語法錯誤時返回 None，檢查應改用正規表示式分析。
+        """
+        if self.python_backend != 'ast' or source.path.suffix != '.py':
+            return None
+        return source.derive('python_ast', lambda: PythonAnalysis.parse(source.text))
     
     def run_all_checks(self) -> List[ValidationResult]:
         """運行所有檢查（子類實現）"""
         raise NotImplementedError
     
-    def print_summary(self):
-        """打印結果摘要"""
+    def print_summary(self, timings: CheckTimings = None):
+        """打印結果摘要（提供 timings 時附上各項檢查的耗時）"""
         total = len(self.results)
         passed = sum(1 for r in self.results if r.passed)
         failed = total - passed
@@ -143,440 +1386,622 @@ class ProjectValidator:
             for result in self.results:
                 if not result.passed:
                     print(f"\n{Colors.YELLOW}{result.check_name}:{Colors.ENDC}")
-                    for error in result.errors:
+                    for error in result.error_lines:
                         print(f"  {Colors.RED}✗{Colors.ENDC} {error}")
-                    for warning in result.warnings:
+                    for warning in result.warning_lines:
                         print(f"  {Colors.YELLOW}⚠{Colors.ENDC} {warning}")
+        
+        if timings is not None:
+            timings.print_table()
 
 class CodeQualityValidator(ProjectValidator):
     """代碼品質驗證器"""
     
+    file_checks = ('file_size', 'line_length', 'function_length', 'complexity',
+                   'naming_conventions', 'imports')
+    metadata_checks = ('file_size',)
+    
+    MESSAGES = {
+        **ProjectValidator.MESSAGES,
+        'file-lines': "{path}: {value[0]} 行 (超過限制 {value[1]})",
+        'file-oversize': "{path}: 文件過大 ({value[0]}，超過分析上限 {value[1]})，已略過內容檢查",
+        'file-sampled': "{path}: 文件過大 ({value[0]}，超過分析上限 {value[1]})，只分析前 {value[2]} 行",
+        'line-length': "{path}:{line} 行長度 {value[0]} (建議不超過 {value[1]})",
+        'function-length': "{path}:{line} 函數 '{value[0]}' 長度 {value[1]} 行 (超過限制 {value[2]})",
+        'function-complexity': "{path}:{line} 函數 '{value[0]}' 圈複雜度 {value[1]} (建議不超過 {value[2]})",
+        'file-complexity': "{path} 可能過於複雜 (複雜度指標: {value})",
+        'file-naming': "檔案命名不符合規範: {value}",
+        'duplicate-imports': "{path} 有重複的導入語句",
+    }
+    
+    FUNCTION_PATTERNS = {
+        'python': r'^\s*def\s+\w+',
+        'javascript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\()',
+        'dart': r'^\s*\w+\s+\w+\s*\(',
+    }
+    
+    # 簡單的複雜度檢查：計算條件語句數量
+    COMPLEXITY_KEYWORDS = ['if', 'elif', 'else', 'for', 'while', 'case', 'switch']
+    
+    # 各語言的命名規範
+    NAMING_CONVENTIONS = {
+        'python': {
+            'file': r'^[a-z_]+\.py$',
+            'class': r'^[A-Z][a-zA-Z0-9]*$',
+            'function': r'^[a-z_][a-z0-9_]*$',
+        },
+        'javascript': {
+            'file': r'^[a-zA-Z][a-zA-Z0-9]*\.(js|ts)$',
+            'class': r'^[A-Z][a-zA-Z0-9]*$',
+            'function': r'^[a-z][a-zA-Z0-9]*$',
+        },
+        'dart': {
+            'file': r'^[a-z_]+\.dart$',
+            'class': r'^[A-Z][a-zA-Z0-9]*$',
+            'function': r'^[a-z][a-zA-Z0-9]*$',
+        }
+    }
+    
+    IMPORT_PATTERNS = {
+        'python': r'^(import\s+\S+|from\s+\S+\s+import)',
+        'javascript': r'^(import\s+.*from|const\s+.*=\s*require)',
+        'dart': r'^import\s+',
+    }
+    
     def run_all_checks(self) -> List[ValidationResult]:
         """運行所有代碼品質檢查"""
         self.results = []
+        self.corpus.analyze([self], self.jobs)
         
         # 各項檢查
-        self.results.append(self.check_file_size())
-        self.results.append(self.check_line_length())
-        self.results.append(self.check_function_length())
-        self.results.append(self.check_complexity())
-        self.results.append(self.check_naming_conventions())
-        self.results.append(self.check_imports())
+        self.results.append(self.run_check('file_size'))
+        self.results.append(self.run_check('line_length'))
+        self.results.append(self.run_check('function_length'))
+        self.results.append(self.run_check('complexity'))
+        self.results.append(self.run_check('naming_conventions'))
+        self.results.append(self.run_check('imports'))
         
         return self.results
     
     def check_file_size(self) -> ValidationResult:
         """檢查文件大小"""
-        result = ValidationResult("檔案大小檢查")
+        result = self.new_result("檔案大小檢查")
+        return self.merge_findings(result, 'file_size')
+    
+    def _scan_file_size(self, source: SourceFile):
+        findings = []
         max_lines = self.config.get('max_file_lines', 500)
-        
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = len(f.readlines())
-                    if lines > max_lines:
-                        result.add_error(f"{file_path.relative_to(self.project_root)}: {lines} 行 (超過限制 {max_lines})")
-            except Exception as e:
-                result.add_warning(f"無法讀取 {file_path}: {e}")
-        
-        return result
+        try:
+            lines = source.line_count
+            if lines > max_lines:
+                findings.append(('error', 'file-lines', None, (lines, max_lines)))
+            if source.truncated:
+                size = f"{source.stat.st_size / (1024 * 1024):.1f} MB"
+                limit = f"{source.limit / (1024 * 1024):.1f} MB"
+                if self.oversize_policy == 'skip':
+                    findings.append(('warning', 'file-oversize', None, (size, limit)))
+                else:
+                    sampled = source.text.count('\n')
+                    findings.append(('warning', 'file-sampled', None, (size, limit, sampled)))
+        except Exception as e:
+            findings.append(('warning', 'read-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_line_length(self) -> ValidationResult:
         """檢查行長度"""
-        result = ValidationResult("行長度檢查")
+        result = self.new_result("行長度檢查")
+        return self.merge_findings(result, 'line_length')
+    
+    def _scan_line_length(self, source: SourceFile):
+        findings = []
         max_length = self.config.get('max_line_length', 120)
-        
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for i, line in enumerate(f, 1):
-                        if len(line.rstrip()) > max_length:
-                            result.add_warning(
-                                f"{file_path.relative_to(self.project_root)}:{i} "
-                                f"行長度 {len(line.rstrip())} (建議不超過 {max_length})"
-                            )
-            except Exception as e:
-                result.add_warning(f"無法讀取 {file_path}: {e}")
-        
-        return result
+        try:
+            for i, line in enumerate(source.iter_lines(), 1):
+                if len(line.rstrip()) > max_length:
+                    findings.append(('warning', 'line-length', i, (len(line.rstrip()), max_length)))
+        except Exception as e:
+            findings.append(('warning', 'read-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_function_length(self) -> ValidationResult:
         """檢查函數長度"""
-        result = ValidationResult("函數長度檢查")
-        max_lines = self.config.get('max_function_lines', 50)
-        
-        patterns = {
-            'python': r'^\s*def\s+\w+',
-            'javascript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\()',
-            'dart': r'^\s*\w+\s+\w+\s*\(',
-        }
+        result = self.new_result("函數長度檢查")
         
-        pattern = patterns.get(self.primary_language)
-        if not pattern:
+        if self.primary_language not in self.FUNCTION_PATTERNS:
             result.add_info("跳過：不支援的語言")
             return result
         
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    in_function = False
-                    function_start = 0
-                    function_name = ""
-                    indent_level = 0
-                    
-                    for i, line in enumerate(lines):
-                        if re.match(pattern, line):
-                            in_function = True
-                            function_start = i
-                            function_name = line.strip()
-                            indent_level = len(line) - len(line.lstrip())
-                        elif in_function and line.strip() and len(line) - len(line.lstrip()) <= indent_level:
-                            function_length = i - function_start
-                            if function_length > max_lines:
-                                result.add_error(
-                                    f"{file_path.relative_to(self.project_root)}:{function_start+1} "
-                                    f"函數 '{function_name[:30]}...' 長度 {function_length} 行 (超過限制 {max_lines})"
-                                )
-                            in_function = False
-            except Exception as e:
-                result.add_warning(f"無法分析 {file_path}: {e}")
+        return self.merge_findings(result, 'function_length')
+    
+    def _scan_function_length(self, source: SourceFile):
+        findings = []
+        max_lines = self.config.get('max_function_lines', 50)
+        pattern = self.FUNCTION_PATTERNS.get(self.primary_language)
         
-        return result
+        try:
+            analysis = self.python_analysis(source)
+            if analysis is not None:
+                for name, start, end, _ in analysis.functions:
+                    function_length = end - start + 1
+                    if function_length > max_lines:
+                        findings.append(('error', 'function-length', start, (name, function_length, max_lines)))
+                return findings, None
+            if not pattern:
+                return findings, None
+            
+            in_function = False
+            function_start = 0
+            function_name = ""
+            indent_level = 0
+            
+            for i, line in enumerate(source.iter_lines()):
+                if re.match(pattern, line):
+                    in_function = True
+                    function_start = i
+                    function_name = line.strip()
+                    indent_level = len(line) - len(line.lstrip())
+                elif in_function and line.strip() and len(line) - len(line.lstrip()) <= indent_level:
+                    function_length = i - function_start
+                    if function_length > max_lines:
+                        findings.append((
+                            'error', 'function-length', function_start + 1,
+                            (f"{function_name[:30]}...", function_length, max_lines)
+                        ))
+                    in_function = False
+        except Exception as e:
+            findings.append(('warning', 'analyze-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_complexity(self) -> ValidationResult:
         """檢查代碼複雜度"""
-        result = ValidationResult("代碼複雜度檢查")
+        result = self.new_result("代碼複雜度檢查")
+        return self.merge_findings(result, 'complexity')
+    
+    def _scan_complexity(self, source: SourceFile):
+        findings = []
         max_complexity = self.config.get('max_complexity', 10)
-        
-        # 簡單的複雜度檢查：計算條件語句數量
-        complexity_keywords = ['if', 'elif', 'else', 'for', 'while', 'case', 'switch']
-        
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # 簡單統計複雜度關鍵字
-                    complexity = sum(1 for keyword in complexity_keywords 
-                                   if f' {keyword} ' in content or f'\n{keyword} ' in content)
-                    
-                    if complexity > max_complexity * 3:  # 檔案級別的粗略估計
-                        result.add_warning(
-                            f"{file_path.relative_to(self.project_root)} "
-                            f"可能過於複雜 (複雜度指標: {complexity})"
-                        )
-            except Exception as e:
-                result.add_warning(f"無法分析 {file_path}: {e}")
-        
-        return result
+        try:
+            analysis = self.python_analysis(source)
+            if analysis is not None:
+                # ast 後端計算每個函數的真實圈複雜度
+                for name, start, _, complexity in analysis.functions:
+                    if complexity > max_complexity:
+                        findings.append(('warning', 'function-complexity', start, (name, complexity, max_complexity)))
+                return findings, None
+            
+            content = source.text
+            # 簡單統計複雜度關鍵字
+            complexity = sum(1 for keyword in self.COMPLEXITY_KEYWORDS
+                           if f' {keyword} ' in content or f'\n{keyword} ' in content)
+            
+            if complexity > max_complexity * 3:  # 檔案級別的粗略估計
+                findings.append(('warning', 'file-complexity', None, complexity))
+        except Exception as e:
+            findings.append(('warning', 'analyze-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_naming_conventions(self) -> ValidationResult:
         """檢查命名規範"""
-        result = ValidationResult("命名規範檢查")
-        
-        # 各語言的命名規範
-        conventions = {
-            'python': {
-                'file': r'^[a-z_]+\.py$',
-                'class': r'^[A-Z][a-zA-Z0-9]*$',
-                'function': r'^[a-z_][a-z0-9_]*$',
-            },
-            'javascript': {
-                'file': r'^[a-zA-Z][a-zA-Z0-9]*\.(js|ts)$',
-                'class': r'^[A-Z][a-zA-Z0-9]*$',
-                'function': r'^[a-z][a-zA-Z0-9]*$',
-            },
-            'dart': {
-                'file': r'^[a-z_]+\.dart$',
-                'class': r'^[A-Z][a-zA-Z0-9]*$',
-                'function': r'^[a-z][a-zA-Z0-9]*$',
-            }
-        }
+        result = self.new_result("命名規範檢查")
         
-        convention = conventions.get(self.primary_language, {})
-        if not convention:
+        if not self.NAMING_CONVENTIONS.get(self.primary_language, {}):
             result.add_info("跳過：不支援的語言")
             return result
         
         # 檢查文件命名
-        for file_path in self.get_source_files():
-            filename = file_path.name
-            if 'file' in convention and not re.match(convention['file'], filename):
-                result.add_warning(f"檔案命名不符合規範: {filename}")
-        
-        return result
+        return self.merge_findings(result, 'naming_conventions')
+    
+    def _scan_naming_conventions(self, source: SourceFile):
+        findings = []
+        convention = self.NAMING_CONVENTIONS.get(self.primary_language, {})
+        filename = source.path.name
+        if 'file' in convention and not re.match(convention['file'], filename):
+            findings.append(('warning', 'file-naming', None, filename))
+        return findings, None
     
     def check_imports(self) -> ValidationResult:
         """檢查導入語句"""
-        result = ValidationResult("導入檢查")
+        result = self.new_result("導入檢查")
         
         # 檢查重複和未使用的導入
-        import_patterns = {
-            'python': r'^(import\s+\S+|from\s+\S+\s+import)',
-            'javascript': r'^(import\s+.*from|const\s+.*=\s*require)',
-            'dart': r'^import\s+',
-        }
-        
-        pattern = import_patterns.get(self.primary_language)
-        if not pattern:
+        if self.primary_language not in self.IMPORT_PATTERNS:
             result.add_info("跳過：不支援的語言")
             return result
         
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    imports = []
-                    
-                    for line in lines:
-                        if re.match(pattern, line):
-                            imports.append(line.strip())
-                    
-                    # 檢查重複導入
-                    if len(imports) != len(set(imports)):
-                        result.add_warning(f"{file_path.relative_to(self.project_root)} 有重複的導入語句")
-            except Exception as e:
-                result.add_warning(f"無法分析 {file_path}: {e}")
+        return self.merge_findings(result, 'imports')
+    
+    def _scan_imports(self, source: SourceFile):
+        findings = []
+        pattern = self.IMPORT_PATTERNS.get(self.primary_language)
         
-        return result
+        try:
+            analysis = self.python_analysis(source)
+            if analysis is not None:
+                keys = [key for _, key in analysis.imports]
+                if len(keys) != len(set(keys)):
+                    findings.append(('warning', 'duplicate-imports', None, None))
+                return findings, None
+            if not pattern:
+                return findings, None
+            
+            imports = []
+            
+            for line in source.iter_lines():
+                if re.match(pattern, line):
+                    imports.append(line.strip())
+            
+            # 檢查重複導入
+            if len(imports) != len(set(imports)):
+                findings.append(('warning', 'duplicate-imports', None, None))
+        except Exception as e:
+            findings.append(('warning', 'analyze-error', None, (str(source.path), str(e))))
+        return findings, None
 
 class SecurityValidator(ProjectValidator):
     """安全性驗證器"""
     
+    file_checks = ('hardcoded_secrets', 'sql_injection', 'unsafe_functions', 'file_permissions')
+    metadata_checks = ('file_permissions',)
+    
+    MESSAGES = {
+        **ProjectValidator.MESSAGES,
+        'secret': "{path}:{line} 發現{value[0]} [{value[1]}]",
+        'sql-injection': "{path}:{line} 可能的 SQL 注入風險 [{value}]",
+        'unsafe-function': "{path}:{line} 使用了不安全的函數 '{value[0]}' [{value[1]}]",
+        'file-permissions': "{path}: 文件權限過寬",
+    }
+    
+    # 敏感資訊規則: (規則 ID, 關鍵字, 模式, 說明)
+    SECRET_RULES = [
+        ('secret-password', ('password',), r'password\s*=\s*["\'][^"\']+["\']', '硬編碼的密碼'),
+        ('secret-api-key', ('api',), r'api[_-]?key\s*=\s*["\'][^"\']+["\']', '硬編碼的 API 金鑰'),
+        ('secret-key', ('secret',), r'secret[_-]?key\s*=\s*["\'][^"\']+["\']', '硬編碼的密鑰'),
+        ('secret-token', ('token',), r'token\s*=\s*["\'][^"\']+["\']', '硬編碼的 Token'),
+    ]
+    
+    # 環境變數引用（文件中出現時不回報硬編碼的敏感資訊）
+    ENV_RULE = ('env-reference', ('process.env', 'os.environ', 'getenv'), r'(process\.env|os\.environ|getenv)')
+    
+    # SQL 注入風險規則: (規則 ID, 關鍵字, 模式)
+    SQL_RULES = [
+        ('sql-concat-query', ('query',), r'query.*\+.*["\']'),  # 字串拼接
+        ('sql-concat-execute', ('execute',), r'execute.*\+.*["\']'),
+        ('sql-fstring', ('select',), r'f["\'].*SELECT.*{'),  # Python f-string
+        ('sql-template', ('select',), r'\$.*SELECT.*\$'),  # 模板字串
+    ]
+    
+    # 各語言的不安全函數
+    UNSAFE_FUNCTIONS = {
+        'python': ['eval', 'exec', 'compile', '__import__'],
+        'javascript': ['eval', 'Function', 'setTimeout.*["\']', 'setInterval.*["\']'],
+    }
+    
+    # 各語言預先編譯的規則引擎
+    _engines: Dict[str, RuleEngine] = {}
+    
+    @classmethod
+    def rule_engine(cls, language: str) -> RuleEngine:
+        """取得指定語言的規則引擎（首次使用時編譯所有安全規則）"""
+        engine = cls._engines.get(language)
+        if engine is None:
+            rules = [(rule_id, keywords, pattern, re.IGNORECASE)
+                     for rule_id, keywords, pattern, _ in cls.SECRET_RULES]
+            rules.append(cls.ENV_RULE + (0,))
+            rules.extend((rule_id, keywords, pattern, re.IGNORECASE)
+                         for rule_id, keywords, pattern in cls.SQL_RULES)
+            for func in cls.UNSAFE_FUNCTIONS.get(language, []):
+                keyword = re.match(r'\w+', func).group()
+                rules.append((cls._unsafe_rule_id(func), (keyword,), rf'\b{func}\s*\(', 0))
+            engine = cls._engines[language] = RuleEngine(rules)
+        return engine
+    
+    @staticmethod
+    def _unsafe_rule_id(func: str) -> str:
+        return 'unsafe-' + re.match(r'\w+', func).group().lower()
+    
+    def _security_hits(self, source: SourceFile) -> List[Tuple[str, int]]:
+        """以單次掃描取得文件的所有安全規則命中（三項安全檢查共用）"""
+        return source.derive('security', lambda: self.rule_engine(self.primary_language).scan(source.text))
+    
     def run_all_checks(self) -> List[ValidationResult]:
         """運行所有安全檢查"""
         self.results = []
+        self.corpus.analyze([self], self.jobs)
         
-        self.results.append(self.check_hardcoded_secrets())
-        self.results.append(self.check_sql_injection())
-        self.results.append(self.check_unsafe_functions())
-        self.results.append(self.check_file_permissions())
+        self.results.append(self.run_check('hardcoded_secrets'))
+        self.results.append(self.run_check('sql_injection'))
+        self.results.append(self.run_check('unsafe_functions'))
+        self.results.append(self.run_check('file_permissions'))
         
         return self.results
     
     def check_hardcoded_secrets(self) -> ValidationResult:
         """檢查硬編碼的敏感資訊"""
-        result = ValidationResult("敏感資訊檢查")
-        
-        # 敏感資訊模式
-        secret_patterns = [
-            (r'password\s*=\s*["\'][^"\']+["\']', '硬編碼的密碼'),
-            (r'api[_-]?key\s*=\s*["\'][^"\']+["\']', '硬編碼的 API 金鑰'),
-            (r'secret[_-]?key\s*=\s*["\'][^"\']+["\']', '硬編碼的密鑰'),
-            (r'token\s*=\s*["\'][^"\']+["\']', '硬編碼的 Token'),
-        ]
-        
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for pattern, desc in secret_patterns:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            # 排除環境變數引用
-                            if not re.search(r'(process\.env|os\.environ|getenv)', content):
-                                result.add_error(f"{file_path.relative_to(self.project_root)}: 發現{desc}")
-            except Exception as e:
-                result.add_warning(f"無法檢查 {file_path}: {e}")
-        
-        return result
+        result = self.new_result("敏感資訊檢查")
+        return self.merge_findings(result, 'hardcoded_secrets')
+    
+    def _scan_hardcoded_secrets(self, source: SourceFile):
+        findings = []
+        descriptions = {rule_id: desc for rule_id, _, _, desc in self.SECRET_RULES}
+        try:
+            hits = self._security_hits(source)
+            # 排除環境變數引用
+            if any(rule_id == self.ENV_RULE[0] for rule_id, _ in hits):
+                return findings, None
+            for rule_id, line_no in hits:
+                if rule_id in descriptions:
+                    findings.append(('error', 'secret', line_no, (descriptions[rule_id], rule_id)))
+        except Exception as e:
+            findings.append(('warning', 'check-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_sql_injection(self) -> ValidationResult:
         """檢查 SQL 注入風險"""
-        result = ValidationResult("SQL 注入檢查")
-        
-        # SQL 注入風險模式
-        sql_patterns = [
-            r'query.*\+.*["\']',  # 字串拼接
-            r'execute.*\+.*["\']',
-            r'f["\'].*SELECT.*{',  # Python f-string
-            r'\$.*SELECT.*\$',  # 模板字串
-        ]
-        
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for pattern in sql_patterns:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            result.add_warning(f"{file_path.relative_to(self.project_root)}: 可能的 SQL 注入風險")
-            except Exception as e:
-                result.add_warning(f"無法檢查 {file_path}: {e}")
-        
-        return result
+        result = self.new_result("SQL 注入檢查")
+        return self.merge_findings(result, 'sql_injection')
+    
+    def _scan_sql_injection(self, source: SourceFile):
+        findings = []
+        sql_rules = {rule_id for rule_id, _, _ in self.SQL_RULES}
+        try:
+            for rule_id, line_no in self._security_hits(source):
+                if rule_id in sql_rules:
+                    findings.append(('warning', 'sql-injection', line_no, rule_id))
+        except Exception as e:
+            findings.append(('warning', 'check-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_unsafe_functions(self) -> ValidationResult:
         """檢查不安全的函數使用"""
-        result = ValidationResult("不安全函數檢查")
+        result = self.new_result("不安全函數檢查")
         
-        # 各語言的不安全函數
-        unsafe_functions = {
-            'python': ['eval', 'exec', 'compile', '__import__'],
-            'javascript': ['eval', 'Function', 'setTimeout.*["\']', 'setInterval.*["\']'],
-        }
-        
-        functions = unsafe_functions.get(self.primary_language, [])
-        if not functions:
+        if not self.UNSAFE_FUNCTIONS.get(self.primary_language, []):
             result.add_info("跳過：不支援的語言")
             return result
         
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for func in functions:
-                        if re.search(rf'\b{func}\s*\(', content):
-                            result.add_warning(
-                                f"{file_path.relative_to(self.project_root)}: "
-                                f"使用了不安全的函數 '{func}'"
-                            )
-            except Exception as e:
-                result.add_warning(f"無法檢查 {file_path}: {e}")
+        return self.merge_findings(result, 'unsafe_functions')
+    
+    def _scan_unsafe_functions(self, source: SourceFile):
+        findings = []
+        functions = self.UNSAFE_FUNCTIONS.get(self.primary_language, [])
+        if not functions:
+            return findings, None
         
-        return result
+        labels = {self._unsafe_rule_id(func): func for func in functions}
+        try:
+            analysis = self.python_analysis(source)
+            if analysis is not None:
+                # ast 後端只回報真正的函數呼叫，不受註解和字串內容影響
+                unsafe = set(self.UNSAFE_FUNCTIONS['python'])
+                for name, line_no in sorted(analysis.calls, key=lambda call: call[1]):
+                    if name in unsafe:
+                        findings.append(('warning', 'unsafe-function', line_no, (name, self._unsafe_rule_id(name))))
+                return findings, None
+            
+            for rule_id, line_no in self._security_hits(source):
+                if rule_id in labels:
+                    findings.append(('warning', 'unsafe-function', line_no, (labels[rule_id], rule_id)))
+        except Exception as e:
+            findings.append(('warning', 'check-error', None, (str(source.path), str(e))))
+        return findings, None
     
     def check_file_permissions(self) -> ValidationResult:
         """檢查文件權限"""
-        result = ValidationResult("文件權限檢查")
+        result = self.new_result("文件權限檢查")
         
         if platform.system() == 'Windows':
             result.add_info("跳過：Windows 系統")
             return result
         
-        for file_path in self.get_source_files():
-            try:
-                # 檢查是否有過寬的權限
-                mode = file_path.stat().st_mode
-                if mode & 0o022:  # 其他用戶可寫
-                    result.add_warning(f"{file_path.relative_to(self.project_root)}: 文件權限過寬")
-            except Exception as e:
-                result.add_warning(f"無法檢查 {file_path}: {e}")
-        
-        return result
+        return self.merge_findings(result, 'file_permissions')
+    
+    def _scan_file_permissions(self, source: SourceFile):
+        findings = []
+        try:
+            # 檢查是否有過寬的權限
+            mode = source.stat.st_mode
+            if mode & 0o022:  # 其他用戶可寫
+                findings.append(('warning', 'file-permissions', None, None))
+        except Exception as e:
+            findings.append(('warning', 'check-error', None, (str(source.path), str(e))))
+        return findings, None
 
 class DuplicationValidator(ProjectValidator):
     """重複代碼驗證器"""
     
+    file_checks = ('duplicate_functions', 'duplicate_imports', 'similar_files')
+    index_checks = ('duplicate_functions', 'similar_files')
+    
+    MESSAGES = {
+        **ProjectValidator.MESSAGES,
+        'duplicate-import': "{path}:{line} 重複的導入語句",
+        'duplicate-function': "函數 '{value[0]}' 在多個文件中定義: {value[1]} 和 {path}",
+        'similar-file': "文件可能相似: {path} 和 {value[0]} (相似度 {value[1]:.0%})",
+        'duplicate-block': "重複的代碼區塊: {path}:{line}-{value[0]} 和 {value[1]}:{value[2]}-{value[3]}",
+    }
+    
+    FUNCTION_PATTERNS = {
+        'python': r'def\s+(\w+)\s*\(',
+        'javascript': r'function\s+(\w+)\s*\(|const\s+(\w+)\s*=\s*\(',
+        'dart': r'(\w+)\s+(\w+)\s*\(',
+    }
+    
+    IMPORT_PATTERNS = {
+        'python': r'^(import\s+(\S+)|from\s+(\S+)\s+import)',
+        'javascript': r'^import\s+.*from\s+["\']([^"\']+)["\']',
+        'dart': r'^import\s+["\']([^"\']+)["\']',
+    }
+    
     def run_all_checks(self) -> List[ValidationResult]:
         """運行重複代碼檢查"""
         self.results = []
+        self.corpus.analyze([self], self.jobs)
         
-        self.results.append(self.check_duplicate_functions())
-        self.results.append(self.check_duplicate_imports())
-        self.results.append(self.check_similar_files())
+        self.results.append(self.run_check('duplicate_functions'))
+        self.results.append(self.run_check('duplicate_imports'))
+        self.results.append(self.run_check('similar_files'))
         
         return self.results
     
     def check_duplicate_functions(self) -> ValidationResult:
         """檢查重複的函數定義"""
-        result = ValidationResult("重複函數檢查")
+        result = self.new_result("重複函數檢查")
         
-        function_patterns = {
-            'python': r'def\s+(\w+)\s*\(',
-            'javascript': r'function\s+(\w+)\s*\(|const\s+(\w+)\s*=\s*\(',
-            'dart': r'(\w+)\s+(\w+)\s*\(',
-        }
-        
-        pattern = function_patterns.get(self.primary_language)
-        if not pattern:
+        if self.primary_language not in self.FUNCTION_PATTERNS:
             result.add_info("跳過：不支援的語言")
             return result
         
+        # 比對對象包含驗證範圍外的文件，但只回報涉及範圍內文件的重複
         all_functions = {}
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    matches = re.findall(pattern, content)
-                    for match in matches:
-                        func_name = match if isinstance(match, str) else next(m for m in match if m)
-                        if func_name in all_functions:
-                            result.add_warning(
-                                f"函數 '{func_name}' 在多個文件中定義: "
-                                f"{all_functions[func_name]} 和 {file_path.relative_to(self.project_root)}"
-                            )
-                        else:
-                            all_functions[func_name] = file_path.relative_to(self.project_root)
-            except Exception as e:
-                result.add_warning(f"無法分析 {file_path}: {e}")
+        add = self.capped_adder(result)
+        for source, names in self.collect(result, 'duplicate_functions', include_reference=True):
+            if not names:
+                continue
+            path = str(source.path.relative_to(self.project_root))
+            for func_name in names:
+                if func_name in all_functions:
+                    first_path, first_target = all_functions[func_name]
+                    if source.target or first_target:
+                        add('warning', 'duplicate-function', path, None, (func_name, first_path))
+                else:
+                    all_functions[func_name] = (path, source.target)
         
         return result
     
+    def _scan_duplicate_functions(self, source: SourceFile):
+        """提取文件中定義的函數名稱（跨文件比對在 check_duplicate_functions 中進行）"""
+        pattern = self.FUNCTION_PATTERNS.get(self.primary_language)
+        
+        try:
+            analysis = self.python_analysis(source)
+            if analysis is not None:
+                return [], [name for name, _, _, _ in analysis.functions]
+            if not pattern:
+                return [], None
+            matches = re.findall(pattern, source.text)
+        except Exception as e:
+            return [('warning', 'analyze-error', None, (str(source.path), str(e)))], None
+        names = [match if isinstance(match, str) else next(m for m in match if m)
+                 for match in matches]
+        return [], names
+    
     def check_duplicate_imports(self) -> ValidationResult:
         """檢查重複的導入語句"""
-        result = ValidationResult("重複導入檢查")
-        
-        import_patterns = {
-            'python': r'^(import\s+(\S+)|from\s+(\S+)\s+import)',
-            'javascript': r'^import\s+.*from\s+["\']([^"\']+)["\']',
-            'dart': r'^import\s+["\']([^"\']+)["\']',
-        }
+        result = self.new_result("重複導入檢查")
         
-        pattern = import_patterns.get(self.primary_language)
-        if not pattern:
+        if self.primary_language not in self.IMPORT_PATTERNS:
             result.add_info("跳過：不支援的語言")
             return result
         
-        for file_path in self.get_source_files():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    imports = []
-                    
-                    for i, line in enumerate(lines):
-                        match = re.match(pattern, line)
-                        if match:
-                            import_stmt = line.strip()
-                            if import_stmt in imports:
-                                result.add_warning(
-                                    f"{file_path.relative_to(self.project_root)}:{i+1} "
-                                    f"重複的導入語句"
-                                )
-                            imports.append(import_stmt)
-            except Exception as e:
-                result.add_warning(f"無法分析 {file_path}: {e}")
+        return self.merge_findings(result, 'duplicate_imports')
+    
+    def _scan_duplicate_imports(self, source: SourceFile):
+        findings = []
+        pattern = self.IMPORT_PATTERNS.get(self.primary_language)
         
-        return result
+        try:
+            analysis = self.python_analysis(source)
+            if analysis is not None:
+                seen = set()
+                for line_no, key in analysis.imports:
+                    if key in seen:
+                        findings.append(('warning', 'duplicate-import', line_no, None))
+                    seen.add(key)
+                return findings, None
+            if not pattern:
+                return findings, None
+            
+            imports = []
+            
+            for i, line in enumerate(source.iter_lines()):
+                match = re.match(pattern, line)
+                if match:
+                    import_stmt = line.strip()
+                    if import_stmt in imports:
+                        findings.append(('warning', 'duplicate-import', i + 1, None))
+                    imports.append(import_stmt)
+        except Exception as e:
+            findings.append(('warning', 'analyze-error', None, (str(source.path), str(e))))
+        return findings, None
+    
+    @property
+    def clone_detector(self) -> CloneDetector:
+        return CloneDetector(
+            shingle_size=self.config.get('clone_shingle_size', 12),
+            permutations=self.config.get('minhash_permutations', 64),
+            bands=self.config.get('lsh_bands', 16),
+        )
     
     def check_similar_files(self) -> ValidationResult:
-        """檢查相似的文件"""
-        result = ValidationResult("相似文件檢查")
+        """檢查相似的文件與重複的代碼區塊"""
+        result = self.new_result("相似文件檢查")
+        threshold = self.config.get('similarity_threshold', 0.8)
+        min_lines = self.config.get('clone_min_lines', 6)
+        detector = self.clone_detector
         
-        # 簡單的相似度檢查：比較文件大小和行數
-        file_info = {}
-        for file_path in self.get_source_files():
-            try:
-                size = file_path.stat().st_size
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = len(f.readlines())
-                
-                key = (size, lines)
-                if key in file_info:
-                    result.add_warning(
-                        f"文件可能相似: {file_info[key]} 和 "
-                        f"{file_path.relative_to(self.project_root)} "
-                        f"(相同大小和行數)"
-                    )
-                else:
-                    file_info[key] = file_path.relative_to(self.project_root)
-            except Exception as e:
-                result.add_warning(f"無法分析 {file_path}: {e}")
+        # 比對對象包含驗證範圍外的文件，但只回報涉及範圍內文件的相似
+        files = []
+        for source, data in self.collect(result, 'similar_files', include_reference=True):
+            if data is not None:
+                files.append((str(source.path.relative_to(self.project_root)), source.target, data))
+        
+        add = self.capped_adder(result)
+        
+        # 整體相似的文件：LSH 候選對再以簽名估計相似度
+        similar = set()
+        for first, second in detector.candidate_pairs([data['signature'] for _, _, data in files]):
+            if not (files[first][1] or files[second][1]):
+                continue
+            score = detector.similarity(files[first][2]['signature'], files[second][2]['signature'])
+            if score >= threshold:
+                similar.add((first, second))
+                add('warning', 'similar-file', files[first][0], None, (files[second][0], score))
+        
+        # 其餘文件對中的重複代碼區塊
+        blocks = detector.shared_blocks([data['fingerprints'] for _, _, data in files])
+        for first, second in sorted(blocks):
+            if (first, second) in similar or not (files[first][1] or files[second][1]):
+                continue
+            for first_start, first_end, second_start, second_end in detector.merge_ranges(blocks[first, second]):
+                if min(first_end - first_start, second_end - second_start) + 1 >= min_lines:
+                    add('warning', 'duplicate-block', files[first][0], first_start,
+                        (first_end, files[second][0], second_start, second_end))
         
         return result
+    
+    def _scan_similar_files(self, source: SourceFile):
+        """計算文件的 MinHash 簽名與區塊指紋（跨文件比對在 check_similar_files 中進行）"""
+        try:
+            return [], self.clone_detector.fingerprint(source.iter_lines())
+        except Exception as e:
+            return [('warning', 'analyze-error', None, (str(source.path), str(e)))], None
 
 class AllValidator(ProjectValidator):
     """綜合驗證器"""
     
-    def __init__(self, project_root: Path, config: Dict = None):
-        super().__init__(project_root, config)
+    def __init__(self, project_root: Path, config: Dict = None, corpus: SourceCorpus = None):
+        super().__init__(project_root, config, corpus)
+        # 所有子驗證器共用同一份源文件集合，每個文件只讀取一次；
+        # 集合在首次存取 corpus 時才建立，交給驗證服務處理時不遍歷目錄
         self.validators = [
-            CodeQualityValidator(project_root, config),
-            SecurityValidator(project_root, config),
-            DuplicationValidator(project_root, config),
+            CodeQualityValidator(project_root, config, corpus),
+            SecurityValidator(project_root, config, corpus),
+            DuplicationValidator(project_root, config, corpus),
         ]
     
+    @property
+    def corpus(self) -> SourceCorpus:
+        """所有子驗證器共用的源文件集合（首次存取時建立並交給各子驗證器）"""
+        corpus = ProjectValidator.corpus.fget(self)
+        for validator in self.validators:
+            validator._corpus = corpus
+        return corpus
+    
     def run_all_checks(self) -> List[ValidationResult]:
         """運行所有驗證器的檢查"""
         self.results = []
+        # 先以單次掃描完成所有驗證器的單文件分析
+        self.corpus.analyze(self.validators, self.jobs)
         
         for validator in self.validators:
             print(f"\n{Colors.BLUE}運行 {validator.__class__.__name__}...{Colors.ENDC}")
@@ -589,34 +2014,735 @@ class AllValidator(ProjectValidator):
         
         return self.results
 
+
+class PollingWatcher:
+    """定期輪詢的變更偵測（不支援 inotify 時的後備方案）"""
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+    
+    def wait(self, timeout: Optional[float] = None) -> Tuple[bool, set]:
+        """等待一個輪詢間隔（或 timeout 秒）；返回 (是否需要重新遍歷目錄, 變更的路徑)"""
+        time.sleep(self.interval if timeout is None else timeout)
+        return True, set()
+    
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """以 Linux inotify 監看源代碼目錄樹
+
+    只有既有文件的內容變更時直接返回變更的路徑；新增、刪除、改名或 .gitignore 變更時
+    要求重新遍歷目錄。新建立的子目錄會自動加入監看，排除的目錄不監看。
+    專案根目錄（project_root）另以非遞迴方式監看，只有 ROOT_FILES 變更時要求重新遍歷。
+    新目錄無法加入監看（例如超過 max_user_watches）時改為每 interval 秒輪詢。
+    """
+    
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    # 會改變文件列表的事件
+    STRUCTURE_MASK = (IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+                      IN_DELETE_SELF | IN_MOVE_SELF | IN_Q_OVERFLOW)
+    
+    # struct inotify_event 的固定部分: wd, mask, cookie, len
+    EVENT = struct.Struct('iIII')
+    
+    # 收到事件後再等待的秒數，讓編輯器儲存時的連續寫入合併為一次重新驗證
+    SETTLE = 0.05
+    
+    # 專案根目錄中會影響文件列表的設定文件
+    ROOT_FILES = ('.gitignore', 'validation-config.json')
+    
+    def __init__(self, root: Path, excluded_paths: List[str] = (), project_root: Path = None,
+                 interval: float = 1.0):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        names = [p.strip('/') for p in excluded_paths if '/' not in p.strip('/')]
+        self.excluded = re.compile('|'.join(fnmatch.translate(p) for p in names)) if names else None
+        self.watches = {}
+        self.interval = interval
+        self.fallback = None
+        self.project_dir = None
+        try:
+            self._add_tree(str(root))
+            if project_root is not None and Path(project_root).resolve() != Path(root).resolve():
+                self.project_dir = str(project_root)
+                self._add_directory(self.project_dir)
+        except OSError:
+            self.close()
+            raise
+    
+    def _add_tree(self, top: str):
+        """監看目錄及其所有未排除的子目錄"""
+        for directory, subdirs, _ in os.walk(top):
+            subdirs[:] = [d for d in subdirs if not (self.excluded and self.excluded.match(d))]
+            self._add_directory(directory)
+    
+    def _add_directory(self, directory: str):
+        """監看單一目錄（不含子目錄）"""
+        wd = self._add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            # 監看期間被刪除的目錄直接略過；超過 max_user_watches 等錯誤則改用輪詢
+            if errno == 2:
+                return
+            raise OSError(errno, f"inotify_add_watch {directory}: {os.strerror(errno)}")
+        self.watches[wd] = directory
+    
+    def _read_events(self):
+        """讀取所有待處理的事件，產出 (事件遮罩, 完整路徑)"""
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+                name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0')
+                offset += self.EVENT.size + length
+                if mask & self.IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    yield mask, None
+                    continue
+                yield mask, os.path.join(directory, os.fsdecode(name)) if name else directory
+    
+    def wait(self, timeout: Optional[float] = None) -> Tuple[bool, set]:
+        """等待變更（timeout 為 None 時一直阻塞）；返回 (是否需要重新遍歷目錄, 變更的路徑)
+
+        指定 timeout 時只取出已排隊的事件，不再等待後續的連續寫入。
+        """
+        if self.fallback is not None:
+            return self.fallback.wait(timeout)
+        
+        structural = False
+        paths = set()
+        settle = self.SETTLE if timeout is None else 0
+        while select.select([self.fd], [], [], timeout)[0]:
+            for mask, path in self._read_events():
+                if path is not None and self.project_dir is not None and os.path.dirname(path) == self.project_dir:
+                    if os.path.basename(path) in self.ROOT_FILES:
+                        structural = True
+                    continue
+                if path is None or mask & self.STRUCTURE_MASK:
+                    structural = True
+                if path is None:
+                    continue
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        try:
+                            self._add_tree(path)
+                        except OSError as e:
+                            # 新目錄無法監看時其中的變更會被漏掉，改為輪詢並重新遍歷目錄
+                            print(f"{Colors.YELLOW}無法監看新目錄，改為每 {self.interval} 秒輪詢: {e}{Colors.ENDC}")
+                            self.close()
+                            self.fallback = PollingWatcher(self.interval)
+                            return True, set()
+                    continue
+                if os.path.basename(path) == '.gitignore':
+                    structural = True
+                paths.add(Path(path))
+            timeout = settle
+        return structural, paths
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class WatchSession:
+    """監看模式：保持源文件集合與發現索引在記憶體中，只重新掃描變更的文件
+
+    單文件掃描結果保存在各 SourceFile 中，變更的文件重新掃描後，
+    重複函數、相似文件等跨文件檢查直接以已快取的逐文件索引資料重新彙總。
+    """
+    
+    def __init__(self, validator: ProjectValidator):
+        self.validator = validator
+        self.signatures = {}
+        self.findings = []
+    
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int, int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_mode, st.st_ino)
+    
+    @staticmethod
+    def finding_keys(results: List[ValidationResult]) -> List[Tuple[str, str, str]]:
+        """將結果展開為 (檢查名稱, 等級, 訊息) 列表"""
+        return [(result.check_name, level, message)
+                for result in results
+                for level, messages in (('error', result.errors), ('warning', result.warnings))
+                for message in messages]
+    
+    def start(self):
+        """記錄目前所有源文件的狀態與發現（在首次運行檢查前呼叫）"""
+        self.signatures = {source.path: self._signature(source.path) for source in self.validator.corpus.all_files}
+    
+    def record(self, results: List[ValidationResult]):
+        self.findings = self.finding_keys(results)
+    
+    def refresh(self, structural: bool, paths: set) -> Optional[Tuple[List[Path], List[Path]]]:
+        """依事件更新源文件集合；返回 (變更的文件, 移除的文件)，沒有實際變更時返回 None"""
+        corpus = self.validator.corpus
+        if structural:
+            files = self.validator.get_all_source_files()
+            candidates = files
+        else:
+            files = [source.path for source in corpus.all_files]
+            candidates = [path for path in paths if path in self.signatures]
+        
+        changed = []
+        for path in candidates:
+            signature = self._signature(path)
+            if path not in self.signatures or signature != self.signatures[path]:
+                changed.append(path)
+                self.signatures[path] = signature
+        removed = []
+        if structural:
+            present = set(files)
+            removed = [path for path in self.signatures if path not in present]
+        for path in removed:
+            del self.signatures[path]
+        
+        if not changed and not removed:
+            return None
+        corpus.update(files, changed)
+        return changed, removed
+    
+    def rerun(self) -> Tuple[List[ValidationResult], list, list]:
+        """重新運行檢查；返回 (結果, 新增的發現, 已解決的發現)"""
+        self.validator.corpus.timings = CheckTimings()
+        with redirect_stdout(io.StringIO()):
+            results = self.validator.run_all_checks()
+        findings = self.finding_keys(results)
+        current = set(findings)
+        previous = set(self.findings)
+        added = [item for item in findings if item not in previous]
+        resolved = [item for item in self.findings if item not in current]
+        self.findings = findings
+        return results, added, resolved
+
+def open_watcher(validator: ProjectValidator, interval: float = 1.0):
+    """為驗證器的源代碼目錄建立變更監看器（Linux 使用 inotify，否則輪詢）"""
+    source_path = validator.project_root / validator.source_dir
+    if platform.system() == 'Linux' and source_path.is_dir():
+        try:
+            return InotifyWatcher(source_path, validator.excluded_paths, validator.project_root, interval)
+        except (OSError, AttributeError) as e:
+            print(f"{Colors.YELLOW}無法使用 inotify，改為每 {interval} 秒輪詢: {e}{Colors.ENDC}")
+    return PollingWatcher(interval)
+
+def run_watch(validator: ProjectValidator, interval: float = 1.0) -> List[ValidationResult]:
+    """監看源文件變更並持續重新驗證，直到按下 Ctrl+C；返回最後一次的結果"""
+    session = WatchSession(validator)
+    session.start()
+    results = validator.run_all_checks()
+    session.record(results)
+    validator.print_summary(validator.corpus.timings)
+    
+    watcher = open_watcher(validator, interval)
+    source_path = validator.project_root / validator.source_dir
+    print(f"\n{Colors.BLUE}監看 {source_path} 中（按 Ctrl+C 結束）...{Colors.ENDC}")
+    try:
+        while True:
+            structural, paths = watcher.wait()
+            started = time.perf_counter()
+            change = session.refresh(structural, paths)
+            if change is None:
+                continue
+            changed, removed = change
+            results, added, resolved = session.rerun()
+            elapsed = (time.perf_counter() - started) * 1000
+            
+            parts = []
+            if changed:
+                parts.append(f"{len(changed)} 個文件變更")
+            if removed:
+                parts.append(f"{len(removed)} 個文件移除")
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {'，'.join(parts)}，"
+                  f"重新分析 {len(changed)} 個文件（{elapsed:.0f} ms）")
+            for check_name, level, message in added:
+                mark = f"{Colors.RED}✗{Colors.ENDC}" if level == 'error' else f"{Colors.YELLOW}⚠{Colors.ENDC}"
+                print(f"  {Colors.RED}+{Colors.ENDC} {mark} {check_name}: {message}")
+            for check_name, level, message in resolved:
+                print(f"  {Colors.GREEN}-{Colors.ENDC} {Colors.GREEN}✓{Colors.ENDC} {check_name}: {message}")
+            if not added and not resolved:
+                print("  檢查結果沒有變化")
+            failed = sum(1 for r in results if not r.passed)
+            color = Colors.RED if failed else Colors.GREEN
+            print(f"  {color}失敗 {failed} / 共 {len(results)} 項檢查{Colors.ENDC}")
+    except KeyboardInterrupt:
+        print(f"\n{Colors.BLUE}已停止監看{Colors.ENDC}")
+    finally:
+        watcher.close()
+    return validator.results
+
+def default_socket_path(project_root: Path) -> Path:
+    """專案對應的驗證服務 socket 路徑（避免超過 Unix socket 的路徑長度上限）
+
+    放在 XDG_RUNTIME_DIR；未設定時放在暫存目錄下只有使用者本人可存取的 validator-<uid> 子目錄，
+    其他使用者無法在共用的暫存目錄中預先建立同名的 socket。
+    """
+    digest = hashlib.sha1(str(project_root).encode('utf-8')).hexdigest()[:12]
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return Path(runtime_dir) / f"validator-{digest}.sock"
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return Path(tempfile.gettempdir()) / f"validator-{uid}" / f"{digest}.sock"
+
+def ensure_socket_dir(socket_path: Path):
+    """建立 socket 所在的目錄（0700），並確認其他使用者無法在其中替換 socket（否則拋出 RuntimeError）
+
+    目錄必須屬於目前使用者且其他人不可寫入；設有 sticky bit 的共用目錄（例如 --socket 指定的 /tmp 路徑）
+    中其他使用者無法刪除或替換我們的文件，同樣接受。
+    """
+    directory = socket_path.parent
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    st = directory.stat()
+    if st.st_mode & stat.S_ISVTX:
+        return
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise RuntimeError(f"socket 目錄 {directory} 不屬於目前使用者或可被其他使用者寫入")
+
+def _trusted_socket(socket_path: Path, sock: Optional[socket.socket] = None) -> bool:
+    """socket 文件（及已連線時的對端進程）是否屬於目前使用者"""
+    if not hasattr(os, 'getuid'):
+        return True
+    uid = os.getuid()
+    if sock is None:
+        try:
+            return os.stat(socket_path).st_uid == uid
+        except OSError:
+            return False
+    if hasattr(socket, 'SO_PEERCRED'):
+        size = struct.calcsize('3i')
+        _, peer_uid, _ = struct.unpack('3i', sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, size))
+        return peer_uid == uid
+    return True
+
+def _source_stamp() -> str:
+    """驗證器本身的版本戳記；服務與客戶端的程式不一致時不使用服務的結果"""
+    st = os.stat(__file__)
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+def daemon_call(socket_path: Path, method: str, params: Dict = None,
+                timeout: Optional[float] = None) -> Optional[Dict]:
+    """向驗證服務發送一個 JSON-RPC 請求
+
+    服務未運行、連線失敗、整個請求超過 timeout 秒，或 socket 不屬於目前使用者時返回 None。
+    """
+    if not hasattr(socket, 'AF_UNIX') or not _trusted_socket(socket_path):
+        return None
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params or {}}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            if not _trusted_socket(socket_path, sock):
+                return None
+            sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            # 以整體期限讀取一行回應，持續緩慢送出資料的服務也不會讓客戶端無限等待
+            while True:
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    sock.settimeout(remaining)
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if b'\n' in chunk:
+                    break
+    except OSError:
+        return None
+    line = b''.join(chunks).partition(b'\n')[0]
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+class ValidationServer:
+    """常駐驗證服務：保持源文件集合與掃描結果在記憶體中，經 Unix socket 回應驗證請求
+
+    協定為每行一個 JSON-RPC 2.0 訊息，支援 validate、ping 與 shutdown 方法。
+    每組 (檢查類型, 配置) 保留一個已預熱的驗證器；文件變更由 inotify 偵測
+    （無法使用時每個請求重新比對文件狀態），只重新掃描變更的文件。
+    """
+    
+    VALIDATORS = {
+        'all': AllValidator,
+        'quality': CodeQualityValidator,
+        'security': SecurityValidator,
+        'duplication': DuplicationValidator,
+    }
+    
+    # 只限定驗證範圍的配置項，不影響預熱的驗證器
+    SCOPE_KEYS = ('files', 'changed_since', 'staged')
+    
+    # 錯誤代碼（-32000 以下為 JSON-RPC 保留的標準錯誤）
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+    GIT_ERROR = -32001
+    VERSION_MISMATCH = -32002
+    
+    # 單一連線閒置的秒數上限，避免卡住的客戶端阻塞其他請求
+    CONNECTION_TIMEOUT = 30
+    
+    def __init__(self, project_root: Path, socket_path: Path):
+        self.project_root = project_root
+        self.socket_path = socket_path
+        self.stamp = _source_stamp()
+        self.sessions = {}
+        self.running = False
+        self.server = None
+        # 服務日誌本身的彩色設定，每個請求結束後恢復
+        self.color = bool(Colors.ENDC)
+    
+    def _session(self, check: str, config: Dict) -> Tuple[WatchSession, object, bool]:
+        """取得 (檢查類型, 配置) 對應的預熱驗證器；返回 (會話, 監看器, 是否新建立)"""
+        settings = {k: v for k, v in config.items() if k not in self.SCOPE_KEYS}
+        key = (check, json.dumps(settings, sort_keys=True, default=str))
+        entry = self.sessions.get(key)
+        if entry is not None:
+            return entry + (False,)
+        session = WatchSession(self.VALIDATORS[check](self.project_root, settings))
+        session.start()
+        # 輪詢模式下每個請求都重新比對文件狀態，不需等待
+        entry = self.sessions[key] = (session, open_watcher(session.validator, 0))
+        return entry + (True,)
+    
+    def validate(self, params: Dict) -> Dict:
+        """以預熱的驗證器驗證專案（可限定文件），返回結果與捕獲的輸出"""
+        check = params.get('check', 'all')
+        config = params.get('config') or {}
+        if check not in self.VALIDATORS or not isinstance(config, dict):
+            raise ValueError(f"無效的參數: check={check!r}")
+        
+        started = time.perf_counter()
+        session, watcher, created = self._session(check, config)
+        validator = session.validator
+        if created:
+            rescanned = len(validator.corpus.all_files)
+        else:
+            structural, paths = watcher.wait(0)
+            change = session.refresh(structural, paths) if structural or paths else None
+            rescanned = len(change[0]) if change else 0
+        
+        corpus = validator.corpus
+        corpus.set_targets(scope_files(self.project_root, config))
+        corpus.timings = timings = CheckTimings()
+        self._set_color(params.get('color', True))
+        output = io.StringIO()
+        run_started = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            with redirect_stdout(output):
+                results = validator.run_all_checks()
+        finally:
+            self._set_color(self.color)
+        timings.total = (time.perf_counter() - run_started, time.process_time() - cpu)
+        return {
+            'project': str(self.project_root),
+            'files': len(corpus.all_files),
+            'targets': len(corpus.files),
+            'rescanned': rescanned,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'output': output.getvalue(),
+            'results': [result.to_dict() for result in results],
+            'timings': timings.to_dict(),
+        }
+    
+    @staticmethod
+    def _set_color(enabled: bool):
+        if enabled:
+            Colors.enable()
+        else:
+            Colors.disable()
+    
+    def dispatch(self, line: bytes) -> Dict:
+        """處理一個 JSON-RPC 請求並返回回應"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error(None, self.PARSE_ERROR, "無法解析請求")
+        if not isinstance(request, dict) or not isinstance(request.get('params', {}), dict):
+            return self._error(None, self.INVALID_REQUEST, "無效的請求")
+        
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+        if method == 'ping':
+            return self._result(request_id, {'project': str(self.project_root), 'version': self.stamp,
+                                             'sessions': len(self.sessions)})
+        if method == 'shutdown':
+            self.running = False
+            return self._result(request_id, True)
+        if method != 'validate':
+            return self._error(request_id, self.METHOD_NOT_FOUND, f"未知的方法: {method}")
+        
+        if params.get('project') not in (None, str(self.project_root)):
+            return self._error(request_id, self.INVALID_PARAMS, f"此服務驗證的專案為 {self.project_root}")
+        if params.get('version') not in (None, self.stamp):
+            return self._error(request_id, self.VERSION_MISMATCH, "驗證服務的版本與客戶端不一致，請重新啟動服務")
+        try:
+            result = self.validate(params)
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            detail = getattr(e, 'stderr', None) or e
+            return self._error(request_id, self.GIT_ERROR, str(detail).strip())
+        except ValueError as e:
+            return self._error(request_id, self.INVALID_PARAMS, str(e))
+        except Exception as e:
+            return self._error(request_id, self.INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] validate {params.get('check', 'all')}: "
+              f"{result['targets']} 個文件，重新分析 {result['rescanned']} 個（{result['elapsed_ms']} ms）")
+        return self._result(request_id, result)
+    
+    @staticmethod
+    def _result(request_id, result) -> Dict:
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+    
+    @staticmethod
+    def _error(request_id, code: int, message: str) -> Dict:
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+    
+    def _handle(self, conn: socket.socket):
+        """逐行處理同一連線上的請求，直到客戶端關閉連線"""
+        conn.settimeout(self.CONNECTION_TIMEOUT)
+        try:
+            with conn.makefile('rb') as reader:
+                for line in reader:
+                    if not line.strip():
+                        continue
+                    response = self.dispatch(line)
+                    conn.sendall(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                    if not self.running:
+                        break
+        except OSError:
+            pass
+    
+    def bind(self):
+        """綁定 socket（只有擁有者可以連線）；預熱期間連入的請求會排隊等待"""
+        ensure_socket_dir(self.socket_path)
+        if daemon_call(self.socket_path, 'ping', timeout=2) is not None:
+            raise RuntimeError(f"已有驗證服務在 {self.socket_path} 運行")
+        if self.socket_path.exists():
+            # 上次未正常結束留下的 socket 文件
+            self.socket_path.unlink()
+        
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            self.server.bind(str(self.socket_path))
+        finally:
+            os.umask(umask)
+        self.server.listen(16)
+    
+    def serve_forever(self):
+        """處理請求，直到收到 shutdown 請求、SIGTERM 或 Ctrl+C"""
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        self.running = True
+        try:
+            while self.running:
+                conn, _ = self.server.accept()
+                with conn:
+                    self._handle(conn)
+        finally:
+            self.close()
+    
+    def close(self):
+        """關閉 socket 並釋放監看器"""
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+        for _, watcher in self.sessions.values():
+            watcher.close()
+        self.sessions = {}
+
+def serve_main(argv: List[str]):
+    """validator.py serve：啟動或停止專案的常駐驗證服務"""
+    parser = argparse.ArgumentParser(prog='validator.py serve', description='常駐驗證服務')
+    parser.add_argument('path', nargs='?', default='.', help='專案路徑')
+    parser.add_argument('--check', choices=list(ValidationServer.VALIDATORS), default='all',
+                       help='啟動時預熱的檢查類型')
+    add_config_arguments(parser)
+    parser.add_argument('--socket', metavar='PATH', help='socket 路徑（預設依專案路徑產生）')
+    parser.add_argument('--no-color', action='store_true', help='禁用服務日誌的彩色輸出')
+    parser.add_argument('--stop', action='store_true', help='停止運行中的驗證服務')
+    args = parser.parse_args(argv)
+    
+    if args.no_color:
+        Colors.disable()
+    project_root = Path(args.path).resolve()
+    socket_path = Path(args.socket) if args.socket else default_socket_path(project_root)
+    
+    if args.stop:
+        if daemon_call(socket_path, 'shutdown', timeout=5) is None:
+            print(f"{Colors.YELLOW}沒有運行中的驗證服務: {socket_path}{Colors.ENDC}")
+            sys.exit(1)
+        print(f"{Colors.GREEN}已停止驗證服務: {socket_path}{Colors.ENDC}")
+        return
+    
+    if not hasattr(socket, 'AF_UNIX'):
+        print(f"{Colors.RED}錯誤：此平台不支援 Unix socket，無法啟動驗證服務{Colors.ENDC}")
+        sys.exit(1)
+    if not project_root.exists():
+        print(f"{Colors.RED}錯誤：專案路徑不存在: {project_root}{Colors.ENDC}")
+        sys.exit(1)
+    
+    server = ValidationServer(project_root, socket_path)
+    try:
+        server.bind()
+    except (RuntimeError, OSError) as e:
+        print(f"{Colors.RED}錯誤：無法啟動驗證服務: {e}{Colors.ENDC}")
+        sys.exit(1)
+    
+    try:
+        print(f"{Colors.BLUE}預熱 {project_root} ...{Colors.ENDC}")
+        warmup = server.validate({'check': args.check, 'config': build_config(args)})
+        print(f"預熱完成: {warmup['files']} 個文件（{warmup['elapsed_ms']} ms）")
+        print(f"{Colors.GREEN}驗證服務已啟動: {socket_path}{Colors.ENDC}（按 Ctrl+C 或執行 serve --stop 結束）")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    print(f"\n{Colors.BLUE}驗證服務已停止{Colors.ENDC}")
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """加入影響驗證配置的命令列參數（驗證與服務命令共用）"""
+    parser.add_argument('--config', help='配置文件路徑')
+    parser.add_argument('--source-dir', help='源代碼目錄')
+    parser.add_argument('--no-gitignore', action='store_true', help='不套用 .gitignore 的忽略規則')
+    parser.add_argument('--python-backend', choices=['regex', 'ast'],
+                       help='Python 文件的分析後端（ast 以語法樹計算函數長度、圈複雜度與導入）')
+    parser.add_argument('--jobs', '-j', type=int, help='並行工作進程數（0 表示使用所有 CPU 核心）')
+    parser.add_argument('--cache', action='store_true', help='啟用結果快取，只重新分析變更的文件')
+    parser.add_argument('--cache-file', help='快取文件路徑（預設為 <專案>/.validator-cache.json）')
+    parser.add_argument('--cache-hash', action='store_true', help='mtime 變更時以內容雜湊確認文件是否真的變更')
+
+def build_config(args: argparse.Namespace) -> Dict:
+    """載入配置文件並套用命令列參數"""
+    config = {}
+    if args.config:
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"{Colors.RED}無法載入配置文件: {e}{Colors.ENDC}")
+    
+    if args.source_dir:
+        config['source_dir'] = args.source_dir
+    
+    if args.no_gitignore:
+        config['use_gitignore'] = False
+    
+    if args.python_backend:
+        config['python_backend'] = args.python_backend
+    
+    if args.jobs is not None:
+        config['jobs'] = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    if args.cache or args.cache_file or args.cache_hash:
+        config['cache'] = True
+    if args.cache_file:
+        config['cache_file'] = args.cache_file
+    if args.cache_hash:
+        config['cache_hash'] = True
+    return config
+
+
 def main():
     """主函數"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(description='專案品質驗證工具')
     parser.add_argument('path', nargs='?', default='.', help='專案路徑')
     parser.add_argument('--check', choices=['all', 'quality', 'security', 'duplication'], 
                        default='all', help='檢查類型')
-    parser.add_argument('--config', help='配置文件路徑')
-    parser.add_argument('--source-dir', help='源代碼目錄')
+    add_config_arguments(parser)
     parser.add_argument('--no-color', action='store_true', help='禁用彩色輸出')
     parser.add_argument('--output', choices=['console', 'json', 'markdown'], 
                        default='console', help='輸出格式')
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument('--changed-since', metavar='REF', help='只驗證相對於 Git 參照變更的文件')
+    scope.add_argument('--staged', action='store_true', help='只驗證 Git 暫存區中的文件')
+    scope.add_argument('--files', nargs='+', metavar='FILE', help='只驗證指定的文件')
+    parser.add_argument('--watch', action='store_true', help='監看源文件變更，持續重新驗證並顯示新增與已解決的問題')
+    parser.add_argument('--watch-interval', type=float, default=1.0, metavar='SECONDS',
+                       help='無法使用 inotify 時的輪詢間隔（預設 1 秒）')
+    parser.add_argument('--socket', metavar='PATH', help='驗證服務的 socket 路徑（預設依專案路徑產生）')
+    parser.add_argument('--no-daemon', action='store_true', help='不使用運行中的驗證服務，直接在本進程中驗證')
+    parser.add_argument('--daemon-timeout', type=float, default=60, metavar='SECONDS',
+                       help='等待驗證服務回應的秒數，逾時改為在本進程中驗證（預設 60）')
+    parser.add_argument('--profile', metavar='FILE', help='以 cProfile 剖析本次運行並保存 pstats 資料（並行模式只含主進程）')
+    parser.add_argument('--trace', metavar='FILE', help='將每個文件每項掃描的耗時寫成 Chrome trace JSON')
     
     args = parser.parse_args()
     
+    scoped = bool(args.changed_since or args.staged or args.files)
+    if args.watch and (scoped or args.output != 'console'):
+        print(f"{Colors.RED}錯誤：--watch 只支援控制台輸出，且不能與 --changed-since / --staged / --files 同時使用{Colors.ENDC}")
+        sys.exit(1)
+    if args.watch and (args.profile or args.trace):
+        print(f"{Colors.RED}錯誤：--profile / --trace 不能與 --watch 同時使用{Colors.ENDC}")
+        sys.exit(1)
+    
     if args.no_color:
         Colors.disable()
     
     # 載入配置
-    config = {}
-    if args.config:
-        try:
-            with open(args.config, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-        except Exception as e:
-            print(f"{Colors.RED}無法載入配置文件: {e}{Colors.ENDC}")
+    config = build_config(args)
     
-    if args.source_dir:
-        config['source_dir'] = args.source_dir
+    if args.changed_since:
+        config['changed_since'] = args.changed_since
+    if args.staged:
+        config['staged'] = True
+    if args.files:
+        config['files'] = [str(Path(path).resolve()) for path in args.files]
     
     # 確定專案路徑
     project_root = Path(args.path).resolve()
@@ -629,22 +2755,90 @@ def main():
     print(f"{Colors.BLUE}╚════════════════════════════════════════╝{Colors.ENDC}")
     print(f"\n專案路徑: {project_root}")
     
+    # 有運行中的驗證服務時交給服務處理，否則在本進程中驗證
+    reply = None
+    socket_path = Path(args.socket) if args.socket else default_socket_path(project_root)
+    # 剖析與追蹤需要在本進程中執行
+    if not (args.no_daemon or args.watch or args.profile or args.trace):
+        response = daemon_call(socket_path, 'validate', {
+            'project': str(project_root),
+            'check': args.check,
+            'config': config,
+            'color': bool(Colors.ENDC),
+            'version': _source_stamp(),
+        }, timeout=args.daemon_timeout)
+        if response is None and os.path.exists(socket_path):
+            print(f"{Colors.YELLOW}驗證服務沒有回應或不屬於目前使用者，改為在本進程中驗證{Colors.ENDC}")
+        elif response is not None and 'error' in response:
+            error = response['error']
+            if error.get('code') == ValidationServer.GIT_ERROR:
+                print(f"{Colors.RED}錯誤：無法取得 Git 變更文件: {error.get('message')}{Colors.ENDC}")
+                sys.exit(1)
+            print(f"{Colors.YELLOW}驗證服務無法處理請求，改為在本進程中驗證: {error.get('message')}{Colors.ENDC}")
+        elif response is not None:
+            reply = response.get('result')
+    
     # 選擇驗證器
-    if args.check == 'quality':
-        validator = CodeQualityValidator(project_root, config)
-    elif args.check == 'security':
-        validator = SecurityValidator(project_root, config)
-    elif args.check == 'duplication':
-        validator = DuplicationValidator(project_root, config)
-    else:
-        validator = AllValidator(project_root, config)
+    try:
+        if args.check == 'quality':
+            validator = CodeQualityValidator(project_root, config)
+        elif args.check == 'security':
+            validator = SecurityValidator(project_root, config)
+        elif args.check == 'duplication':
+            validator = DuplicationValidator(project_root, config)
+        else:
+            validator = AllValidator(project_root, config)
+        corpus = validator.corpus if reply is None else None
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        detail = getattr(e, 'stderr', None) or e
+        print(f"{Colors.RED}錯誤：無法取得 Git 變更文件: {str(detail).strip()}{Colors.ENDC}")
+        sys.exit(1)
     
     # 運行檢查
     print(f"檢查類型: {args.check}")
     print(f"專案類型: {validator.project_type}")
     print(f"主要語言: {validator.primary_language}")
+    if scoped:
+        targets, total = (reply['targets'], reply['files']) if reply else (len(corpus.files), len(corpus.all_files))
+        label = '指定文件' if args.files else '變更文件'
+        print(f"驗證範圍: {targets} 個{label}（共 {total} 個源文件）")
     
-    results = validator.run_all_checks()
+    if args.watch:
+        results = run_watch(validator, args.watch_interval)
+        sys.exit(0 if all(r.passed for r in results) else 1)
+    
+    if reply is not None:
+        print(reply['output'], end='')
+        results = [ValidationResult.from_dict(item) for item in reply['results']]
+        validator.results = results
+        timings = CheckTimings.from_dict(reply['timings'])
+        print(f"\n驗證服務: 重新分析 {reply['rescanned']} 個文件（{reply['elapsed_ms']} ms）")
+    else:
+        if args.trace:
+            corpus.timings = CheckTimings(trace=True)
+        timings = corpus.timings
+        profiler = cProfile.Profile() if args.profile else None
+        started = time.perf_counter()
+        cpu = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        results = validator.run_all_checks()
+        if profiler is not None:
+            profiler.disable()
+        timings.total = (time.perf_counter() - started, time.process_time() - cpu)
+        
+        cache = validator.corpus.cache
+        if cache is not None:
+            print(f"\n結果快取: 重用 {cache.hits} 個文件，重新分析 {cache.misses} 個文件")
+        if profiler is not None:
+            profiler.dump_stats(args.profile)
+            if args.output == 'console':
+                print(f"\n{Colors.BLUE}性能剖析（依累計時間排序的前 20 項）：{Colors.ENDC}")
+                pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(20)
+            print(f"性能剖析已保存: {args.profile}（可用 python -m pstats 檢視）")
+        if args.trace:
+            timings.write_trace(args.trace)
+            print(f"Chrome trace 已保存: {args.trace}（可在 chrome://tracing 或 https://ui.perfetto.dev 開啟）")
     
     # 輸出結果
     if args.output == 'json':
@@ -657,16 +2851,8 @@ def main():
                 'passed': sum(1 for r in results if r.passed),
                 'failed': sum(1 for r in results if not r.passed)
             },
-            'results': [
-                {
-                    'check': r.check_name,
-                    'passed': r.passed,
-                    'errors': r.errors,
-                    'warnings': r.warnings,
-                    'info': r.info
-                }
-                for r in results
-            ]
+            'results': [r.to_dict() for r in results],
+            'timings': timings.to_dict()
         }
         print(json.dumps(output, ensure_ascii=False, indent=2))
     elif args.output == 'markdown':
@@ -684,17 +2870,25 @@ def main():
         for result in results:
             status = "✅" if result.passed else "❌"
             print(f"\n### {status} {result.check_name}")
-            if result.errors:
+            if result.error_lines:
                 print("\n**錯誤:**")
-                for error in result.errors:
+                for error in result.error_lines:
                     print(f"- {error}")
-            if result.warnings:
+            if result.warning_lines:
                 print("\n**警告:**")
-                for warning in result.warnings:
+                for warning in result.warning_lines:
                     print(f"- {warning}")
+        rows = timings.rows()
+        if rows:
+            print(f"\n## 檢查耗時")
+            print("\n| 檢查 | 掃描 ms | 彙總 ms | CPU ms | 文件 | KB | 發現 |")
+            print("|------|--------:|--------:|-------:|-----:|---:|-----:|")
+            for row in rows:
+                print(f"| {row['check']} | {row['scan_wall'] * 1000:.1f} | {row['check_wall'] * 1000:.1f} | "
+                      f"{row['cpu'] * 1000:.1f} | {row['files']} | {row['bytes'] / 1024:.1f} | {row['findings']} |")
     else:
         # 控制台輸出
-        validator.print_summary()
+        validator.print_summary(timings)
     
     # 返回狀態碼
     if all(r.passed for r in results):